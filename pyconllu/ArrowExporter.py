@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+DEFAULT_BATCH_SIZE = 65536
+TABLES = ('tokens', 'contractions', 'empty_nodes')
+
+
+class ArrowExporter(object):
+    """Export parsed CoNLL-U sentences as Arrow record batches."""
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Constructor of ArrowExporter.
+
+        Sentences are exported into three tables: 'tokens', with one row per
+        token in Sentence.tokens, 'contractions' and 'empty_nodes'. Every row
+        carries the index of its sentence in the exported stream and its
+        sent_id comment, if any. Morphological features are stored as a map
+        column; DEPS and MISC are stored as in CoNLL-U.
+
+        :param batch_size: maximum number of rows in each record batch
+        :type batch_size: int
+        """
+        if pa is None:
+            raise ImportError(
+                "pyarrow is required to export to Arrow: "
+                "pip install pyconllu[arrow]")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        self.batch_size = batch_size
+        self.schemas = self._build_schemas()
+
+    def iter_batches(self, sentences):
+        """Produce record batches from a stream of sentences
+
+        It consumes the sentences lazily, so memory use is bounded by
+        batch_size regardless of the size of the corpus.
+
+        :example:
+
+        >>> exporter = ArrowExporter()
+        >>> for table, batch in exporter.iter_batches(
+        ...         conllu.parse_file("corpus.conllu")):
+        ...     print(table, batch.num_rows)
+        tokens 65536
+        (...)
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :return: generator producing (table name, RecordBatch) tuples
+        :rtype: tuple
+        """
+        buffers = dict((table, self._new_buffer(table)) for table in TABLES)
+
+        for sentence_idx, sentence in enumerate(sentences):
+            sent_id = sentence.metadata.get('sent_id')
+
+            for idx, token in enumerate(sentence.tokens):
+                self._append_node(
+                    buffers['tokens'], sentence_idx, sent_id, idx, token)
+                if self._is_full(buffers['tokens']):
+                    yield 'tokens', self._flush('tokens', buffers)
+
+            for token, position in sentence.contractions:
+                buffer = buffers['contractions']
+                self._append_keys(buffer, sentence_idx, sent_id, position)
+                buffer['id'].append(token.id)
+                buffer['form'].append(token.form)
+                if self._is_full(buffer):
+                    yield 'contractions', self._flush('contractions', buffers)
+
+            for token, position in sentence.empty_nodes:
+                self._append_node(
+                    buffers['empty_nodes'], sentence_idx, sent_id, position,
+                    token)
+                if self._is_full(buffers['empty_nodes']):
+                    yield 'empty_nodes', self._flush('empty_nodes', buffers)
+
+        for table in TABLES:
+            if buffers[table]['sentence']:
+                yield table, self._flush(table, buffers)
+
+    def write_parquet(
+            self, sentences, tokens_path, contractions_path=None,
+            empty_nodes_path=None, **kwargs):
+        """Write a stream of sentences to Parquet files
+
+        Record batches are appended to the files as they are produced, so
+        the corpus is never held in memory. Tables whose path is None are
+        not written.
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param tokens_path: destination of the tokens table
+        :type tokens_path: str
+        :param contractions_path: destination of the contractions table
+        :type contractions_path: str
+        :param empty_nodes_path: destination of the empty nodes table
+        :type empty_nodes_path: str
+        :param kwargs: extra options for pyarrow.parquet.ParquetWriter
+        :return: number of rows written to each table
+        :rtype: dict
+        """
+        paths = dict(zip(
+            TABLES, (tokens_path, contractions_path, empty_nodes_path)))
+        writers = dict(
+            (table, pq.ParquetWriter(path, self.schemas[table], **kwargs))
+            for table, path in paths.items() if path is not None)
+        rows = dict((table, 0) for table in writers)
+
+        try:
+            for table, batch in self.iter_batches(sentences):
+                if table in writers:
+                    writers[table].write_batch(batch)
+                    rows[table] += batch.num_rows
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return rows
+
+    def _build_schemas(self):
+        """
+        It builds the Arrow schema of each exported table.
+        """
+        keys = [
+            pa.field('sentence', pa.int64(), nullable=False),
+            pa.field('sent_id', pa.string()),
+            pa.field('token', pa.int32(), nullable=False),
+        ]
+        node = [
+            pa.field('id', pa.string()),
+            pa.field('form', pa.string()),
+            pa.field('lemma', pa.string()),
+            pa.field('upostag', pa.string()),
+            pa.field('xpostag', pa.string()),
+            pa.field('feats', pa.map_(pa.string(), pa.string())),
+            pa.field('head', pa.int32()),
+            pa.field('deprel', pa.string()),
+            pa.field('deps', pa.string()),
+            pa.field('misc', pa.string()),
+        ]
+        return {
+            'tokens': pa.schema(keys + node),
+            'contractions': pa.schema(keys + node[:2]),
+            'empty_nodes': pa.schema(keys + node),
+        }
+
+    def _new_buffer(self, table):
+        return OrderedDict(
+            (name, []) for name in self.schemas[table].names)
+
+    def _is_full(self, buffer):
+        return len(buffer['sentence']) >= self.batch_size
+
+    def _flush(self, table, buffers):
+        """
+        It converts the buffered rows of a table into a record batch and
+        empties the buffer.
+        """
+        schema = self.schemas[table]
+        buffer = buffers[table]
+        buffers[table] = self._new_buffer(table)
+        return pa.RecordBatch.from_arrays(
+            [pa.array(buffer[field.name], type=field.type)
+             for field in schema],
+            schema=schema)
+
+    @staticmethod
+    def _append_keys(buffer, sentence_idx, sent_id, position):
+        buffer['sentence'].append(sentence_idx)
+        buffer['sent_id'].append(sent_id)
+        buffer['token'].append(position)
+
+    def _append_node(self, buffer, sentence_idx, sent_id, position, token):
+        self._append_keys(buffer, sentence_idx, sent_id, position)
+        buffer['id'].append(token.id)
+        buffer['form'].append(token.form)
+        buffer['lemma'].append(token.lemma)
+        buffer['upostag'].append(token.upostag)
+        buffer['xpostag'].append(token.xpostag)
+        buffer['feats'].append(
+            list(token.feats.items())
+            if isinstance(token.feats, OrderedDict) else None)
+        buffer['head'].append(token.head)
+        buffer['deprel'].append(token.deprel)
+        buffer['deps'].append(self._format_deps(token.deps))
+        buffer['misc'].append(self._format_misc(token.misc))
+
+    @staticmethod
+    def _format_deps(deps):
+        """
+        It returns DEPS as in CoNLL-U, either from the (deprel, head) pairs
+        or from the raw value kept when it could not be parsed.
+        """
+        if isinstance(deps, list):
+            return "|".join(
+                "{}:{}".format(head, deprel) for deprel, head in deps)
+        return deps
+
+    @staticmethod
+    def _format_misc(misc):
+        if isinstance(misc, OrderedDict):
+            return "|".join(
+                "{}={}".format(key, "_" if value is None else value)
+                for key, value in misc.items())
+        return misc
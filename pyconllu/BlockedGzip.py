@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+import bisect
+import io
+import multiprocessing
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from multiprocessing.pool import ThreadPool
+from .CoNLLU import CoNLLU, DEFAULT_ENCODING
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+DEFAULT_LEVEL = 6
+INDEX_SUFFIX = ".idx"
+
+# gzip member header with the FEXTRA flag and a 'PC' subfield holding the
+# size of the member and the number of sentences in it
+_HEADER = struct.Struct("<BBBBIBBH")
+_SUBFIELD = struct.Struct("<BBHII")
+_TRAILER = struct.Struct("<II")
+_GZIP_MAGIC = (0x1f, 0x8b)
+_FEXTRA = 4
+_SUBFIELD_ID = (ord("P"), ord("C"))
+_HEADER_SIZE = _HEADER.size + _SUBFIELD.size
+
+
+class BlockedGzipWriter(object):
+    """Write CoNLL-U sentences to a gzip file made of independent blocks."""
+    def __init__(
+            self, ofile, block_size=DEFAULT_BLOCK_SIZE, level=DEFAULT_LEVEL,
+            encoding=DEFAULT_ENCODING):
+        """
+        Constructor of BlockedGzipWriter.
+
+        Sentences are grouped in blocks of about block_size bytes of
+        uncompressed text, and each block is written as a separate gzip
+        member, so a block never splits a sentence. Standard gzip tools read
+        the file as a whole. Each member header stores its compressed size
+        and number of sentences (in a 'PC' extra subfield, as BGZF does), and
+        close() also writes the block index to ofile + '.idx'.
+
+        :example:
+
+        >>> with BlockedGzipWriter("corpus.conllu.gz") as writer:
+        ...     for raw_sentence in conllu.read_sentences_from_file(
+        ...             "corpus.conllu"):
+        ...         writer.write(raw_sentence)
+
+        :param ofile: filename
+        :type ofile: str
+        :param block_size: uncompressed size of the blocks, in bytes
+        :type block_size: int
+        :param level: compression level, from 1 to 9
+        :type level: int
+        :param encoding: encoding of the text
+        :type encoding: str
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be a positive integer")
+
+        self.ofile = ofile
+        self.block_size = block_size
+        self.level = level
+        self.encoding = encoding
+        self.blocks = []
+        self._fho = io.open(ofile, "wb")
+        self._offset = 0
+        self._sentences = 0
+        self._buffer = []
+        self._buffer_size = 0
+        self._conllu = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, raw_sentence):
+        """Add a raw CoNLL-U sentence, as produced by read_sentences()
+
+        :param raw_sentence: CoNLL-U sentence, without blank lines
+        :type raw_sentence: str
+        :raises ValueError: if the sentence is empty or contains blank lines
+        """
+        if not raw_sentence.strip():
+            raise ValueError("a sentence can not be empty")
+        if not raw_sentence.endswith("\n"):
+            raw_sentence += "\n"
+        if "\n\n" in raw_sentence:
+            raise ValueError("a sentence can not contain blank lines")
+
+        data = (raw_sentence + "\n").encode(self.encoding)
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        if self._buffer_size >= self.block_size:
+            self._write_block()
+
+    def write_sentence(self, sentence):
+        """Add a Sentence object
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        """
+        if self._conllu is None:
+            self._conllu = CoNLLU()
+        self.write(self._conllu.generate_conllu_sentence(sentence))
+
+    def close(self):
+        """Write the last block and the block index.
+
+        A file without sentences gets one empty block, so it is still a
+        valid gzip file.
+        """
+        if self._fho is None:
+            return
+        if self._buffer or not self.blocks:
+            self._write_block()
+        self._fho.close()
+        self._fho = None
+        write_index(self.ofile + INDEX_SUFFIX, self.blocks)
+
+    def _write_block(self):
+        data = b"".join(self._buffer)
+        compressor = zlib.compressobj(
+            self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        deflated = compressor.compress(data) + compressor.flush()
+        size = _HEADER_SIZE + len(deflated) + _TRAILER.size
+        sentences = len(self._buffer)
+
+        self._fho.write(_HEADER.pack(
+            _GZIP_MAGIC[0], _GZIP_MAGIC[1], 8, _FEXTRA, int(time.time()), 0,
+            255, _SUBFIELD.size))
+        self._fho.write(_SUBFIELD.pack(
+            _SUBFIELD_ID[0], _SUBFIELD_ID[1], _SUBFIELD.size - 4, size,
+            sentences))
+        self._fho.write(deflated)
+        self._fho.write(_TRAILER.pack(
+            zlib.crc32(data) & 0xffffffff, len(data) & 0xffffffff))
+
+        self.blocks.append((self._offset, size, self._sentences, sentences))
+        self._offset += size
+        self._sentences += sentences
+        self._buffer = []
+        self._buffer_size = 0
+
+
+class BlockedGzipReader(object):
+    """Read a gzip file written by BlockedGzipWriter with random access."""
+    def __init__(self, ifile, encoding=DEFAULT_ENCODING):
+        """
+        Constructor of BlockedGzipReader.
+
+        The block index is read from ifile + '.idx' if it is not older than
+        the file; otherwise it is rebuilt from the member headers, reading
+        only a few bytes per block.
+
+        :param ifile: filename
+        :type ifile: str
+        :param encoding: encoding of the text
+        :type encoding: str
+        :raises Exception: if the file was not written by BlockedGzipWriter
+        """
+        self.ifile = ifile
+        self.encoding = encoding
+        index_file = ifile + INDEX_SUFFIX
+        if (os.path.exists(index_file) and
+                os.path.getmtime(index_file) >= os.path.getmtime(ifile)):
+            self.blocks = read_index(index_file)
+        else:
+            self.blocks = scan_blocks(ifile)
+        self._firsts = [block[2] for block in self.blocks]
+        self._cached_block = (None, None)
+
+    def __len__(self):
+        """Number of sentences in the file."""
+        if not self.blocks:
+            return 0
+        return self.blocks[-1][2] + self.blocks[-1][3]
+
+    def __getitem__(self, idx):
+        """Return the raw sentence at a position, decompressing only the
+        block that holds it.
+
+        :example:
+
+        >>> reader = BlockedGzipReader("corpus.conllu.gz")
+        >>> conllu.parse_sentence(reader[120000])
+        """
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("sentence index out of range")
+
+        block = bisect.bisect_right(self._firsts, idx) - 1
+        if self._cached_block[0] != block:
+            self._cached_block = (block, self.read_block(block))
+        return self._cached_block[1][idx - self.blocks[block][2]]
+
+    def read_block(self, block):
+        """Return the raw sentences of a block
+
+        :param block: position of the block in the index
+        :type block: int
+        :rtype: list
+        """
+        with io.open(self.ifile, "rb") as fhi:
+            return _decode_block(
+                self._read_data(fhi, self.blocks[block]), self.encoding)
+
+    def iter_sentences(self, start=0, stop=None, jobs=1, processes=False):
+        """Produce the raw sentences in [start, stop), in order
+
+        Blocks are decompressed by jobs threads (zlib releases the GIL), or
+        processes if processes is True, with at most two blocks per worker
+        in flight.
+
+        :example:
+
+        >>> for sentence in conllu.parse_sentences(
+        ...         reader.iter_sentences(jobs=4)):
+        ...     pass
+
+        :param start: position of the first sentence
+        :type start: int
+        :param stop: position after the last sentence, len(self) by default
+        :type stop: int
+        :param jobs: number of workers
+        :type jobs: int
+        :param processes: use processes instead of threads
+        :type processes: bool
+        :return: generator producing raw CoNLL-U sentences
+        :rtype: str
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        first = bisect.bisect_right(self._firsts, start) - 1
+        last = bisect.bisect_right(self._firsts, stop - 1)
+        blocks = self.blocks[first:last]
+
+        position = blocks[0][2]
+        for sentences in self._decode_blocks(blocks, jobs, processes):
+            low = max(start - position, 0)
+            high = min(stop - position, len(sentences))
+            for raw_sentence in sentences[low:high]:
+                yield raw_sentence
+            position += len(sentences)
+
+    def _decode_blocks(self, blocks, jobs, processes):
+        """
+        It decompresses blocks in workers and produces their sentences in
+        order.
+        """
+        with io.open(self.ifile, "rb") as fhi:
+            if jobs <= 1:
+                for block in blocks:
+                    yield _decode_block(
+                        self._read_data(fhi, block), self.encoding)
+                return
+
+            pool = (multiprocessing.Pool if processes else ThreadPool)(jobs)
+            try:
+                pending = deque()
+                for block in blocks:
+                    pending.append(pool.apply_async(
+                        _decode_block,
+                        (self._read_data(fhi, block), self.encoding)))
+                    if len(pending) >= 2 * jobs:
+                        yield pending.popleft().get()
+                while pending:
+                    yield pending.popleft().get()
+            finally:
+                pool.terminate()
+                pool.join()
+
+    @staticmethod
+    def _read_data(fhi, block):
+        fhi.seek(block[0])
+        return fhi.read(block[1])
+
+
+def scan_blocks(ifile):
+    """Build the block index of a file from its member headers
+
+    :param ifile: filename
+    :type ifile: str
+    :return: (offset, size, first sentence, number of sentences) of each
+        block
+    :rtype: list
+    :raises Exception: if a member has no block information
+    """
+    blocks = []
+    sentences = 0
+    offset = 0
+    file_size = os.path.getsize(ifile)
+    with io.open(ifile, "rb") as fhi:
+        while offset < file_size:
+            fhi.seek(offset)
+            header = fhi.read(_HEADER_SIZE)
+            if len(header) < _HEADER_SIZE:
+                raise Exception("Invalid blocked gzip file: truncated block")
+            fields = _HEADER.unpack(header[:_HEADER.size])
+            subfield = _SUBFIELD.unpack(header[_HEADER.size:])
+            if (fields[:2] != _GZIP_MAGIC or not fields[3] & _FEXTRA or
+                    subfield[:2] != _SUBFIELD_ID):
+                raise Exception(
+                    "Invalid blocked gzip file: no block information at "
+                    "offset {}".format(offset))
+            size, count = subfield[3:]
+            blocks.append((offset, size, sentences, count))
+            offset += size
+            sentences += count
+    return blocks
+
+
+def read_index(index_file):
+    """Read a block index written by write_index()."""
+    with io.open(index_file, encoding="ascii") as fhi:
+        return [
+            tuple(int(value) for value in line.split("\t"))
+            for line in fhi if line.strip()]
+
+
+def write_index(index_file, blocks):
+    """Write a block index as (offset, size, first, count) TSV rows."""
+    with io.open(index_file, "w", encoding="ascii") as fho:
+        for block in blocks:
+            fho.write(u"\t".join(str(value) for value in block) + u"\n")
+
+
+def _decode_block(data, encoding):
+    """
+    It decompresses a gzip member and splits it in raw sentences, which the
+    writer separates with exactly one blank line.
+    """
+    text = zlib.decompress(data, 16 + zlib.MAX_WBITS).decode(encoding)
+    return [raw + "\n" for raw in text.split("\n\n") if raw]
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
+import codecs
+import csv
+import io
+import itertools
+import os
+import pickle
 import re
-import sys
 from collections import OrderedDict
-from copy import deepcopy
+from .DependencyTree import DependencyTree
+from .EnhancedGraph import EnhancedGraph
 from .HeadDep import HeadDep
+from .ProgressReporter import byte_size, file_position
 from .Sentence import Sentence
 from .Token import Token
 from .Head import Head
@@ -12,7 +19,8 @@ DEFAULT_FIELDS = (
     'id', 'form', 'lemma', 'upostag', 'xpostag', 'feats',
     'head', 'deprel', 'deps', 'misc')
 
-DEPS_PATTERN = r"\d+:[a-z][a-z_-]*(:[a-z][a-z_-]*)?"
+DEFAULT_ENCODING = "utf-8"
+DEPS_PATTERN = r"\d+(\.\d+)?:[^\s:|][^\s|]*"
 TEXT_PATTERN = r"#\s*text\s*=\s*(.*)$"
 TOKEN_SEP_PATTERN = r"\t"
 MULTI_DEPS_PATTERN = re.compile(
@@ -21,11 +29,28 @@ PNAME_PATTERN = r"(NP|PROPN|PNOUN|NNP)"
 CONTRACT_ID_PATTERN = r"^[0-9]+\-[0-9]+"
 EMPTY_NODE_ID_PATTERN = r"^[0-9]+\.[0-9]+"
 
+_TEXT_TYPE = type(u"")
+# one or more blank lines between sentences
+_SENTENCE_BOUNDARY = re.compile(r"\n(?:[ ]*\n)+")
+
 
 class CoNLLU:
     """Process a file or string with text in CoNNL-U format."""
-    def __init__(self):
-        pass
+    def __init__(self, cache=None, propername_pattern=PNAME_PATTERN):
+        """
+        Constructor of CoNLLU.
+
+        :param cache: optional cache of parsed files used by parse_file()
+        :type cache: ParseCache
+        :param propername_pattern: regular expression matched at the start of
+            UPOS and XPOS tags to identify proper names, whose wordform is
+            used instead of the lemma by get_lemmas()
+        :type propername_pattern: str
+        """
+        self.cache = cache
+        self.propername_pattern = re.compile(propername_pattern)
+        # memo of (xpostag, upostag) -> is proper name
+        self._propername_tags = {}
 
     def parse_sentence(self, raw_sentence):
         """Parse a sentence in CoNLL-U format
@@ -92,27 +117,110 @@ class CoNLLU:
             empty_nodes=empty_nodes,
         )
 
-    def parse_file(self, ifile):
+    def parse_file(self, ifile, progress=None, encoding=DEFAULT_ENCODING):
         """Parse a file in CoNLL-U format
 
         It transforms a CoNLLU corpus into parsed sentences. Each sentence
         contains a list of tokens (Sentence.tokens), where each token is an
         instance of Token containing the features and information.
 
+        If the instance was built with a ParseCache, the sentences of a valid
+        cache entry are produced without reading or parsing the file.
+        Otherwise, the file is parsed and its sentences are written to the
+        cache in chunks, as they are produced; the entry is stored once the
+        generator is exhausted. Either way, only a chunk of sentences is held
+        in memory.
+
         :example:
 
         >>> conllu.parse_file("corpus.conllu")
         <generator object CoNLLU.parse_file at 0x7f224cf94728>
 
-        :param ifile: filename
+        >>> for sentence in conllu.parse_file(
+        ...         "corpus.conllu", progress=ProgressReporter()):
+        ...     pass
+        3548 sentences, 53220 tokens, 3.4 MB in 0:00:01 (3548 sent/s, ...)
+
+        :param ifile: filename, or an open text or binary file object,
+            which is never cached
         :type ifile: str
+        :param progress: reporter updated with the sentences, tokens and
+            bytes parsed, and finished when the file is exhausted; bytes
+            are taken from the position of the file when it can tell it
+        :type progress: ProgressReporter
+        :param encoding: encoding of the file
+        :type encoding: str
         :return: generator producing sentences represented as Sentence objects
         :rtype: Sentence
+        :raises IOError: if the file can not be opened
         """
-        for raw_sentence in self.read_sentences_from_file(ifile):
-            yield self.parse_sentence(raw_sentence)
-
-    def read_sentences_from_file(self, ifile):
+        cache = None if hasattr(ifile, "read") else self.cache
+        if progress is not None:
+            progress.start(total_bytes=None if hasattr(ifile, "read") else (
+                os.path.getsize(ifile)))
+
+        cached = None
+        if cache is not None:
+            cached = cache.get(ifile, encoding)
+
+        # sentences produced from the cache, which are not parsed again if
+        # the entry turns out to be corrupted
+        produced = 0
+        while cached is not None:
+            try:
+                sentence = next(cached)
+            except StopIteration:
+                break
+            except ValueError:
+                cached = None
+                break
+            if progress is not None:
+                progress.update(1, len(sentence.tokens))
+            produced += 1
+            yield sentence
+
+        if cached is None:
+            writer = None
+            if cache is not None and not produced:
+                writer = cache.writer(
+                    ifile, key=cache.key(ifile, encoding), encoding=encoding)
+
+            if hasattr(ifile, "read"):
+                fhi = ifile
+            else:
+                fhi = io.open(ifile, encoding=encoding)
+            # bytes are counted from the position of the file if it is known
+            position = None if progress is None else file_position(fhi)
+            try:
+                raw_sentences = self.read_sentences(fhi, encoding)
+                for raw_sentence in itertools.islice(
+                        raw_sentences, produced, None):
+                    sentence = self.parse_sentence(raw_sentence)
+                    if position is not None:
+                        progress.update(
+                            1, len(sentence.tokens), position=position())
+                    elif progress is not None:
+                        progress.update(
+                            1, len(sentence.tokens),
+                            byte_size(raw_sentence) + 1)
+                    if writer is not None:
+                        writer.write(sentence)
+                    yield sentence
+            except BaseException:
+                if writer is not None:
+                    writer.abort()
+                raise
+            finally:
+                if fhi is not ifile:
+                    fhi.close()
+
+            if writer is not None:
+                writer.commit()
+
+        if progress is not None:
+            progress.finish()
+
+    def read_sentences_from_file(self, ifile, encoding=DEFAULT_ENCODING):
         """Read CoNLL-U sentences from file, one at a time
 
         It reads a CoNLLU corpus from file and returns a generator which
@@ -137,32 +245,179 @@ class CoNLLU:
         9\tcidade\tcidade\tNOUN\tNOUN\tGender=Fem|Number=Sing\t6\tnmod\t_\t_\n
         10\t.\t.\tPUNCT\t.\t_\t2\tpunct\t_\t_\n'
 
-        :param ifile: filename to be read, in CoNLL-U format
+        :param ifile: filename to be read, in CoNLL-U format, or an open
+            text or binary file object
         :type ifile: str
+        :param encoding: encoding of the file, or of the bytes read from a
+            binary file object
+        :type encoding: str
+        :return: generator producing strings with CoNLL-U sentences
+        :rtype: str
+        :raises IOError: if the file can not be opened
+        """
+        if hasattr(ifile, "read"):
+            for raw_sentence in self.read_sentences(ifile, encoding):
+                yield raw_sentence
+            return
+
+        with io.open(ifile, encoding=encoding) as fhi:
+            for raw_sentence in self.read_sentences(fhi):
+                yield raw_sentence
+
+    def read_sentences(self, source, encoding=DEFAULT_ENCODING):
+        """Read CoNLL-U sentences from any source, one at a time
+
+        It works as read_sentences_from_file() on text in memory or on any
+        iterable of lines, such as an open file, sys.stdin or a socket
+        file. Bytes, and lines read as bytes, are decoded with encoding;
+        text is used as it is. Lines may end in '\n' or '\r\n'.
+
+        :example:
+
+        >>> conllu.read_sentences(sys.stdin)
+        <generator object CoNLLU.read_sentences at 0x7f05ad359780>
+
+        >>> list(conllu.read_sentences(b"1\tO\to\t(...)\n\n1\tE\te\t(...)"))
+        ['1\tO\to\t(...)\n', '1\tE\te\t(...)']
+
+        :param source: CoNLL-U text, as str or bytes, or lines of it, as
+            str or bytes with their line endings
+        :type source: str, bytes or iterable
+        :param encoding: encoding used to decode bytes
+        :type encoding: str
         :return: generator producing strings with CoNLL-U sentences
         :rtype: str
         """
         raw_sentence = ""
-        try:
-            with open(ifile) as fhi:
-                for line in fhi:
-                    line = line.strip(" ")
-                    if line == "\n":
-                        if raw_sentence == "":
-                            continue
-                        yield raw_sentence
-                        raw_sentence = ""
-                        continue
-
-                    if line:
-                        raw_sentence += line
-
-            # yield remaining contents if file does not end in '\n\n'
-            if raw_sentence:
+        for line in self._iter_lines(source, encoding):
+            line = line.strip(" ")
+            if line.endswith("\r\n"):
+                line = line[:-2] + "\n"
+            if line == "\n":
+                if raw_sentence == "":
+                    continue
                 yield raw_sentence
-        except IOError:
-            print("Unable to read file: " + ifile)
-            sys.exit()
+                raw_sentence = ""
+                continue
+
+            if line:
+                raw_sentence += line
+
+        # yield remaining contents if file does not end in '\n\n'
+        if raw_sentence:
+            yield raw_sentence
+
+    def parse_sentences(self, source, encoding=DEFAULT_ENCODING):
+        """Parse CoNLL-U sentences from any source
+
+        :example:
+
+        >>> for sentence in conllu.parse_sentences(sys.stdin.buffer):
+        ...     print(conllu.get_sentence_id(sentence))
+
+        :param source: CoNLL-U text or lines, as in read_sentences()
+        :type source: str, bytes or iterable
+        :param encoding: encoding used to decode bytes
+        :type encoding: str
+        :return: generator producing sentences represented as Sentence objects
+        :rtype: Sentence
+        """
+        for raw_sentence in self.read_sentences(source, encoding):
+            yield self.parse_sentence(raw_sentence)
+
+    def split_sentences(self, text):
+        """Split CoNLL-U text in memory into raw sentences
+
+        It returns the same sentences as read_sentences(), finding the
+        boundaries with a single regular expression scan of the text instead
+        of a loop over its lines.
+
+        :example:
+
+        >>> conllu.split_sentences(u"1\tO\to\t(...)\n\n1\tE\te\t(...)\n")
+        ['1\tO\to\t(...)\n', '1\tE\te\t(...)\n']
+
+        :param text: CoNLL-U text
+        :type text: str
+        :return: raw CoNLL-U sentences
+        :rtype: list
+        """
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        if (text.startswith(" ") or text.endswith(" ") or " \n" in text or
+                "\n " in text):
+            # lines are stripped of spaces by read_sentences()
+            return list(self.read_sentences(text))
+
+        text = text.lstrip("\n")
+        end = len(text.rstrip("\n"))
+        if not end:
+            return []
+        raw_sentences = _SENTENCE_BOUNDARY.split(text[:end])
+        last = raw_sentences.pop()
+        raw_sentences = [raw + "\n" for raw in raw_sentences]
+        raw_sentences.append(last + "\n" if end < len(text) else last)
+        return raw_sentences
+
+    def parse_string(self, text, lazy=False):
+        """Parse all the CoNLL-U sentences of a string
+
+        :example:
+
+        >>> sentences = conllu.parse_string(response.text)
+
+        :param text: CoNLL-U text
+        :type text: str
+        :param lazy: return a generator instead of a list
+        :type lazy: bool
+        :return: sentences represented as Sentence objects
+        :rtype: list
+        """
+        raw_sentences = self.split_sentences(text)
+        if lazy:
+            return (self.parse_sentence(raw) for raw in raw_sentences)
+        parse_sentence = self.parse_sentence
+        return [parse_sentence(raw) for raw in raw_sentences]
+
+    def parse_bytes(self, data, encoding=DEFAULT_ENCODING, lazy=False):
+        """Parse all the CoNLL-U sentences of a bytes buffer
+
+        :param data: CoNLL-U text
+        :type data: bytes
+        :param encoding: encoding of the text
+        :type encoding: str
+        :param lazy: return a generator instead of a list
+        :type lazy: bool
+        :return: sentences represented as Sentence objects
+        :rtype: list
+        """
+        return self.parse_string(data.decode(encoding), lazy)
+
+    def parse_batch(self, documents, encoding=DEFAULT_ENCODING):
+        """Parse several CoNLL-U documents in a single call
+
+        Methods are looked up once for the whole batch, which matters for
+        many short documents such as the responses of a service.
+
+        :example:
+
+        >>> conllu.parse_batch([first_response, second_response])
+        [[Sentence(...), Sentence(...)], [Sentence(...)]]
+
+        :param documents: CoNLL-U texts, as str or bytes
+        :type documents: list
+        :param encoding: encoding used to decode bytes
+        :type encoding: str
+        :return: list of the sentences of each document
+        :rtype: list
+        """
+        split_sentences = self.split_sentences
+        parse_sentence = self.parse_sentence
+        return [
+            [parse_sentence(raw) for raw in split_sentences(
+                document.decode(encoding) if isinstance(document, bytes)
+                else document)]
+            for document in documents]
 
     def generate_conllu_sentence(self, sentence):
         """Produce a CoNLL-U sentence
@@ -191,7 +446,7 @@ class CoNLLU:
         :return: sentence in CoNLL-U format
         :rtype: str
         """
-        tokens = deepcopy(sentence.tokens)
+        tokens = list(sentence.tokens)
 
         # Contractions
         for contraction in reversed(sentence.contractions):
@@ -220,6 +475,65 @@ class CoNLLU:
         return "\n".join([
             self.generate_conllu_sentence(sentence) for sentence in sentences])
 
+    def write_conllu_file(
+            self, sentences, ofile, encoding=DEFAULT_ENCODING):
+        """Write sentences in CoNLL-U format, one at a time
+
+        Unlike generate_conllu_file(), the output is never held in memory
+        as a whole, so it works on streams of any size. Each sentence is
+        followed by a blank line.
+
+        :example:
+
+        >>> conllu.write_conllu_file(
+        ...     conllu.parse_file("corpus.conllu"), "copy.conllu")
+        12000
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param ofile: filename or text file object
+        :type ofile: str or file
+        :param encoding: encoding of the file
+        :type encoding: str
+        :return: number of sentences written
+        :rtype: int
+        """
+        if not isinstance(ofile, (str, _TEXT_TYPE)):
+            return self._write_sentences(sentences, ofile)
+        with io.open(ofile, "w", encoding=encoding) as fho:
+            return self._write_sentences(sentences, fho)
+
+    def dump_sentences(self, sentences):
+        """Serialize a batch of sentences into bytes
+
+        Sentences are pickled with their compact representation (see
+        Sentence.__reduce__), which packs the tokens of each sentence in a
+        flat tuple. It is meant for sending batches of sentences through
+        multiprocessing queues or pipes; load them with load_sentences().
+
+        :example:
+
+        >>> data = conllu.dump_sentences(sentences)
+        >>> conllu.load_sentences(data) == sentences
+        True
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :return: serialized sentences
+        :rtype: bytes
+        """
+        return pickle.dumps(list(sentences), pickle.HIGHEST_PROTOCOL)
+
+    def load_sentences(self, data):
+        """Deserialize a batch of sentences produced by dump_sentences()
+
+        :param data: serialized sentences
+        :type data: bytes
+        :return: list of Sentence objects
+        :rtype: list
+        """
+        return pickle.loads(data)
+
     def get_lemmas(self, sentence):
         """Return lemmas in a sentence.
 
@@ -240,6 +554,37 @@ class CoNLLU:
         """
         return [self._get_lemma(token) for token in sentence.tokens]
 
+    def normalize_lemmas(self, forms, lemmas, upostags, xpostags):
+        """Return lemmas from columns of token fields.
+
+        It applies the same rule as get_lemmas() (the wordform is used for
+        proper names) to parallel sequences of fields, such as the columns of
+        a batch of tokens.
+
+        :example:
+
+        >>> conllu.normalize_lemmas(
+        ...     ["O", "GIM", "subiu"], ["o", "gim", "subir"],
+        ...     ["DET", "PROPN", "VERB"], ["DET", "NP00000", "VMIS3S0"])
+        ['o', 'GIM', 'subir']
+
+        :param forms: wordforms
+        :type forms: iterable
+        :param lemmas: lemmas
+        :type lemmas: iterable
+        :param upostags: universal part-of-speech tags
+        :type upostags: iterable
+        :param xpostags: language specific part-of-speech tags
+        :type xpostags: iterable
+        :return: list of lemmas
+        :rtype: list
+        """
+        is_propername_pair = self._is_propername_pair
+        return [
+            form if is_propername_pair(tags) else lemma
+            for form, lemma, tags in zip(
+                forms, lemmas, zip(xpostags, upostags))]
+
     def get_wordforms(self, sentence):
         """Return wordforms in a sentence.
 
@@ -284,13 +629,30 @@ class CoNLLU:
         :return: sentence text
         :rtype: str
         """
-        try:
-            return re.search(TEXT_PATTERN, sentence.comments).group(1)
-        except AttributeError:
-            pass
+        text = sentence.metadata.get("text")
+        if text is not None:
+            return text
 
         return " ".join(self.get_wordforms(sentence))
 
+    def get_sentence_id(self, sentence):
+        """Return sentence ID.
+
+        It returns the sentence ID as included in the comment
+        'sent_id = ...', or None if the comment does not exist.
+
+        :example:
+
+        >>> conllu.get_sentence_id(sentence)
+        '203'
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :return: sentence ID
+        :rtype: str
+        """
+        return sentence.metadata.get("sent_id")
+
     def get_root(self, sentence):
         """Return the root of the sentence.
 
@@ -389,6 +751,103 @@ class CoNLLU:
             ) for token in sentence.tokens if token.head == int(head)
         ]
 
+    def get_tree(self, sentence):
+        """Return the dependency tree of a sentence
+
+        It returns a DependencyTree, which indexes children, ancestors,
+        depths and subtrees of every token once, so that subtree and
+        ancestor queries do not need repeated calls to get_deps_from_head().
+
+        :example:
+
+        >>> tree = conllu.get_tree(sentence)
+        >>> tree.subtree(9)
+        [9, 7, 8]
+        >>> tree.ancestors(9)
+        [6, 2]
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :return: dependency tree of the sentence
+        :rtype: DependencyTree
+        """
+        return DependencyTree(sentence)
+
+    def get_dependency_paths(
+            self, sentence, pairs, field="upostag", tree=None):
+        """Return the labelled dependency paths between pairs of tokens
+
+        Each path is a list with the DEPREL of the arcs walked up from the
+        first token (with an up arrow), the value of a field for the tokens
+        in between, including the lowest common ancestor, and the DEPREL of
+        the arcs walked down to the second token (with a down arrow). Labels
+        are built once per sentence, and paths use the O(1) lowest common
+        ancestor queries of DependencyTree.paths().
+
+        :example:
+
+        >>> conllu.get_dependency_paths(sentence, [(4, 8), (9, 2)])
+        [['det↑', 'NOUN', '↓nmod', 'NOUN', '↓det'], ['nmod↑', 'NOUN', 'nmod↑']]
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :param pairs: (first, second) token IDs
+        :type pairs: iterable
+        :param field: Token attribute of the tokens in between
+        :type field: str
+        :param tree: tree of the sentence, built if not given
+        :type tree: DependencyTree
+        :return: one list of labels per pair
+        :rtype: list
+        """
+        tree = tree or self.get_tree(sentence)
+        tokens = sentence.tokens
+        ups = [None] + [
+            u"{}\u2191".format(token.deprel) for token in tokens]
+        downs = [None] + [
+            u"\u2193{}".format(token.deprel) for token in tokens]
+        nodes = [None] + [getattr(token, field) for token in tokens]
+
+        depths = tree.depths
+        paths = []
+        for path in tree.paths(pairs):
+            last = len(path) - 1
+            # position of the lowest common ancestor in the path
+            top = (last + depths[path[0]] - depths[path[-1]]) // 2
+            labels = []
+            for position in range(last):
+                if position < top:
+                    labels.append(ups[path[position]])
+                else:
+                    labels.append(downs[path[position + 1]])
+                if position + 1 < last:
+                    labels.append(nodes[path[position + 1]])
+            paths.append(labels)
+        return paths
+
+    def get_enhanced_graph(self, sentence, use_basic=False):
+        """Return the enhanced dependency graph of a sentence
+
+        It returns an EnhancedGraph indexing the DEPS edges of tokens and
+        empty nodes, with the in- and out-edges of every node.
+
+        :example:
+
+        >>> graph = conllu.get_enhanced_graph(sentence)
+        >>> graph.heads(4)
+        [(6, 'nsubj'), ('8.1', 'nsubj')]
+        >>> graph.dependents('8.1')
+        [(4, 'nsubj'), (9, 'obj')]
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :param use_basic: use HEAD and DEPREL for tokens without DEPS
+        :type use_basic: bool
+        :return: enhanced dependency graph of the sentence
+        :rtype: EnhancedGraph
+        """
+        return EnhancedGraph(sentence, use_basic=use_basic)
+
     def get_headdep_triples(self, sentence):
         """Return all dependency triples in a sentence
 
@@ -417,18 +876,10 @@ class CoNLLU:
         :return: list of head-deps in a sentence
         :rtype: list
         """
-        lemmas = self.get_lemmas(sentence)
         return [
-            HeadDep(
-                head=lemmas[token.head - 1],
-                dep=token.lemma,
-                relation=token.deprel,
-                position=(
-                    token.head - 1,
-                    idx
-                )
-            )
-            for idx, token in enumerate(sentence.tokens) if token.head > 0
+            HeadDep(head, dep, relation, (head_idx, dep_idx))
+            for head, dep, relation, head_idx, dep_idx
+            in self.iter_headdep_triples([sentence])
         ]
 
     def get_headdep_triples_in_deprel(self, deprel, sentence):
@@ -451,11 +902,135 @@ class CoNLLU:
         :rtype: list
         """
         return [
-            headdep
-            for headdep in self.get_headdep_triples(sentence)
-            if headdep.relation == deprel
+            HeadDep(head, dep, relation, (head_idx, dep_idx))
+            for head, dep, relation, head_idx, dep_idx
+            in self.iter_headdep_triples([sentence], deprels=[deprel])
         ]
 
+    def iter_headdep_triples(
+            self, sentences, deprels=None, head_upostags=None,
+            dep_upostags=None):
+        """Produce dependency triples from a stream of sentences
+
+        It yields the same relations as get_headdep_triples() as plain
+        tuples (head, dep, relation, head index, dep index), without building
+        HeadDep objects or lists. Filters are applied before any tuple is
+        built. Pass parse_file() to stream the triples of a whole file.
+
+        :example:
+
+        >>> triples = conllu.iter_headdep_triples(
+        ...     conllu.parse_file("corpus.conllu"), deprels=["amod"],
+        ...     head_upostags=["NOUN"])
+        >>> next(triples)
+        ('hotél', 'principal', 'amod', 5, 4)
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param deprels: dependency relations to be included
+        :type deprels: iterable
+        :param head_upostags: UPOS tags of the heads to be included
+        :type head_upostags: iterable
+        :param dep_upostags: UPOS tags of the dependents to be included
+        :type dep_upostags: iterable
+        :return: generator producing tuples
+        :rtype: tuple
+        """
+        deprels = self._as_filter(deprels)
+        head_upostags = self._as_filter(head_upostags)
+        dep_upostags = self._as_filter(dep_upostags)
+        is_propername_pair = self._is_propername_pair
+
+        for sentence in sentences:
+            tokens = sentence.tokens
+            for idx, token in enumerate(tokens):
+                head = token.head
+                if not head or head < 0:
+                    continue
+                if deprels is not None and token.deprel not in deprels:
+                    continue
+                if dep_upostags is not None and (
+                        token.upostag not in dep_upostags):
+                    continue
+                head_token = tokens[head - 1]
+                if head_upostags is not None and (
+                        head_token.upostag not in head_upostags):
+                    continue
+
+                yield (
+                    head_token.form if is_propername_pair(
+                        (head_token.xpostag, head_token.upostag))
+                    else head_token.lemma,
+                    token.lemma,
+                    token.deprel,
+                    head - 1,
+                    idx,
+                )
+
+    def write_headdep_triples(
+            self, sentences, ofile, delimiter="\t", buffer_size=1 << 20,
+            **filters):
+        """Write dependency triples from a stream of sentences to a file
+
+        It writes the tuples produced by iter_headdep_triples() as delimited
+        rows (TSV by default, CSV with delimiter=","), through a buffered
+        writer.
+
+        :example:
+
+        >>> conllu.write_headdep_triples(
+        ...     conllu.parse_file("corpus.conllu"), "triples.tsv",
+        ...     deprels=["nmod"])
+        2153
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param ofile: filename or text file object
+        :type ofile: str
+        :param delimiter: field delimiter
+        :type delimiter: str
+        :param buffer_size: size of the output buffer in bytes
+        :type buffer_size: int
+        :param filters: deprels, head_upostags and dep_upostags filters, as
+            in iter_headdep_triples()
+        :return: number of triples written
+        :rtype: int
+        """
+        counter = itertools.count()
+        triples = (
+            triple for triple, _ in zip(
+                self.iter_headdep_triples(sentences, **filters), counter))
+        if hasattr(ofile, "write"):
+            self._write_rows(ofile, triples, delimiter)
+        else:
+            with io.open(
+                    ofile, "w", encoding="utf-8", newline="",
+                    buffering=buffer_size) as fho:
+                self._write_rows(fho, triples, delimiter)
+
+        return next(counter)
+
+    def _write_sentences(self, sentences, fho):
+        count = 0
+        for sentence in sentences:
+            fho.write(self.generate_conllu_sentence(sentence) + "\n")
+            count += 1
+        return count
+
+    @staticmethod
+    def _write_rows(fho, rows, delimiter):
+        csv.writer(
+            fho, delimiter=delimiter, lineterminator="\n").writerows(rows)
+
+    @staticmethod
+    def _as_filter(values):
+        """
+        It converts an optional collection of values into a set.
+        """
+        if values is None:
+            return None
+        return frozenset(values)
+
     def _format_comments(self, comments):
         """
         It adds a newline character to the comments when needed.
@@ -476,19 +1051,50 @@ class CoNLLU:
         """
         It determines if a token is a proper name given its PoS tag.
         """
-        if re.match(PNAME_PATTERN, tag):
+        if tag is not None and self.propername_pattern.match(tag):
             return True
         return False
 
+    def _is_propername_pair(self, tags):
+        """
+        It determines if a token is a proper name given its (xpostag,
+        upostag) pair, and memoizes the result so each pair of tags is only
+        matched once.
+        """
+        try:
+            return self._propername_tags[tags]
+        except KeyError:
+            is_propername = (
+                self._is_propername(tags[0]) or self._is_propername(tags[1]))
+            self._propername_tags[tags] = is_propername
+            return is_propername
+
     def _get_lemma(self, token):
         """
         It returns the correct lemma for a token: wordform if the token is a
         proper name, lemma in other cases.
         """
-        return token.form if (
-            self._is_propername(token.xpostag) or
-            self._is_propername(token.upostag)
-        ) else token.lemma
+        if self._is_propername_pair((token.xpostag, token.upostag)):
+            return token.form
+        return token.lemma
+
+    @staticmethod
+    def _iter_lines(source, encoding):
+        """
+        It returns the lines of a CoNLL-U source as text.
+        """
+        if isinstance(source, bytes):
+            source = source.decode(encoding)
+        if isinstance(source, _TEXT_TYPE):
+            return io.StringIO(source)
+
+        lines = iter(source)
+        for first in lines:
+            lines = itertools.chain([first], lines)
+            if isinstance(first, bytes):
+                return codecs.iterdecode(lines, encoding)
+            return lines
+        return lines
 
     def _is_contraction(self, line):
         """
@@ -586,18 +1192,32 @@ class CoNLLU:
 
     def _parse_paired_list_value(self, value):
         """
+        It parses a DEPS value into a list of (deprel, head) pairs. Heads are
+        integers, except for empty nodes, which keep their decimal ID as a
+        string (e.g. '8.1'). Values that are not valid DEPS are kept as
+        strings.
+
         Parser adapted from conllu package
         https://github.com/EmilStenstrom/conllu
         """
         if re.match(MULTI_DEPS_PATTERN, value):
             return [
-                (part.split(":", 1)[1], self._parse_int_value(
-                    part.split(":", 1)[0]))
-                for part in value.split("|")
+                (deprel, self._parse_deps_head(head))
+                for head, _, deprel in (
+                    part.partition(":") for part in value.split("|"))
             ]
 
         return self._parse_nullable_value(value)
 
+    def _parse_deps_head(self, value):
+        """
+        It parses the head of an enhanced dependency: an integer for tokens
+        and the root, the ID string for empty nodes.
+        """
+        if "." in value:
+            return value
+        return int(value)
+
     def _parse_dict_value(self, value):
         """
         Parser adapted from conllu package
@@ -0,0 +1,789 @@
+# -*- coding: utf-8 -*-
+import argparse
+import codecs
+import errno
+import io
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+from collections import Counter, deque, OrderedDict
+from functools import partial
+from itertools import islice
+from .CoNLLU import CoNLLU, DEFAULT_ENCODING
+from .Concordance import Concordance, DEFAULT_CONTEXT
+from .DependencyTree import DependencyTree
+from .FeatureBits import FeatureBits
+from .MemoryProfiler import (
+    DEFAULT_SAMPLE_SIZE, estimate_tokens, MemoryProfiler)
+from .NgramCounter import (
+    CONTRACTION_MODES, DEFAULT_MAX_N, NGRAM_FIELDS, NgramCounter)
+from .ProgressReporter import byte_size, file_position, ProgressReporter
+from .Relabeler import Relabeler
+from .Sentence import Sentence
+from .SyntacticNgramCounter import SyntacticNgramCounter
+from .Token import FIELDS, Token
+
+DEFAULT_CHUNK_SIZE = 256
+FORMATS = ('conllu', 'json', 'text')
+STATS_FIELDS = ('upostag', 'deprel')
+TOKEN_FILTERS = ('form', 'lemma', 'upostag', 'deprel')
+
+# parser used by the worker processes
+_conllu = CoNLLU()
+# CoNLL-U form of the fields whose values are not strings
+_EXPANDERS = {
+    'feats': Token._expand_features,
+    'deps': Token._expand_deps,
+    'misc': Token._expand_misc,
+}
+
+
+class CommandLine(object):
+    """The pyconllu console command."""
+    def __init__(self, stdin=None, stdout=None, stderr=None):
+        """
+        Constructor of CommandLine.
+
+        Every subcommand reads CoNLL-U from the files given as arguments, or
+        from stdin, one sentence at a time, and writes to stdout. Sentences
+        are parsed in chunks by --jobs worker processes; results are written
+        in input order and only a bounded number of chunks is in flight, so
+        memory does not grow with the input. Commands that write the input
+        sentences, such as split and sample, parse them to reject invalid
+        sentences.
+
+        :param stdin: stream read when no input file is given
+        :param stdout: stream where results are written
+        :param stderr: stream where errors and summaries are written
+        """
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.stderr = stderr or sys.stderr
+
+    def run(self, argv=None):
+        """Run the command with a list of arguments
+
+        :example:
+
+        >>> CommandLine().run(["stats", "--jobs", "4", "corpus.conllu"])
+        sentences	12000
+        tokens	184013
+        (...)
+
+        :param argv: command-line arguments, sys.argv[1:] by default
+        :type argv: list
+        :return: exit status
+        :rtype: int
+        """
+        args = self._build_parser().parse_args(argv)
+        if args.jobs < 0:
+            return self._error("--jobs must be a positive integer or 0")
+        if args.jobs == 0:
+            args.jobs = multiprocessing.cpu_count()
+
+        try:
+            return getattr(self, args.command)(args)
+        except IOError as error:
+            if error.errno == errno.EPIPE:
+                # output closed by the reader, e.g. piped to head
+                return 0
+            return self._error(error)
+        except Exception as error:
+            return self._error(error)
+
+    def stats(self, args):
+        """
+        It writes the number of sentences and tokens, the table of sentence
+        lengths and the frequency tables of some fields, as TSV rows.
+        """
+        sentences = 0
+        tokens = 0
+        lengths = Counter()
+        fields = args.field or list(STATS_FIELDS)
+        frequencies = OrderedDict((field, Counter()) for field in fields)
+
+        for chunk in self._map(partial(_stats_chunk, fields), args):
+            sentences += chunk[0]
+            tokens += chunk[1]
+            lengths.update(chunk[2])
+            for field, counter in chunk[3].items():
+                frequencies[field].update(counter)
+
+        self._write_row("sentences", sentences)
+        self._write_row("tokens", tokens)
+        for length in sorted(lengths):
+            self._write_row("length", length, lengths[length])
+        for field, counter in frequencies.items():
+            for value, count in counter.most_common(args.top):
+                self._write_row(field, value, count)
+        return 0
+
+    def grep(self, args):
+        """
+        It writes the sentences that match all the given criteria, as they
+        appear in the input.
+        """
+        for chunk in self._map(partial(_grep_chunk, args), args):
+            for raw_sentence in chunk:
+                self.stdout.write(raw_sentence + "\n")
+        return 0
+
+    def convert(self, args):
+        """
+        It converts sentences between CoNLL-U, JSON lines and plain text.
+        """
+        if args.source == "text":
+            return self._error("plain text can not be converted back")
+
+        for chunk in self._map(partial(_convert_chunk, args), args):
+            for output in chunk:
+                self.stdout.write(output)
+        return 0
+
+    def relabel(self, args):
+        """
+        It applies the mapping rules of a JSON file to the labels of the
+        sentences and writes them in CoNLL-U, without parsing them.
+        """
+        with io.open(args.rules, encoding="utf-8") as fhi:
+            rules = json.load(fhi, object_pairs_hook=OrderedDict)
+        Relabeler(rules)
+        for chunk in self._map(partial(_relabel_chunk, rules), args):
+            for raw_sentence in chunk:
+                self.stdout.write(raw_sentence + "\n")
+        return 0
+
+    def validate(self, args):
+        """
+        It reports sentences with format errors or invalid trees. The exit
+        status is 1 if any error was found.
+        """
+        errors = 0
+        sentences = 0
+        for chunk in self._map(_validate_chunk, args):
+            sentences += chunk[0]
+            for idx, sent_id, message in chunk[1]:
+                errors += 1
+                name = str(idx + 1)
+                if sent_id is not None:
+                    name += " ({})".format(sent_id)
+                self.stdout.write(
+                    "sentence {}: {}\n".format(name, message))
+
+        self.stderr.write(
+            "{} errors in {} sentences\n".format(errors, sentences))
+        return 1 if errors else 0
+
+    def split(self, args):
+        """
+        It writes the sentences to several files: consecutive runs of --size
+        sentences, or --parts files filled in turns.
+        """
+        if (args.size is None) == (args.parts is None):
+            return self._error("split needs either --size or --parts")
+
+        files = {}
+        try:
+            for idx, raw_sentence in enumerate(self._parsed_units(args)):
+                if args.size:
+                    part = idx // args.size
+                else:
+                    part = idx % args.parts
+                if part not in files:
+                    if args.size:
+                        # consecutive runs: the previous file is complete
+                        for fho in files.values():
+                            fho.close()
+                    files[part] = io.open(
+                        "{}{:03d}.conllu".format(args.prefix, part + 1),
+                        "w", encoding="utf-8")
+                files[part].write(raw_sentence + "\n")
+        finally:
+            for fho in files.values():
+                fho.close()
+
+        self.stderr.write("{} files written\n".format(len(files)))
+        return 0
+
+    def sample(self, args):
+        """
+        It writes a random sample of the sentences, in input order: --size
+        sentences with reservoir sampling, or each sentence with probability
+        --fraction.
+        """
+        if (args.size is None) == (args.fraction is None):
+            return self._error("sample needs either --size or --fraction")
+
+        generator = random.Random(args.seed)
+        units = enumerate(self._parsed_units(args))
+
+        if args.fraction is not None:
+            for _, raw_sentence in units:
+                if generator.random() < args.fraction:
+                    self.stdout.write(raw_sentence + "\n")
+            return 0
+
+        reservoir = list(islice(units, args.size))
+        for idx, raw_sentence in units:
+            position = generator.randint(0, idx)
+            if position < args.size:
+                reservoir[position] = (idx, raw_sentence)
+
+        for _, raw_sentence in sorted(reservoir):
+            self.stdout.write(raw_sentence + "\n")
+        return 0
+
+    def memory(self, args):
+        """
+        It writes the memory used by the representations of the first
+        sentences of the input, projected to the size of the input files.
+        """
+        units = self._parsed_units(args)
+        try:
+            sample = list(islice(units, args.sample_size))
+        finally:
+            units.close()
+        corpus_tokens = None
+        if args.input and "-" not in args.input:
+            corpus_tokens = estimate_tokens(
+                sample, sum(os.path.getsize(ifile) for ifile in args.input))
+
+        report = MemoryProfiler(conllu=_conllu).profile(sample, corpus_tokens)
+        self.stdout.write(MemoryProfiler.format(report) + "\n")
+        return 0
+
+    def concordance(self, args):
+        """
+        It writes the KWIC lines of a lemma or form, building the index of
+        the corpus first if it is missing or outdated.
+        """
+        field, value = ("form", args.form) if args.form else (
+            "lemma", args.lemma)
+        if value is None or len(args.input) != 1 or args.input == ["-"]:
+            return self._error(
+                "concordance needs a corpus file and --lemma or --form")
+
+        with Concordance(args.input[0], encoding=args.encoding) as index:
+            if args.rebuild or not index.is_current():
+                progress = None
+                if args.progress:
+                    progress = ProgressReporter(stream=self.stderr)
+                index.build(
+                    progress=progress, jobs=args.jobs,
+                    chunk_size=args.chunk_size)
+            for line in index.lines(
+                    value, field, context=args.context, sort=args.sort,
+                    limit=args.limit):
+                self.stdout.write(
+                    Concordance.format(line, width=args.width) + "\n")
+        return 0
+
+    def ngrams(self, args):
+        """
+        It counts n-grams, or dependency paths with --syntactic, in chunks
+        of sentences and writes them by decreasing count, as TSV rows with
+        the size, values and count of each n-gram, or to one file per size
+        with --prefix.
+        """
+        if args.syntactic:
+            counter_class = SyntacticNgramCounter
+            settings = dict(
+                template=args.template or "{" + args.field + "}",
+                deprels=not args.no_deprels)
+        else:
+            counter_class = NgramCounter
+            settings = dict(field=args.field, contractions=args.contractions)
+        settings["max_n"] = args.max_n
+
+        with counter_class(
+                min_count=args.min_count, max_entries=args.max_entries,
+                spill_dir=args.spill_dir, conllu=_conllu,
+                **settings) as counter:
+            for counts in self._map(
+                    partial(_ngrams_chunk, counter_class, settings), args):
+                counter.merge_counts(counts)
+
+            if args.prefix:
+                for ofile in counter.write(args.prefix):
+                    self._write_row(ofile)
+                return 0
+            for n in range(1, args.max_n + 1):
+                if args.top is None:
+                    items = counter.items_by_count(n)
+                else:
+                    items = counter.most_common(n, args.top)
+                for ngram, count in items:
+                    self._write_row(n, *(ngram + (count,)))
+        return 0
+
+    def _map(self, function, args):
+        """
+        It applies a function to chunks of (index, sentence) pairs and
+        produces the results in input order, in --jobs processes.
+        """
+        units = enumerate(self._read_units(args))
+        chunks = iter(lambda: list(islice(units, args.chunk_size)), [])
+
+        if args.jobs == 1:
+            for chunk in chunks:
+                yield function(chunk)
+            return
+
+        pool = multiprocessing.Pool(args.jobs)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(function, (chunk,)))
+                if len(pending) >= 2 * args.jobs:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _parsed_units(self, args):
+        """
+        It produces the units of the input, as _read_units(), once they are
+        parsed by _map() to check that they are valid.
+        """
+        for chunk in self._map(partial(_parse_chunk, args), args):
+            for unit in chunk:
+                yield unit
+
+    def _read_units(self, args):
+        """
+        It reads the input files, or stdin, and produces raw CoNLL-U
+        sentences or, for JSON input, non-empty lines. With --progress, the
+        units are counted as they are read; with --jobs, reading is at most
+        two chunks per worker ahead of parsing.
+        """
+        if not args.progress:
+            for unit in self._read_files(args):
+                yield unit
+            return
+
+        inputs = args.input or ["-"]
+        progress = ProgressReporter(stream=self.stderr)
+        if "-" in inputs:
+            progress.start()
+        else:
+            progress.start(sum(os.path.getsize(ifile) for ifile in inputs))
+
+        for unit in self._read_files(args, progress):
+            yield unit
+        progress.finish()
+
+    def _read_files(self, args, progress=None):
+        """
+        It produces the units of the input files. Bytes are counted from the
+        positions of the files, or by encoding the units if a file can not
+        tell its position, e.g. a pipe.
+        """
+        json_lines = getattr(args, "source", "conllu") == "json"
+        # size of the files already read
+        done = 0
+        for ifile in args.input or ["-"]:
+            if ifile != "-":
+                fhi = io.open(ifile, encoding=args.encoding)
+                position = file_position(fhi)
+            elif hasattr(self.stdin, "buffer"):
+                # decode the bytes of stdin with --encoding, not the locale
+                position = file_position(self.stdin.buffer)
+                fhi = codecs.iterdecode(self.stdin.buffer, args.encoding)
+            else:
+                position = file_position(self.stdin)
+                fhi = self.stdin
+            try:
+                if json_lines:
+                    units = (line for line in fhi if line.strip())
+                else:
+                    units = _conllu.read_sentences(fhi)
+                for unit in units:
+                    if progress is not None:
+                        current = None if position is None else (
+                            done + position())
+                        if not json_lines:
+                            progress.update_raw_sentence(unit, current)
+                        elif current is None:
+                            progress.update(1, 0, byte_size(unit))
+                        else:
+                            progress.update(1, 0, position=current)
+                    yield unit
+            finally:
+                if ifile != "-":
+                    fhi.close()
+            if ifile != "-":
+                done += os.path.getsize(ifile)
+
+    def _write_row(self, *values):
+        self.stdout.write("\t".join(str(value) for value in values) + "\n")
+
+    def _error(self, message):
+        self.stderr.write("pyconllu: error: {}\n".format(message))
+        return 2
+
+    def _build_parser(self):
+        common = argparse.ArgumentParser(add_help=False)
+        common.add_argument(
+            "input", nargs="*",
+            help="CoNLL-U files, stdin if none or '-' is given")
+        common.add_argument(
+            "--encoding", default=DEFAULT_ENCODING,
+            help="encoding of the input (default: {})".format(
+                DEFAULT_ENCODING))
+        common.add_argument(
+            "--progress", action="store_true",
+            help="report progress and throughput on stderr every second")
+        common.add_argument(
+            "-j", "--jobs", type=int, default=1,
+            help="number of worker processes, 0 for one per CPU")
+        common.add_argument(
+            "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+            help="number of sentences sent to a worker at once")
+
+        parser = argparse.ArgumentParser(
+            prog="pyconllu", description="Process files in CoNLL-U format.")
+        commands = parser.add_subparsers(dest="command", metavar="command")
+        commands.required = True
+
+        stats = commands.add_parser(
+            "stats", parents=[common],
+            help="frequency and sentence length tables")
+        stats.add_argument(
+            "-f", "--field", action="append", choices=FIELDS,
+            help="field to count, repeatable (default: upostag, deprel)")
+        stats.add_argument(
+            "--top", type=int, help="number of most frequent values shown")
+
+        grep = commands.add_parser(
+            "grep", parents=[common], help="filter sentences")
+        grep.add_argument(
+            "--sent-id", help="regular expression searched in sent_id")
+        for field in TOKEN_FILTERS:
+            grep.add_argument(
+                "--" + field, help="{} of a token".format(field.upper()))
+        grep.add_argument(
+            "--feats",
+            help="FEATS conditions of a token, e.g. "
+                 "'Gender=Fem & Number=Plur & VerbForm!=Inf'")
+        grep.add_argument(
+            "-e", "--pattern",
+            help="regular expression searched in the raw sentence")
+        grep.add_argument(
+            "-v", "--invert-match", action="store_true",
+            help="select the sentences that do not match")
+
+        convert = commands.add_parser(
+            "convert", parents=[common], help="convert between formats")
+        convert.add_argument(
+            "--from", dest="source", choices=FORMATS, default="conllu",
+            help="input format (default: conllu)")
+        convert.add_argument(
+            "--to", dest="target", choices=FORMATS, default="json",
+            help="output format (default: json)")
+
+        relabel = commands.add_parser(
+            "relabel", parents=[common], help="map labels to new values")
+        relabel.add_argument(
+            "--rules", required=True,
+            help="JSON file with a mapping table per field, e.g. "
+                 "'{\"deprel\": {\"dobj\": \"obj\"}}'")
+
+        commands.add_parser(
+            "validate", parents=[common],
+            help="check the format and the trees of the sentences")
+
+        split = commands.add_parser(
+            "split", parents=[common], help="split a corpus in files")
+        split.add_argument(
+            "--size", type=_positive_int,
+            help="number of sentences in each file")
+        split.add_argument(
+            "--parts", type=_positive_int, help="number of files")
+        split.add_argument(
+            "--prefix", default="part-",
+            help="prefix of the output files (default: part-)")
+
+        sample = commands.add_parser(
+            "sample", parents=[common], help="random sample of sentences")
+        sample.add_argument(
+            "--size", type=_positive_int, help="number of sentences")
+        sample.add_argument(
+            "--fraction", type=float, help="probability of each sentence")
+        sample.add_argument("--seed", type=int, help="random seed")
+
+        concordance = commands.add_parser(
+            "concordance", parents=[common],
+            help="keyword-in-context lines from an indexed corpus")
+        concordance.add_argument("--lemma", help="LEMMA looked up")
+        concordance.add_argument("--form", help="FORM looked up")
+        concordance.add_argument(
+            "--context", type=int, default=DEFAULT_CONTEXT,
+            help="number of words on each side (default: {})".format(
+                DEFAULT_CONTEXT))
+        concordance.add_argument(
+            "--sort", choices=("left", "right"), help="sort by context")
+        concordance.add_argument(
+            "--limit", type=int, help="maximum number of lines")
+        concordance.add_argument(
+            "--width", type=int, default=40,
+            help="number of characters of each context (default: 40)")
+        concordance.add_argument(
+            "--rebuild", action="store_true", help="rebuild the index")
+
+        ngrams = commands.add_parser(
+            "ngrams", parents=[common], help="n-gram counts")
+        ngrams.add_argument(
+            "-f", "--field", choices=NGRAM_FIELDS, default="form",
+            help="field of the n-grams (default: form)")
+        ngrams.add_argument(
+            "-n", "--max-n", type=int, default=DEFAULT_MAX_N,
+            help="largest n-gram size (default: {})".format(DEFAULT_MAX_N))
+        ngrams.add_argument(
+            "--contractions", choices=CONTRACTION_MODES, default="words",
+            help="count the words or the surface tokens of contractions "
+                 "(default: words)")
+        ngrams.add_argument(
+            "--syntactic", action="store_true",
+            help="count downward paths in the dependency trees")
+        ngrams.add_argument(
+            "--template",
+            help="label of the tokens of a path over the fields id, form, "
+                 "lemma, upostag, xpostag and deprel, e.g. "
+                 "'{lemma}/{upostag}' (default: the --field)")
+        ngrams.add_argument(
+            "--no-deprels", action="store_true",
+            help="leave the DEPREL of the arcs out of the paths")
+        ngrams.add_argument(
+            "--min-count", type=int, default=1,
+            help="minimum count of the n-grams written")
+        ngrams.add_argument(
+            "--max-entries", type=int,
+            help="maximum number of n-grams held in memory")
+        ngrams.add_argument(
+            "--spill-dir",
+            help="directory where counts beyond --max-entries are spilled, "
+                 "instead of pruning the least frequent n-grams")
+        ngrams.add_argument(
+            "--top", type=int, help="number of n-grams written per size")
+        ngrams.add_argument(
+            "--prefix", help="write one TSV file per size, named PREFIXN.tsv")
+
+        memory = commands.add_parser(
+            "memory", parents=[common],
+            help="memory used by the representations of a sample")
+        memory.add_argument(
+            "--sample-size", type=int, default=DEFAULT_SAMPLE_SIZE,
+            help="number of sentences measured (default: {})".format(
+                DEFAULT_SAMPLE_SIZE))
+
+        return parser
+
+
+def sentence_to_json(sentence):
+    """Return a JSON object with the contents of a sentence
+
+    Tokens are objects with the CoNLL-U fields; FEATS and MISC keep their
+    order, DEPS is a list of [deprel, head] pairs. Contractions and empty
+    nodes are [token, position] pairs, as in Sentence.
+
+    :param sentence: object with parsed sentence
+    :type sentence: Sentence
+    :rtype: str
+    """
+    return json.dumps(OrderedDict([
+        ("comments", sentence.comments),
+        ("tokens", [_token_to_json(token) for token in sentence.tokens]),
+        ("contractions", [
+            [_token_to_json(token), idx]
+            for token, idx in sentence.contractions]),
+        ("empty_nodes", [
+            [_token_to_json(token), idx]
+            for token, idx in sentence.empty_nodes]),
+    ]), ensure_ascii=False)
+
+
+def sentence_from_json(line):
+    """Build a sentence from a JSON object produced by sentence_to_json()
+
+    :param line: JSON object
+    :type line: str
+    :rtype: Sentence
+    """
+    data = json.loads(line, object_pairs_hook=OrderedDict)
+    return Sentence(
+        comments=data["comments"],
+        tokens=[_token_from_json(token) for token in data["tokens"]],
+        contractions=[
+            (_token_from_json(token), idx)
+            for token, idx in data["contractions"]],
+        empty_nodes=[
+            (_token_from_json(token), idx)
+            for token, idx in data["empty_nodes"]],
+    )
+
+
+def main():
+    sys.exit(CommandLine().run())
+
+
+def _token_to_json(token):
+    return OrderedDict((field, getattr(token, field)) for field in FIELDS)
+
+
+def _token_from_json(data):
+    if isinstance(data["deps"], list):
+        data["deps"] = [tuple(pair) for pair in data["deps"]]
+    return Token(**data)
+
+
+def _load_sentence(args, unit):
+    if getattr(args, "source", "conllu") == "json":
+        return sentence_from_json(unit)
+    return _conllu.parse_sentence(unit)
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            "{} is not a positive integer".format(value))
+    return number
+
+
+def _stats_chunk(fields, chunk):
+    """
+    It counts sentences, tokens, lengths and values of a chunk. Values are
+    counted as they are written in CoNLL-U, with '_' for missing values.
+    """
+    tokens = 0
+    lengths = Counter()
+    frequencies = dict((field, Counter()) for field in fields)
+    expanders = dict(
+        (field, _EXPANDERS.get(field, Token._expand_token))
+        for field in fields)
+    for _, raw_sentence in chunk:
+        sentence = _conllu.parse_sentence(raw_sentence)
+        tokens += len(sentence.tokens)
+        lengths[len(sentence.tokens)] += 1
+        for field, counter in frequencies.items():
+            expand = expanders[field]
+            counter.update(
+                expand(getattr(token, field)) for token in sentence.tokens)
+    return len(chunk), tokens, lengths, frequencies
+
+
+def _parse_chunk(args, chunk):
+    """
+    It parses the units of a chunk, which raises an error for invalid
+    sentences, and returns the units.
+    """
+    units = []
+    for _, unit in chunk:
+        _load_sentence(args, unit)
+        units.append(unit)
+    return units
+
+
+def _ngrams_chunk(counter_class, settings, chunk):
+    """
+    It counts the n-grams of a chunk.
+    """
+    counter = counter_class(conllu=_conllu, **settings)
+    counter.count(
+        _conllu.parse_sentence(raw_sentence) for _, raw_sentence in chunk)
+    return counter.counts
+
+
+def _grep_chunk(args, chunk):
+    """
+    It returns the raw sentences of a chunk that match the criteria of a
+    grep command. Token criteria must be met by the same token.
+    """
+    pattern = args.pattern and re.compile(args.pattern, re.MULTILINE)
+    sent_id = args.sent_id and re.compile(args.sent_id)
+    filters = [
+        (field, getattr(args, field)) for field in TOKEN_FILTERS
+        if getattr(args, field) is not None]
+    if args.feats is not None:
+        bits = FeatureBits()
+        query = bits.compile(args.feats, grow=True)
+        filters.append(
+            ("feats", lambda feats: query(bits.encode(feats, grow=False))))
+
+    matches = []
+    for _, raw_sentence in chunk:
+        match = pattern is None or bool(pattern.search(raw_sentence))
+        if match and (sent_id or filters):
+            sentence = _conllu.parse_sentence(raw_sentence)
+            if sent_id:
+                value = _conllu.get_sentence_id(sentence)
+                match = value is not None and bool(sent_id.search(value))
+            if match and filters:
+                match = any(
+                    all(value(getattr(token, field)) if callable(value)
+                        else getattr(token, field) == value
+                        for field, value in filters)
+                    for token in sentence.tokens)
+        if match != args.invert_match:
+            matches.append(raw_sentence)
+    return matches
+
+
+def _convert_chunk(args, chunk):
+    """
+    It converts the sentences of a chunk to the target format.
+    """
+    outputs = []
+    for _, unit in chunk:
+        sentence = _load_sentence(args, unit)
+        if args.target == "json":
+            outputs.append(sentence_to_json(sentence) + "\n")
+        elif args.target == "text":
+            outputs.append((_conllu.get_sentence_text(sentence) or "") + "\n")
+        else:
+            outputs.append(
+                _conllu.generate_conllu_sentence(sentence) + "\n")
+    return outputs
+
+
+def _relabel_chunk(rules, chunk):
+    """
+    It returns the raw sentences of a chunk with the rules applied.
+    """
+    relabeler = Relabeler(rules, conllu=_conllu)
+    return [relabeler.transform_raw(raw_sentence) for _, raw_sentence in chunk]
+
+
+def _validate_chunk(chunk):
+    """
+    It returns the number of sentences in a chunk and the (index, sent_id,
+    message) of their errors.
+    """
+    errors = []
+    for idx, raw_sentence in chunk:
+        try:
+            sentence = _conllu.parse_sentence(raw_sentence)
+        except Exception as error:
+            errors.append((idx, None, str(error)))
+            continue
+
+        sent_id = _conllu.get_sentence_id(sentence)
+        for position, token in enumerate(sentence.tokens, 1):
+            if token.id != str(position):
+                errors.append((idx, sent_id, "Unexpected token ID: {}".format(
+                    token.id)))
+                break
+        else:
+            roots = sum(1 for token in sentence.tokens if token.head == 0)
+            if roots != 1:
+                errors.append((idx, sent_id, "{} roots found".format(roots)))
+            try:
+                DependencyTree(sentence)
+            except Exception as error:
+                errors.append((idx, sent_id, str(error)))
+    return len(chunk), errors
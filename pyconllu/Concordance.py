@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+import io
+import multiprocessing
+import os
+import sqlite3
+from array import array
+from collections import deque, namedtuple
+from functools import partial
+from itertools import groupby, islice
+from .BlockedGzip import BlockedGzipReader
+from .CoNLLU import CoNLLU, DEFAULT_ENCODING
+
+INDEX_FORMAT = 1
+INDEX_SUFFIX = ".kwic"
+INDEX_FIELDS = ('form', 'lemma')
+DEFAULT_CONTEXT = 5
+FLUSH_TOKENS = 1 << 20
+PARSE_CHUNK_SIZE = 256
+
+KwicLine = namedtuple(
+    "KwicLine", ["sent_id", "sentence", "token", "left", "keyword", "right"])
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_SCHEMA = (
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE sentences ("
+    "sentence INTEGER PRIMARY KEY, offset INTEGER, sent_id TEXT)",
+    "CREATE TABLE postings ("
+    "field TEXT, value TEXT, chunk INTEGER, positions BLOB, "
+    "PRIMARY KEY (field, value, chunk)) WITHOUT ROWID",
+)
+
+
+class Concordance(object):
+    """Keyword-in-context lines from a CoNLL-U corpus with a persistent
+    index."""
+    def __init__(
+            self, corpus, index_file=None, encoding=DEFAULT_ENCODING,
+            conllu=None):
+        """
+        Constructor of Concordance.
+
+        The index is an SQLite file that maps each value of the indexed
+        fields to the (sentence, token) positions where it occurs, and each
+        sentence to its byte offset in the corpus. Lookups read the
+        positions of a single value and then only the sentences that hold
+        them. The corpus may be a plain CoNLL-U file or a file written by
+        BlockedGzipWriter, whose sentences are read by position.
+
+        :example:
+
+        >>> concordance = Concordance("corpus.conllu")
+        >>> if not concordance.is_current():
+        ...     concordance.build()
+        >>> for line in concordance.lines("casa", sort="right"):
+        ...     print(Concordance.format(line))
+
+        :param corpus: CoNLL-U filename
+        :type corpus: str
+        :param index_file: filename of the index, corpus + '.kwic' by default
+        :type index_file: str
+        :param encoding: encoding of the corpus
+        :type encoding: str
+        :param conllu: parser of the sentences
+        :type conllu: CoNLLU
+        """
+        self.corpus = corpus
+        self.index_file = index_file or corpus + INDEX_SUFFIX
+        self.encoding = encoding
+        self.conllu = conllu or CoNLLU()
+        with io.open(corpus, "rb") as fhi:
+            self.blocked = fhi.read(2) == _GZIP_MAGIC
+        self._connection = None
+        self._reader = None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._reader is not None and not self.blocked:
+            self._reader.close()
+        self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_current(self):
+        """Return True if the index exists and matches the corpus."""
+        if not os.path.exists(self.index_file):
+            return False
+        try:
+            meta = dict(self._connect().execute(
+                "SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            return False
+        return meta.get("format") == str(INDEX_FORMAT) and (
+            meta.get("stamp") == self._corpus_stamp())
+
+    def build(
+            self, fields=INDEX_FIELDS, progress=None, jobs=1,
+            chunk_size=PARSE_CHUNK_SIZE):
+        """Index the corpus, replacing any previous index
+
+        Positions are buffered in memory and written every FLUSH_TOKENS
+        tokens, so memory does not grow with the corpus. Sentences are
+        parsed in chunks by jobs processes, with at most two chunks per
+        process in flight.
+
+        :param fields: Token attributes to be indexed
+        :type fields: tuple
+        :param progress: reporter updated with the sentences indexed
+        :type progress: ProgressReporter
+        :param jobs: number of worker processes
+        :type jobs: int
+        :param chunk_size: number of sentences sent to a process at once
+        :type chunk_size: int
+        """
+        self.close()
+        if os.path.exists(self.index_file):
+            os.remove(self.index_file)
+
+        connection = self._connect()
+        for statement in _SCHEMA:
+            connection.execute(statement)
+
+        postings = {}
+        buffered = 0
+        chunk = 0
+        sentences = []
+        for number, (offset, sent_id, tokens) in enumerate(
+                self._iter_parsed(fields, jobs, chunk_size)):
+            sentences.append((number, offset, sent_id))
+            for position, values in enumerate(tokens):
+                for key in zip(fields, values):
+                    if key[1] is None:
+                        continue
+                    try:
+                        positions = postings[key]
+                    except KeyError:
+                        positions = postings[key] = array("I")
+                    positions.append(number)
+                    positions.append(position)
+            buffered += len(tokens)
+            if progress is not None:
+                progress.update(1, len(tokens))
+
+            if buffered >= FLUSH_TOKENS:
+                self._flush(connection, postings, chunk, sentences)
+                postings = {}
+                sentences = []
+                buffered = 0
+                chunk += 1
+
+        self._flush(connection, postings, chunk, sentences)
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("format", str(INDEX_FORMAT)),
+            ("stamp", self._corpus_stamp()),
+            ("fields", ",".join(fields)),
+        ])
+        connection.commit()
+        if progress is not None:
+            progress.finish()
+
+    def positions(self, value, field="lemma"):
+        """Return the (sentence, token) positions of a value
+
+        Sentences are numbered from 0 in corpus order and tokens are
+        positions in Sentence.tokens.
+
+        :param value: value to be looked up
+        :type value: str
+        :param field: indexed field
+        :type field: str
+        :return: positions in corpus order
+        :rtype: list
+        """
+        return list(self.iter_positions(value, field))
+
+    def iter_positions(self, value, field="lemma"):
+        """Produce the (sentence, token) positions of a value, reading the
+        postings one chunk at a time
+
+        :param value: value to be looked up
+        :type value: str
+        :param field: indexed field
+        :type field: str
+        :return: generator producing positions in corpus order
+        :rtype: tuple
+        """
+        for (blob,) in self._connect().execute(
+                "SELECT positions FROM postings WHERE field = ? AND value = ? "
+                "ORDER BY chunk", (field, value)):
+            flat = array("I")
+            _extend_from_blob(flat, blob)
+            for position in zip(flat[::2], flat[1::2]):
+                yield position
+
+    def sentence(self, number):
+        """Return the sentence at a position of the corpus
+
+        :param number: position of the sentence, from 0
+        :type number: int
+        :rtype: Sentence
+        """
+        offset, _ = self._sentence_row(number)
+        return self.conllu.parse_sentence(self._read_sentence(number, offset))
+
+    def lines(
+            self, value, field="lemma", context=DEFAULT_CONTEXT, sort=None,
+            limit=None):
+        """Produce the KWIC lines of a value
+
+        Lines are produced in corpus order as their sentences are read,
+        unless they are sorted by the left context (the words before the
+        keyword, from nearest to farthest) or the right context, which
+        needs all of them.
+
+        :example:
+
+        >>> next(concordance.lines("paciente", context=3))
+        KwicLine(sent_id='1', sentence=0, token=22, left=['GIM',
+        'carotídeo', 'en'], keyword='pacientes', right=['con', 'enfermedad',
+        'coronaria'])
+
+        :param value: value to be looked up
+        :type value: str
+        :param field: indexed field
+        :type field: str
+        :param context: number of words on each side
+        :type context: int
+        :param sort: None, 'left' or 'right'
+        :type sort: str
+        :param limit: maximum number of lines
+        :type limit: int
+        :return: generator producing KwicLine tuples, with the forms of the
+            context words
+        :rtype: KwicLine
+        """
+        if sort not in (None, "left", "right"):
+            raise ValueError("sort must be None, 'left' or 'right'")
+
+        lines = self._iter_lines(self.iter_positions(value, field), context)
+        if sort == "left":
+            lines = iter(sorted(lines, key=lambda line: line.left[::-1]))
+        elif sort == "right":
+            lines = iter(sorted(lines, key=lambda line: line.right))
+        return islice(lines, limit)
+
+    @staticmethod
+    def format(line, width=40):
+        """Return a KWIC line as text, with the keyword aligned
+
+        :example:
+
+        >>> Concordance.format(line, width=20)
+        '1\t    GIM carotídeo en  [pacientes]  con enfermedad coronaria'
+        """
+        left = " ".join(line.left)[-width:]
+        right = " ".join(line.right)[:width]
+        return u"{}\t{:>{width}}  [{}]  {}".format(
+            line.sent_id if line.sent_id is not None else line.sentence,
+            left, line.keyword, right, width=width)
+
+    def _iter_lines(self, positions, context):
+        """
+        It builds the KWIC lines of sorted positions, reading each sentence
+        once. Only the FORM column is split, the sentences are not parsed.
+        """
+        for number, group in groupby(positions, key=lambda item: item[0]):
+            offset, sent_id = self._sentence_row(number)
+            forms = [
+                fields[1] for fields in (
+                    line.split("\t", 2)
+                    for line in self._read_sentence(number, offset).split(
+                        "\n"))
+                if len(fields) > 2 and fields[0].isdigit()]
+            for _, token in group:
+                yield KwicLine(
+                    sent_id, number, token,
+                    forms[max(token - context, 0):token], forms[token],
+                    forms[token + 1:token + 1 + context])
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.index_file)
+        return self._connection
+
+    def _corpus_stamp(self):
+        stat = os.stat(self.corpus)
+        return "{}:{}".format(stat.st_size, stat.st_mtime)
+
+    def _iter_parsed(self, fields, jobs, chunk_size):
+        """
+        It produces the (byte offset, sent_id, field values of each token)
+        of the sentences, parsed in chunks by jobs processes, in order.
+        """
+        corpus = self._iter_corpus()
+        chunks = iter(lambda: list(islice(corpus, chunk_size)), [])
+        function = partial(_index_chunk, self.conllu, fields)
+
+        if jobs <= 1:
+            for chunk in chunks:
+                for parsed in function(chunk):
+                    yield parsed
+            return
+
+        pool = multiprocessing.Pool(jobs)
+        try:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(function, (chunk,)))
+                if len(pending) >= 2 * jobs:
+                    for parsed in pending.popleft().get():
+                        yield parsed
+            while pending:
+                for parsed in pending.popleft().get():
+                    yield parsed
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _iter_corpus(self):
+        """
+        It produces (byte offset, raw sentence) pairs; the offset is None
+        for blocked gzip corpora, which are read by sentence position.
+        """
+        if self.blocked:
+            for raw_sentence in BlockedGzipReader(
+                    self.corpus, self.encoding).iter_sentences():
+                yield None, raw_sentence
+            return
+
+        offset = 0
+        start = None
+        lines = []
+        with io.open(self.corpus, "rb") as fhi:
+            for line in fhi:
+                if line.strip():
+                    if start is None:
+                        start = offset
+                    lines.append(line)
+                elif lines:
+                    yield start, self._decode(lines)
+                    start = None
+                    lines = []
+                offset += len(line)
+        if lines:
+            yield start, self._decode(lines)
+
+    def _sentence_row(self, number):
+        row = self._connect().execute(
+            "SELECT offset, sent_id FROM sentences WHERE sentence = ?",
+            (number,)).fetchone()
+        if row is None:
+            raise IndexError("sentence index out of range")
+        return row
+
+    def _read_sentence(self, number, offset):
+        if self.blocked:
+            if self._reader is None:
+                self._reader = BlockedGzipReader(self.corpus, self.encoding)
+            return self._reader[number]
+
+        if self._reader is None:
+            self._reader = io.open(self.corpus, "rb")
+        self._reader.seek(offset)
+        lines = []
+        for line in self._reader:
+            if not line.strip():
+                break
+            lines.append(line)
+        return self._decode(lines)
+
+    def _decode(self, lines):
+        return next(self.conllu.read_sentences(
+            b"".join(lines), self.encoding))
+
+    @staticmethod
+    def _flush(connection, postings, chunk, sentences):
+        connection.executemany(
+            "INSERT INTO sentences VALUES (?, ?, ?)", sentences)
+        connection.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?, ?)", (
+                (field, value, chunk, _to_blob(positions))
+                for (field, value), positions in postings.items()))
+
+
+def _index_chunk(conllu, fields, chunk):
+    """
+    It parses a chunk of (byte offset, raw sentence) pairs and returns the
+    sent_id and the indexed values of the tokens of each sentence.
+    """
+    parsed = []
+    for offset, raw_sentence in chunk:
+        sentence = conllu.parse_sentence(raw_sentence)
+        parsed.append((
+            offset, conllu.get_sentence_id(sentence), [
+                tuple(getattr(token, field) for field in fields)
+                for token in sentence.tokens]))
+    return parsed
+
+
+def _to_blob(positions):
+    """
+    It returns the bytes of an array as an SQLite BLOB; on Python 2, arrays
+    have tostring() instead of tobytes().
+    """
+    if hasattr(positions, "tobytes"):
+        return positions.tobytes()
+    return sqlite3.Binary(positions.tostring())
+
+
+def _extend_from_blob(flat, blob):
+    if hasattr(flat, "frombytes"):
+        flat.frombytes(blob)
+    else:
+        flat.fromstring(bytes(blob))
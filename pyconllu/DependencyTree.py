@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+
+class DependencyTree(object):
+    """A class that indexes the dependency tree of a CoNLL-U sentence."""
+    def __init__(self, sentence):
+        """
+        Constructor of DependencyTree.
+
+        The tree is built once in O(n). Nodes are token IDs, as in the HEAD
+        column: 1..n for the tokens in Sentence.tokens and 0 for the virtual
+        root. Nodes are numbered in depth-first order (children by
+        increasing ID), so the subtree of a node is the contiguous slice
+        order[starts[node]:ends[node]].
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        """
+        size = len(sentence.tokens) + 1
+        parents = [-1] * size
+        children = [[] for _ in range(size)]
+
+        for dep, token in enumerate(sentence.tokens, 1):
+            head = token.head
+            if head is None or not 0 <= head < size or head == dep:
+                raise Exception(
+                    "Invalid head for token {}: {}".format(dep, head))
+            parents[dep] = head
+            children[head].append(dep)
+
+        order = []
+        starts = [0] * size
+        depths = [0] * size
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            starts[node] = len(order)
+            order.append(node)
+            for child in reversed(children[node]):
+                depths[child] = depths[node] + 1
+                stack.append(child)
+
+        if len(order) != size:
+            raise Exception("Invalid tree: sentence contains cycles")
+
+        sizes = [1] * size
+        lows = list(range(size))
+        highs = list(range(size))
+        for node in reversed(order[1:]):
+            parent = parents[node]
+            sizes[parent] += sizes[node]
+            if lows[node] < lows[parent]:
+                lows[parent] = lows[node]
+            if highs[node] > highs[parent]:
+                highs[parent] = highs[node]
+
+        self.parents = parents
+        self.depths = depths
+        self.order = order
+        self.starts = starts
+        self.ends = [start + sizes[node] for node, start in enumerate(starts)]
+        self._children = [tuple(nodes) for nodes in children]
+        self._lows = lows
+        self._highs = highs
+        self._sparse_table = None
+
+    def __len__(self):
+        return len(self.parents) - 1
+
+    def __repr__(self):
+        return '{}(parents={})'.format(
+            self.__class__.__name__, self.parents[1:])
+
+    @property
+    def root(self):
+        """ID of the token attached to the virtual root, or None."""
+        if self._children[0]:
+            return self._children[0][0]
+        return None
+
+    def parent(self, node):
+        """Return the head of a node (0 for the root token)."""
+        return self.parents[node]
+
+    def depth(self, node):
+        """Return the distance of a node to the virtual root."""
+        return self.depths[node]
+
+    def children(self, node):
+        """Return the direct dependents of a node, by increasing ID."""
+        return self._children[node]
+
+    def is_ancestor(self, ancestor, node):
+        """Return True if node is in the subtree of ancestor.
+
+        A node belongs to its own subtree. It runs in O(1).
+        """
+        return (self.starts[ancestor] <= self.starts[node] <
+                self.ends[ancestor])
+
+    def subtree(self, node):
+        """Return the nodes in the subtree of a node, in depth-first order.
+
+        :example:
+
+        >>> tree = conllu.get_tree(sentence)
+        >>> tree.subtree(6)
+        [6, 3, 4, 5, 9, 7, 8]
+        """
+        return self.order[self.starts[node]:self.ends[node]]
+
+    def subtree_size(self, node):
+        return self.ends[node] - self.starts[node]
+
+    def projection(self, node):
+        """Return the yield of a node: its subtree sorted by ID.
+
+        :example:
+
+        >>> tree.projection(6)
+        [3, 4, 5, 6, 7, 8, 9]
+        """
+        if self.is_projective(node):
+            return list(range(self._lows[node], self._highs[node] + 1))
+        return sorted(self.subtree(node))
+
+    def span(self, node):
+        """Return the lowest and highest IDs in the subtree of a node."""
+        return self._lows[node], self._highs[node]
+
+    def is_projective(self, node):
+        """Return True if the yield of a node is a contiguous range of IDs.
+
+        It runs in O(1).
+        """
+        return (self._highs[node] - self._lows[node] + 1 ==
+                self.subtree_size(node))
+
+    def ancestors(self, node):
+        """Return the heads of a node up to the root token, nearest first.
+
+        :example:
+
+        >>> tree.ancestors(8)
+        [9, 6, 2]
+        """
+        ancestors = []
+        node = self.parents[node]
+        while node > 0:
+            ancestors.append(node)
+            node = self.parents[node]
+        return ancestors
+
+    def lca(self, first, second):
+        """Return the lowest common ancestor of two nodes
+
+        The first call builds a sparse table over the depth-first order in
+        O(n log n); every query then runs in O(1).
+
+        :example:
+
+        >>> tree.lca(4, 8)
+        6
+
+        :param first: node ID
+        :type first: int
+        :param second: node ID
+        :type second: int
+        :return: ID of the deepest node that dominates both nodes
+        :rtype: int
+        """
+        if first == second:
+            return first
+
+        low, high = sorted((self.starts[first], self.starts[second]))
+        if self.is_ancestor(self.order[low], self.order[high]):
+            return self.order[low]
+
+        # the shallowest node in order(low, high] is a child of the LCA
+        return self.parents[self._min_depth(low + 1, high)]
+
+    def distance(self, first, second):
+        """Return the number of arcs in the path between two nodes."""
+        return (
+            self.depths[first] + self.depths[second] -
+            2 * self.depths[self.lca(first, second)])
+
+    def path(self, first, second):
+        """Return the nodes on the path between two nodes, both included
+
+        :example:
+
+        >>> tree.path(4, 8)
+        [4, 6, 9, 8]
+
+        :param first: node ID
+        :type first: int
+        :param second: node ID
+        :type second: int
+        :return: node IDs from first up to their lowest common ancestor and
+            down to second
+        :rtype: list
+        """
+        return self.paths([(first, second)])[0]
+
+    def paths(self, pairs):
+        """Return the paths between many pairs of nodes
+
+        Each pair costs one O(1) lowest common ancestor query and a walk
+        along the path itself, without walking from the nodes to the root.
+
+        :param pairs: (first, second) node IDs
+        :type pairs: iterable
+        :return: one list of node IDs per pair, as in path()
+        :rtype: list
+        """
+        parents = self.parents
+        lca = self.lca
+        paths = []
+        for first, second in pairs:
+            ancestor = lca(first, second)
+            up = [first]
+            while up[-1] != ancestor:
+                up.append(parents[up[-1]])
+            down = []
+            node = second
+            while node != ancestor:
+                down.append(node)
+                node = parents[node]
+            down.reverse()
+            paths.append(up + down)
+        return paths
+
+    def _min_depth(self, low, high):
+        """
+        It returns the node with minimum depth in order[low:high + 1].
+        """
+        if self._sparse_table is None:
+            self._sparse_table = self._build_sparse_table()
+
+        level = (high - low + 1).bit_length() - 1
+        row = self._sparse_table[level]
+        left = row[low]
+        right = row[high - (1 << level) + 1]
+        if self.depths[left] <= self.depths[right]:
+            return left
+        return right
+
+    def _build_sparse_table(self):
+        """
+        It builds a sparse table where table[k][i] is the shallowest node
+        in order[i:i + 2 ** k].
+        """
+        depths = self.depths
+        table = [list(self.order)]
+        width = 1
+        while 2 * width <= len(self.order):
+            previous = table[-1]
+            table.append([
+                left if depths[left] <= depths[right] else right
+                for left, right in zip(previous, previous[width:])
+            ])
+            width *= 2
+        return table
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+from collections import deque, OrderedDict
+
+
+class EnhancedGraph(object):
+    """A class that indexes the enhanced dependency graph (DEPS) of a
+    CoNLL-U sentence."""
+    def __init__(self, sentence, use_basic=False):
+        """
+        Constructor of EnhancedGraph.
+
+        Nodes are identified as in DEPS heads: integers for the tokens and 0
+        for the virtual root, ID strings (e.g. '8.1') for empty nodes. Edges
+        are read from the DEPS field of tokens and empty nodes; DEPS values
+        that could not be parsed are ignored.
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :param use_basic: use HEAD and DEPREL for tokens without DEPS
+        :type use_basic: bool
+        """
+        nodes = [(token, False) for token in sentence.tokens]
+        nodes += [(token, True) for token, _ in sentence.empty_nodes]
+
+        self._in_edges = OrderedDict([(0, [])])
+        self._out_edges = OrderedDict([(0, [])])
+        self._relations = {}
+        self._size = 0
+
+        for token, _ in sorted(nodes, key=lambda node: self._sort_key(
+                node[0].id)):
+            node = self.node_key(token.id)
+            self._in_edges.setdefault(node, [])
+            self._out_edges.setdefault(node, [])
+
+        for token, is_empty_node in nodes:
+            node = self.node_key(token.id)
+            if isinstance(token.deps, list):
+                edges = token.deps
+            elif use_basic and not is_empty_node and token.head is not None:
+                edges = [(token.deprel, token.head)]
+            else:
+                continue
+
+            for deprel, head in edges:
+                self._add_edge(self.node_key(head), node, deprel)
+
+    def __len__(self):
+        """Number of edges in the graph."""
+        return self._size
+
+    def __contains__(self, node):
+        return self.node_key(node) in self._in_edges
+
+    def __repr__(self):
+        return '{}(edges={})'.format(
+            self.__class__.__name__, list(self.edges()))
+
+    @staticmethod
+    def node_key(node):
+        """Return the identifier of a node given its ID or head value
+
+        :example:
+
+        >>> EnhancedGraph.node_key("8")
+        8
+        >>> EnhancedGraph.node_key("8.1")
+        '8.1'
+        """
+        if isinstance(node, int):
+            return node
+        if "." in node:
+            return node
+        return int(node)
+
+    @property
+    def nodes(self):
+        """Nodes in sentence order, starting with the virtual root."""
+        return list(self._in_edges)
+
+    def edges(self, deprel=None):
+        """Return the edges of the graph as (head, dep, deprel) triples
+
+        :param deprel: return only edges with this relation
+        :type deprel: str
+        :rtype: generator
+        """
+        if deprel is not None:
+            for head, dep in self._relations.get(deprel, []):
+                yield head, dep, deprel
+            return
+
+        for dep, edges in self._in_edges.items():
+            for head, relation in edges:
+                yield head, dep, relation
+
+    def heads(self, node):
+        """Return the in-edges of a node as (head, deprel) pairs."""
+        return self._in_edges[self.node_key(node)]
+
+    def dependents(self, node):
+        """Return the out-edges of a node as (dep, deprel) pairs."""
+        return self._out_edges[self.node_key(node)]
+
+    def has_edge(self, head, dep, deprel=None):
+        head = self.node_key(head)
+        return any(
+            edge_head == head and (deprel is None or relation == deprel)
+            for edge_head, relation in self._in_edges[self.node_key(dep)])
+
+    def roots(self):
+        """Return the nodes attached to the virtual root."""
+        return [dep for dep, _ in self._out_edges[0]]
+
+    def descendants(self, node):
+        """Return the nodes reachable from a node, in breadth-first order.
+
+        The graph may contain cycles; each node is returned once and the
+        start node is only included if it is part of a cycle.
+        """
+        return self._traverse(self.node_key(node), self._out_edges)
+
+    def ancestors(self, node):
+        """Return the nodes from which a node is reachable, in breadth-first
+        order, excluding the virtual root."""
+        return [
+            ancestor
+            for ancestor in self._traverse(self.node_key(node), self._in_edges)
+            if ancestor != 0]
+
+    def _add_edge(self, head, dep, deprel):
+        self._in_edges.setdefault(head, [])
+        self._out_edges.setdefault(head, []).append((dep, deprel))
+        self._in_edges[dep].append((head, deprel))
+        self._relations.setdefault(deprel, []).append((head, dep))
+        self._size += 1
+
+    @staticmethod
+    def _traverse(start, adjacency):
+        seen = set()
+        result = []
+        queue = deque([start])
+        while queue:
+            for neighbour, _ in adjacency[queue.popleft()]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    result.append(neighbour)
+                    queue.append(neighbour)
+        return result
+
+    @staticmethod
+    def _sort_key(node_id):
+        major, _, minor = node_id.partition(".")
+        return int(major), int(minor or 0)
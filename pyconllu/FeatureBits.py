@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+import re
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WORD_BITS = 64
+
+_CLAUSE_PATTERN = re.compile(r"^\s*([^=!&|\s]+)\s*(!?=)\s*([^=&\s]+)\s*$")
+
+
+class FeatureBits(object):
+    """A class that encodes FEATS as integer bitmasks."""
+    def __init__(self, pairs=None):
+        """
+        Constructor of FeatureBits.
+
+        Each attribute=value pair gets a bit, in order of appearance, so the
+        features of a token are an integer with one bit set per pair.
+        Multiple values (e.g. 'PronType=Int,Rel') set one bit per value.
+
+        :example:
+
+        >>> bits = FeatureBits()
+        >>> masks = bits.encode_tokens(sentence.tokens)
+        >>> query = bits.compile("Gender=Fem & Number=Plur & VerbForm!=Inf")
+        >>> [token for token, mask in zip(sentence.tokens, masks)
+        ...  if query(mask)]
+
+        :param pairs: initial (attribute, value) pairs, in bit order
+        :type pairs: iterable
+        """
+        self._pairs = []
+        self._bits = {}
+        for attribute, value in pairs or []:
+            self.add(attribute, value)
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __contains__(self, pair):
+        return pair in self._bits
+
+    def __repr__(self):
+        return '{}(size={})'.format(self.__class__.__name__, len(self))
+
+    @property
+    def pairs(self):
+        """(attribute, value) pairs, in bit order."""
+        return list(self._pairs)
+
+    @property
+    def words(self):
+        """Number of 64-bit words needed by a mask."""
+        return max((len(self._pairs) + WORD_BITS - 1) // WORD_BITS, 1)
+
+    def add(self, attribute, value):
+        """Add an attribute=value pair
+
+        :param attribute: feature name
+        :type attribute: str
+        :param value: feature value
+        :type value: str
+        :return: bit of the pair
+        :rtype: int
+        """
+        pair = (attribute, value)
+        try:
+            return self._bits[pair]
+        except KeyError:
+            self._bits[pair] = len(self._pairs)
+            self._pairs.append(pair)
+            return self._bits[pair]
+
+    def bit(self, attribute, value):
+        """Return the bit of a pair, or None if it is missing."""
+        return self._bits.get((attribute, value))
+
+    def encode(self, feats, grow=True):
+        """Return the bitmask of the FEATS of a token
+
+        :param feats: FEATS as parsed by CoNLLU, an OrderedDict or None
+        :type feats: OrderedDict
+        :param grow: add the missing pairs; otherwise they are ignored
+        :type grow: bool
+        :rtype: int
+        """
+        if not feats:
+            return 0
+        mask = 0
+        for attribute, values in feats.items():
+            if values is None:
+                continue
+            for value in values.split(","):
+                if grow:
+                    bit = self.add(attribute, value)
+                else:
+                    bit = self._bits.get((attribute, value))
+                    if bit is None:
+                        continue
+                mask |= 1 << bit
+        return mask
+
+    def encode_tokens(self, tokens, grow=True):
+        """Return the bitmasks of a list of tokens
+
+        :param tokens: Token objects
+        :type tokens: list
+        :param grow: add the missing pairs; otherwise they are ignored
+        :type grow: bool
+        :rtype: list
+        """
+        return [self.encode(token.feats, grow) for token in tokens]
+
+    def decode(self, mask):
+        """Return the FEATS of a bitmask in the form parsed by CoNLLU
+
+        Attributes are sorted case-insensitively and multiple values
+        alphabetically, as in Universal Dependencies.
+
+        :param mask: bitmask
+        :type mask: int
+        :return: FEATS, or None if no bit is set
+        :rtype: OrderedDict
+        """
+        if not mask:
+            return None
+        features = {}
+        bit = 0
+        while mask:
+            if mask & 1:
+                attribute, value = self._pairs[bit]
+                features.setdefault(attribute, []).append(value)
+            mask >>= 1
+            bit += 1
+        return OrderedDict(
+            (attribute, ",".join(sorted(features[attribute])))
+            for attribute in sorted(features, key=lambda key: key.lower()))
+
+    def to_array(self, masks):
+        """Return bitmasks as a NumPy array
+
+        :param masks: bitmasks
+        :type masks: list
+        :return: uint64 array of shape (len(masks), words), with the bits
+            0-63 in the first column, 64-127 in the second and so on
+        :rtype: numpy.ndarray
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required to build feature arrays: "
+                "pip install pyconllu[numpy]")
+        words = self.words
+        array = np.zeros((len(masks), words), dtype=np.uint64)
+        if words == 1:
+            array[:, 0] = masks
+            return array
+        low = (1 << WORD_BITS) - 1
+        for word in range(words):
+            shift = word * WORD_BITS
+            array[:, word] = [(mask >> shift) & low for mask in masks]
+        return array
+
+    def from_array(self, array):
+        """Return the bitmasks of an array built by to_array()."""
+        masks = []
+        for row in array.tolist():
+            mask = 0
+            for word, value in enumerate(row):
+                mask |= int(value) << (word * WORD_BITS)
+            masks.append(mask)
+        return masks
+
+    def compile(self, query, grow=False):
+        """Compile a conjunction of FEATS conditions
+
+        Conditions are joined with '&'. 'Attr=A' requires the pair, 'Attr=A|B'
+        requires either of them and 'Attr!=A|B' forbids them. Unless grow is
+        True, pairs missing from the encoding can not be set: requiring them
+        matches nothing and forbidding them is always true.
+
+        :example:
+
+        >>> query = bits.compile("Gender=Fem & Number=Plur & VerbForm!=Inf")
+        >>> query(bits.encode(token.feats))
+        True
+        >>> query.match_array(bits.to_array(masks))
+        array([False,  True, False])
+
+        :param query: conditions
+        :type query: str
+        :param grow: add the missing pairs, for masks encoded afterwards
+        :type grow: bool
+        :rtype: FeatureQuery
+        :raises ValueError: if a condition is not valid
+        """
+        required = 0
+        forbidden = 0
+        alternatives = []
+        impossible = False
+
+        for clause in query.split("&"):
+            match = _CLAUSE_PATTERN.match(clause)
+            if match is None:
+                raise ValueError(
+                    "Invalid FEATS condition: {!r}".format(clause.strip()))
+            attribute, operator, values = match.groups()
+            mask = 0
+            for value in values.split("|"):
+                if grow:
+                    self.add(attribute, value)
+                bit = self.bit(attribute, value)
+                if bit is not None:
+                    mask |= 1 << bit
+            if operator == "!=":
+                forbidden |= mask
+            elif not mask:
+                impossible = True
+            elif "|" in values:
+                alternatives.append(mask)
+            else:
+                required |= mask
+
+        return FeatureQuery(required, forbidden, alternatives, impossible)
+
+
+class FeatureQuery(object):
+    """A compiled FEATS query over bitmasks."""
+    def __init__(self, required, forbidden, alternatives=(), impossible=False):
+        """
+        Constructor of FeatureQuery.
+
+        :param required: bits that must all be set
+        :type required: int
+        :param forbidden: bits that must not be set
+        :type forbidden: int
+        :param alternatives: masks with at least one bit set in each
+        :type alternatives: list
+        :param impossible: the query matches nothing
+        :type impossible: bool
+        """
+        self.required = required
+        self.forbidden = forbidden
+        self.alternatives = list(alternatives)
+        self.impossible = impossible
+
+    def __repr__(self):
+        return '{}(required={}, forbidden={}, alternatives={})'.format(
+            self.__class__.__name__, self.required, self.forbidden,
+            self.alternatives)
+
+    def __call__(self, mask):
+        """Return True if a bitmask matches the query."""
+        if self.impossible:
+            return False
+        return (
+            mask & self.required == self.required and
+            not mask & self.forbidden and
+            all(mask & alternative for alternative in self.alternatives))
+
+    def match_array(self, array):
+        """Return a boolean array with the rows of an array built by
+        FeatureBits.to_array() that match the query
+
+        Pairs added to the encoding after the array was built have bits
+        beyond its width, which no row has set: requiring them matches
+        nothing and forbidding them is always true.
+
+        :param array: uint64 array of shape (tokens, words)
+        :type array: numpy.ndarray
+        :rtype: numpy.ndarray
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required to match feature arrays: "
+                "pip install pyconllu[numpy]")
+        width = (1 << (array.shape[1] * WORD_BITS)) - 1
+        alternatives = [
+            alternative & width for alternative in self.alternatives]
+        impossible = (
+            self.impossible or self.required & ~width or
+            not all(alternatives))
+        matches = np.full(len(array), not impossible, dtype=bool)
+        if impossible:
+            return matches
+
+        for mask, test in (
+                [(self.required, _all_set),
+                 (self.forbidden & width, _none_set)] +
+                [(alternative, _any_set) for alternative in alternatives]):
+            if not mask:
+                continue
+            columns = _split_words(mask, array.shape[1])
+            matches &= test(array, columns)
+        return matches
+
+
+def _split_words(mask, words):
+    low = (1 << WORD_BITS) - 1
+    return np.array(
+        [(mask >> (word * WORD_BITS)) & low for word in range(words)],
+        dtype=np.uint64)
+
+
+def _all_set(array, columns):
+    return ((array & columns) == columns).all(axis=1)
+
+
+def _none_set(array, columns):
+    return ~(array & columns).any(axis=1)
+
+
+def _any_set(array, columns):
+    return (array & columns).any(axis=1)
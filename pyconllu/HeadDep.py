@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 class HeadDep(object):
     """A class that represents a pair Head-Dependency."""
+    __slots__ = ('head', 'dep', 'relation', 'position')
+
     def __init__(
             self, head=None, dep=None, relation=None, position=None):
         self.head = head
@@ -24,7 +26,10 @@ class HeadDep(object):
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash(tuple(sorted(self.__dict__.items())))
+        return hash((self.head, self.dep, self.relation, self.position))
+
+    def __reduce__(self):
+        return (self.__class__, self.astuple())
 
     def __repr__(self):
         return (
@@ -46,34 +51,41 @@ class HeadDep(object):
             self.position[1]
         )
 
-    @property
-    def head(self):
-        return self._head
+    def astuple(self):
+        """Return the HeadDep as a (head, dep, relation, position) tuple."""
+        return (self.head, self.dep, self.relation, self.position)
+
+    @classmethod
+    def from_tuple(cls, values):
+        """Build a HeadDep from a (head, dep, relation, position) tuple."""
+        return cls(*values)
 
-    @head.setter
-    def head(self, value):
-        self._head = value
+    def freeze(self):
+        """Return an immutable copy of the HeadDep."""
+        return FrozenHeadDep(*self.astuple())
 
-    @property
-    def dep(self):
-        return self._dep
 
-    @dep.setter
-    def dep(self, value):
-        self._dep = value
+class FrozenHeadDep(HeadDep):
+    """An immutable HeadDep with a cached hash, to be used as a key of
+    large dicts, sets and Counters."""
+    __slots__ = ('_hash',)
 
-    @property
-    def relation(self):
-        return self._relation
+    def __init__(
+            self, head=None, dep=None, relation=None, position=None):
+        set_attribute = super(FrozenHeadDep, self).__setattr__
+        set_attribute('head', head)
+        set_attribute('dep', dep)
+        set_attribute('relation', relation)
+        set_attribute('position', position)
+        set_attribute('_hash', hash((head, dep, relation, position)))
 
-    @relation.setter
-    def relation(self, value):
-        self._relation = value
+    def __hash__(self):
+        return self._hash
 
-    @property
-    def position(self):
-        return self._position
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "{} is immutable".format(self.__class__.__name__))
 
-    @position.setter
-    def position(self, value):
-        self._position = value
+    def __delattr__(self, name):
+        raise AttributeError(
+            "{} is immutable".format(self.__class__.__name__))
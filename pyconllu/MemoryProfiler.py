@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+import gc
+import os
+import sys
+import types
+from collections import OrderedDict
+from itertools import islice
+from .ArrowExporter import ArrowExporter, pa
+from .CoNLLU import CoNLLU
+from .ProgressReporter import byte_size, TOKEN_LINE_PATTERN
+from .Token import Token
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+DEFAULT_SAMPLE_SIZE = 1000
+
+# shared code objects, not owned by the data structures being measured
+_SKIPPED_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType)
+
+
+class MemoryProfiler(object):
+    """Measure the memory used by the representations of a parsed
+    corpus."""
+    def __init__(self, conllu=None, use_tracemalloc=True):
+        """
+        Constructor of MemoryProfiler.
+
+        Each representation of a sample is measured by walking its objects
+        with sys.getsizeof(), counting every object once; objects such as
+        classes and functions are skipped. If tracemalloc is available and
+        use_tracemalloc is True, the memory retained while building each
+        representation is also traced, which includes allocator overhead.
+        Measures are then divided by the number of tokens in the sample and
+        projected to the size of the whole corpus.
+
+        Representations are 'raw' (CoNLL-U strings), 'parsed' (Sentence
+        objects), 'heads' (Head copies from get_heads(), on top of the parsed
+        sentences), 'packed' (Token.pack_many() columns), 'pickled'
+        (dump_sentences() bytes) and 'arrow' (ArrowExporter batches, if
+        pyarrow is installed).
+
+        :param conllu: parser used to build the representations
+        :type conllu: CoNLLU
+        :param use_tracemalloc: trace allocations while building them
+        :type use_tracemalloc: bool
+        """
+        self.conllu = conllu or CoNLLU()
+        self.use_tracemalloc = use_tracemalloc and tracemalloc is not None
+
+    def profile(self, raw_sentences, corpus_tokens=None):
+        """Measure the representations of a sample of raw sentences
+
+        :example:
+
+        >>> profiler = MemoryProfiler()
+        >>> report = profiler.profile(
+        ...     islice(conllu.read_sentences_from_file("corpus.conllu"), 1000),
+        ...     corpus_tokens=10 ** 8)
+        >>> report['representations']['parsed']['bytes_per_token']
+        1104.8
+        >>> print(MemoryProfiler.format(report))
+
+        :param raw_sentences: sample of CoNLL-U sentences
+        :type raw_sentences: iterable
+        :param corpus_tokens: number of tokens of the whole corpus, used to
+            project the measures
+        :type corpus_tokens: int
+        :return: 'sentences' and 'tokens' in the sample, 'types' with the
+            (count, bytes) of each type of object in the parsed sentences and
+            'representations' with the 'bytes', 'traced' bytes (or None),
+            'bytes_per_token' and 'projected' bytes of each representation
+        :rtype: dict
+        """
+        raw_sentences = list(raw_sentences)
+        parsed, traced_parsed = self._trace(
+            lambda: [
+                self.conllu.parse_sentence(raw_sentence)
+                for raw_sentence in raw_sentences])
+        tokens = sum(len(sentence.tokens) for sentence in parsed)
+
+        object_types = {}
+        parsed_objects = set()
+        measures = OrderedDict()
+        measures['raw'] = (deep_sizeof(raw_sentences), None)
+        measures['parsed'] = (
+            deep_sizeof(parsed, object_types, parsed_objects), traced_parsed)
+
+        heads, traced = self._trace(
+            lambda: [self.conllu.get_heads(sentence) for sentence in parsed])
+        measures['heads'] = (deep_sizeof(heads, seen=parsed_objects), traced)
+        del heads
+
+        packed, traced = self._trace(
+            lambda: [
+                (sentence.comments, Token.pack_many(sentence.tokens))
+                for sentence in parsed])
+        measures['packed'] = (deep_sizeof(packed), traced)
+        del packed
+
+        pickled, traced = self._trace(
+            lambda: self.conllu.dump_sentences(parsed))
+        measures['pickled'] = (sys.getsizeof(pickled), traced)
+        del pickled
+
+        if pa is not None:
+            batches, traced = self._trace(
+                lambda: [
+                    batch for _, batch in ArrowExporter().iter_batches(
+                        parsed)])
+            measures['arrow'] = (
+                sum(batch.nbytes for batch in batches), traced)
+            del batches
+
+        representations = OrderedDict()
+        for name, (size, traced) in measures.items():
+            bytes_per_token = size / float(tokens) if tokens else 0.0
+            projected = None
+            if corpus_tokens is not None:
+                projected = int(bytes_per_token * corpus_tokens)
+            representations[name] = {
+                'bytes': size,
+                'traced': traced,
+                'bytes_per_token': bytes_per_token,
+                'projected': projected,
+            }
+
+        return {
+            'sentences': len(parsed),
+            'tokens': tokens,
+            'types': OrderedDict(sorted(
+                object_types.items(), key=lambda item: -item[1][1])),
+            'representations': representations,
+        }
+
+    def profile_file(self, ifile, sample_size=DEFAULT_SAMPLE_SIZE):
+        """Measure the first sentences of a file and project to all of it
+
+        The number of tokens in the file is estimated from its size and the
+        number of tokens per byte in the sample.
+
+        :param ifile: filename
+        :type ifile: str
+        :param sample_size: number of sentences measured
+        :type sample_size: int
+        :return: report as in profile()
+        :rtype: dict
+        """
+        sample = list(islice(
+            self.conllu.read_sentences_from_file(ifile), sample_size))
+        return self.profile(
+            sample,
+            corpus_tokens=estimate_tokens(sample, os.path.getsize(ifile)))
+
+    @staticmethod
+    def format(report):
+        """Return a report as a text table."""
+        lines = [
+            "{} sentences, {} tokens".format(
+                report['sentences'], report['tokens']),
+            "",
+            "{:<12}{:>14}{:>14}{:>12}{:>16}".format(
+                "", "bytes", "traced", "per token", "projected"),
+        ]
+        for name, measure in report['representations'].items():
+            lines.append("{:<12}{:>14}{:>14}{:>12.1f}{:>16}".format(
+                name, measure['bytes'], _format_optional(measure['traced']),
+                measure['bytes_per_token'],
+                _format_optional(measure['projected'])))
+
+        lines += [
+            "", "{:<24}{:>10}{:>14}".format("parsed", "objects", "bytes")]
+        for name, (count, size) in report['types'].items():
+            lines.append("{:<24}{:>10}{:>14}".format(name, count, size))
+        return "\n".join(lines)
+
+    def _trace(self, build):
+        """
+        It builds a representation and returns it with the memory it
+        retains according to tracemalloc, or None.
+        """
+        if not self.use_tracemalloc:
+            return build(), None
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            result = build()
+            gc.collect()
+            return result, tracemalloc.get_traced_memory()[0] - before
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+
+
+def deep_sizeof(obj, object_types=None, seen=None):
+    """Return the size of an object and of all the objects it references
+
+    Each object is counted once. Containers, instance __dict__s and
+    __slots__ are followed; classes, modules and functions are skipped.
+
+    :example:
+
+    >>> deep_sizeof(sentence)
+    9416
+
+    :param obj: object to be measured
+    :param object_types: dict updated with the [count, bytes] of each type
+        of object; instance __dict__s are counted as 'Class.__dict__'
+    :type object_types: dict
+    :param seen: ids of objects already counted, updated in place, so
+        shared objects are only counted by the first walk
+    :type seen: set
+    :return: size in bytes
+    :rtype: int
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [(obj, None)]
+
+    while stack:
+        obj, name = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+
+        size = sys.getsizeof(obj)
+        total += size
+        if object_types is not None:
+            entry = object_types.setdefault(
+                name or type(obj).__name__, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                stack.append((key, None))
+                stack.append((value, None))
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend((item, None) for item in obj)
+        elif not isinstance(obj, (str, bytes, int, float)):
+            attributes = getattr(obj, "__dict__", None)
+            if attributes is not None:
+                stack.append(
+                    (attributes, type(obj).__name__ + ".__dict__"))
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(obj, slot):
+                        stack.append((getattr(obj, slot), None))
+
+    return total
+
+
+def estimate_tokens(raw_sentences, total_bytes):
+    """Estimate the number of tokens in a corpus from a sample of it
+
+    :param raw_sentences: sentences read from the corpus
+    :type raw_sentences: list
+    :param total_bytes: size of the corpus
+    :type total_bytes: int
+    :rtype: int
+    """
+    sample_bytes = sum(byte_size(raw) + 1 for raw in raw_sentences)
+    sample_tokens = sum(
+        len(TOKEN_LINE_PATTERN.findall(raw)) for raw in raw_sentences)
+    if not sample_bytes:
+        return 0
+    return int(sample_tokens * total_bytes / float(sample_bytes))
+
+
+def _format_optional(value):
+    return "-" if value is None else value
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+import heapq
+import io
+import multiprocessing
+import os
+import tempfile
+from itertools import groupby, islice
+from .CoNLLU import CoNLLU, DEFAULT_ENCODING
+
+NGRAM_FIELDS = ('form', 'lemma', 'upostag')
+CONTRACTION_MODES = ('words', 'tokens')
+DEFAULT_MAX_N = 3
+SEPARATOR = "\t"
+
+
+class NgramCounter(object):
+    """Count the n-grams of a field in a stream of sentences."""
+    def __init__(
+            self, field="form", max_n=DEFAULT_MAX_N, contractions="words",
+            min_count=1, max_entries=None, spill_dir=None, conllu=None):
+        """
+        Constructor of NgramCounter.
+
+        N-grams of 1 to max_n words are counted inside each sentence. LEMMA
+        follows the proper-name rule of CoNLLU.get_lemmas(). With
+        contractions='words', the syntactic words of Sentence.tokens are
+        used; with contractions='tokens', the words of a contraction are
+        replaced by its surface token, whose LEMMA and UPOS are those of its
+        words joined with '+' (e.g. 'de+el').
+
+        If max_entries is set, the counts held in memory are bounded: when
+        they exceed it, they are written as a sorted run to spill_dir and
+        merged back by items(), which keeps the counts exact. Without
+        spill_dir, the least frequent n-grams are pruned instead, and counts
+        up to pruned_count may be underestimated.
+
+        :param field: 'form', 'lemma' or 'upostag'
+        :type field: str
+        :param max_n: largest n-gram size
+        :type max_n: int
+        :param contractions: 'words' or 'tokens'
+        :type contractions: str
+        :param min_count: minimum count of the n-grams produced by items()
+        :type min_count: int
+        :param max_entries: maximum number of n-grams held in memory
+        :type max_entries: int
+        :param spill_dir: directory for the sorted runs
+        :type spill_dir: str
+        :param conllu: parser of the sentences and proper-name rule
+        :type conllu: CoNLLU
+        """
+        if field not in NGRAM_FIELDS:
+            raise ValueError("field must be one of {}".format(NGRAM_FIELDS))
+        if contractions not in CONTRACTION_MODES:
+            raise ValueError(
+                "contractions must be one of {}".format(CONTRACTION_MODES))
+        if max_n < 1:
+            raise ValueError("max_n must be a positive integer")
+
+        self.field = field
+        self.max_n = max_n
+        self.contractions = contractions
+        self.min_count = min_count
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.conllu = conllu or CoNLLU()
+        self.pruned_count = 0
+        self.counts = [{} for _ in range(max_n)]
+        self.runs = [[] for _ in range(max_n)]
+
+    def __len__(self):
+        """Number of n-grams held in memory."""
+        return sum(len(counts) for counts in self.counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Delete the runs spilled to disk, including those merged from
+        other counters
+
+        The counts of the runs are lost, so it is called once items(),
+        most_common() or write() are no longer needed.
+        """
+        for runs in self.runs:
+            for run in runs:
+                try:
+                    os.remove(run)
+                except OSError:
+                    # already removed, e.g. by the counter it was merged from
+                    pass
+            del runs[:]
+
+    def count(self, sentences):
+        """Count the n-grams of a stream of sentences
+
+        :example:
+
+        >>> with NgramCounter(field="lemma", max_n=2) as counter:
+        ...     counter.count(conllu.parse_file("corpus.conllu"))
+        ...     counter.write("lemmas.")
+        ['lemmas.1.tsv', 'lemmas.2.tsv']
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        """
+        for sentence in sentences:
+            self._count_sentence(sentence)
+            if self.max_entries is not None and len(self) > self.max_entries:
+                self._reduce()
+
+    def count_files(self, ifiles, jobs=1, encoding=DEFAULT_ENCODING):
+        """Count the n-grams of several files, one per worker process
+
+        Each file is counted with the settings of this counter; the counts
+        of the files are then merged into it.
+
+        :param ifiles: CoNLL-U filenames
+        :type ifiles: list
+        :param jobs: number of worker processes
+        :type jobs: int
+        :param encoding: encoding of the files
+        :type encoding: str
+        """
+        tasks = [
+            (self.__class__, self._settings(), ifile, encoding)
+            for ifile in ifiles]
+        if jobs <= 1:
+            results = (_count_file(task) for task in tasks)
+            for counts, runs, pruned_count in results:
+                self.merge_counts(counts, runs, pruned_count)
+            return
+
+        pool = multiprocessing.Pool(jobs)
+        try:
+            for counts, runs, pruned_count in pool.imap_unordered(
+                    _count_file, tasks):
+                self.merge_counts(counts, runs, pruned_count)
+        finally:
+            pool.close()
+            pool.join()
+
+    def merge(self, other):
+        """Add the counts of another counter with the same settings
+
+        :param other: counter to be merged
+        :type other: NgramCounter
+        """
+        if other._signature() != self._signature():
+            raise ValueError("counters with different settings")
+        self.merge_counts(other.counts, other.runs, other.pruned_count)
+
+    def merge_counts(self, counts, runs=None, pruned_count=0):
+        """Add counts produced by another counter, e.g. in a worker process
+
+        :param counts: dict of the counts of each n-gram size, keyed by the
+            values joined with tabs
+        :type counts: list
+        :param runs: filenames of the sorted runs of each n-gram size
+        :type runs: list
+        :param pruned_count: largest count that may have been pruned
+        :type pruned_count: int
+        """
+        for table, other in zip(self.counts, counts):
+            for key, count in other.items():
+                table[key] = table.get(key, 0) + count
+        for own_runs, other_runs in zip(self.runs, runs or []):
+            own_runs.extend(other_runs)
+        self.pruned_count = max(self.pruned_count, pruned_count)
+        if self.max_entries is not None and len(self) > self.max_entries:
+            self._reduce()
+
+    def values(self, sentence):
+        """Return the values of the counted field in a sentence
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :rtype: list
+        """
+        if self.field == "lemma":
+            get_lemma = self.conllu._get_lemma
+            values = [get_lemma(token) for token in sentence.tokens]
+        else:
+            field = self.field
+            values = [getattr(token, field) for token in sentence.tokens]
+        values = ["_" if value is None else value for value in values]
+
+        if self.contractions == "tokens":
+            for contraction, idx in reversed(sentence.contractions):
+                first, last = contraction.id.split("-")
+                end = idx + int(last) - int(first) + 1
+                if self.field == "form":
+                    value = contraction.form
+                else:
+                    value = "+".join(values[idx:end])
+                values[idx:end] = [value]
+        return values
+
+    def items(self, n):
+        """Produce the n-grams of size n with their counts, sorted by
+        n-gram, merging the runs spilled to disk
+
+        :param n: n-gram size
+        :type n: int
+        :return: generator producing (ngram, count) pairs, where ngram is a
+            tuple of values
+        :rtype: tuple
+        """
+        streams = [_read_run(run) for run in self.runs[n - 1]]
+        streams.append(iter(sorted(self.counts[n - 1].items())))
+
+        for key, group in groupby(
+                heapq.merge(*streams), key=lambda item: item[0]):
+            count = sum(item[1] for item in group)
+            if count >= self.min_count:
+                yield tuple(key.split(SEPARATOR)), count
+
+    def items_by_count(self, n):
+        """Produce the n-grams of size n by decreasing count
+
+        With max_entries and spill_dir, the n-grams are sorted in runs of
+        max_entries n-grams spilled to spill_dir and merged, so memory is
+        bounded as when counting; otherwise they are sorted in memory. Ties
+        are sorted by n-gram.
+
+        :param n: n-gram size
+        :type n: int
+        :return: generator producing (ngram, count) pairs
+        :rtype: tuple
+        """
+        items = self.items(n)
+        if self.max_entries is None or self.spill_dir is None:
+            for item in sorted(items, key=_count_order):
+                yield item
+            return
+
+        size = max(self.max_entries, 1)
+        runs = []
+        try:
+            while True:
+                chunk = sorted(islice(items, size), key=_count_order)
+                if not runs and len(chunk) < size:
+                    # everything fits in memory
+                    for item in chunk:
+                        yield item
+                    return
+                if not chunk:
+                    break
+                keys = (
+                    (SEPARATOR.join(ngram), count) for ngram, count in chunk)
+                runs.append(self._write_run(n, keys, "-count"))
+
+            streams = [
+                ((-count, key) for key, count in _read_run(run))
+                for run in runs]
+            for negative_count, key in heapq.merge(*streams):
+                yield tuple(key.split(SEPARATOR)), -negative_count
+        finally:
+            for run in runs:
+                try:
+                    os.remove(run)
+                except OSError:
+                    pass
+
+    def most_common(self, n, limit=None):
+        """Return the n-grams of size n by decreasing count
+
+        With a limit, only limit n-grams are held in memory at once. Without
+        it, all the n-grams are returned; use items_by_count() to produce
+        them with bounded memory.
+
+        :param n: n-gram size
+        :type n: int
+        :param limit: number of n-grams returned
+        :type limit: int
+        :rtype: list
+        """
+        if limit is not None:
+            return heapq.nsmallest(limit, self.items(n), key=_count_order)
+        return list(self.items_by_count(n))
+
+    def write(self, prefix, by="count"):
+        """Write one TSV file per n-gram size, with the values and count of
+        each n-gram
+
+        :param prefix: prefix of the filenames, completed with 'N.tsv'
+        :type prefix: str
+        :param by: sort by 'count' (decreasing) or by 'ngram'
+        :type by: str
+        :return: filenames
+        :rtype: list
+        """
+        if by not in ("count", "ngram"):
+            raise ValueError("by must be 'count' or 'ngram'")
+
+        ofiles = []
+        for n in range(1, self.max_n + 1):
+            ofile = "{}{}.tsv".format(prefix, n)
+            if by == "count":
+                items = self.items_by_count(n)
+            else:
+                items = self.items(n)
+            with io.open(ofile, "w", encoding="utf-8") as fho:
+                for ngram, count in items:
+                    fho.write(u"{}\t{}\n".format("\t".join(ngram), count))
+            ofiles.append(ofile)
+        return ofiles
+
+    def _count_sentence(self, sentence):
+        values = self.values(sentence)
+        for size in range(1, min(self.max_n, len(values)) + 1):
+            table = self.counts[size - 1]
+            for start in range(len(values) - size + 1):
+                key = SEPARATOR.join(values[start:start + size])
+                table[key] = table.get(key, 0) + 1
+
+    def _reduce(self):
+        """
+        It brings the counts in memory under max_entries, by spilling them
+        to disk or by pruning the least frequent n-grams.
+        """
+        if self.spill_dir is not None:
+            self._spill()
+            return
+
+        while len(self) > self.max_entries // 2:
+            self.pruned_count += 1
+            self.counts = [
+                dict(item for item in counts.items()
+                     if item[1] > self.pruned_count)
+                for counts in self.counts]
+
+    def _spill(self):
+        for n, counts in enumerate(self.counts):
+            if counts:
+                self.runs[n].append(
+                    self._write_run(n + 1, sorted(counts.items())))
+        self.counts = [{} for _ in range(self.max_n)]
+
+    def _write_run(self, n, items, kind=""):
+        """
+        It writes (key, count) pairs to a new file in spill_dir and returns
+        its name.
+        """
+        fd, run = tempfile.mkstemp(
+            prefix="ngrams-{}{}-".format(n, kind), suffix=".tsv",
+            dir=self.spill_dir)
+        with io.open(fd, "w", encoding="utf-8") as fho:
+            for key, count in items:
+                fho.write(u"{}\t{}\n".format(key, count))
+        return run
+
+    def _signature(self):
+        """
+        It returns the settings that counters must share to be merged.
+        """
+        return self.__class__, self.field, self.max_n, self.contractions
+
+    def _settings(self):
+        return dict(
+            field=self.field, max_n=self.max_n,
+            contractions=self.contractions, max_entries=self.max_entries,
+            spill_dir=self.spill_dir,
+            propername_pattern=self.conllu.propername_pattern.pattern)
+
+
+def _count_file(task):
+    """
+    It counts the n-grams of a file and returns the state of the counter.
+    """
+    counter_class, settings, ifile, encoding = task
+    settings = dict(settings)
+    conllu = CoNLLU(propername_pattern=settings.pop("propername_pattern"))
+    counter = counter_class(conllu=conllu, **settings)
+    counter.count(conllu.parse_file(ifile, encoding=encoding))
+    if counter.spill_dir is not None:
+        # hand the counts over as runs instead of pickling them
+        counter._spill()
+    return counter.counts, counter.runs, counter.pruned_count
+
+
+def _count_order(item):
+    """
+    It sorts (ngram, count) pairs by decreasing count, then by key, as they
+    are merged from the runs.
+    """
+    ngram, count = item
+    return -count, SEPARATOR.join(ngram)
+
+
+def _read_run(run):
+    with io.open(run, encoding="utf-8") as fhi:
+        for line in fhi:
+            key, _, count = line.rstrip("\n").rpartition("\t")
+            yield key, int(count)
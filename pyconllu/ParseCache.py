@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+import codecs
+import hashlib
+import os
+import pickle
+import tempfile
+
+CACHE_FORMAT = 4
+CACHE_SUFFIX = ".pkl"
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_ENCODING = "utf-8"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "pyconllu")
+DEFAULT_MAX_SIZE = 1 << 30
+HASH_CHUNK_SIZE = 1 << 20
+
+_replace = getattr(os, "replace", os.rename)
+
+
+class ParseCache(object):
+    """An on-disk cache of parsed CoNLL-U files."""
+    def __init__(
+            self, cache_dir=None, max_size=DEFAULT_MAX_SIZE,
+            content_hash=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Constructor of ParseCache.
+
+        Entries are keyed by the absolute path, size and modification time
+        of the parsed file and by the encoding used to parse it, so any
+        change to the file invalidates its entry.
+        If content_hash is True, a SHA-1 digest of the file contents is
+        added to the key, which also catches changes that keep size and
+        mtime untouched at the cost of reading the file once per lookup.
+
+        :param cache_dir: directory where the entries are stored
+        :type cache_dir: str
+        :param max_size: maximum size of the cache in bytes; least recently
+            used entries are evicted when it is exceeded
+        :type max_size: int
+        :param content_hash: add a digest of the file contents to the key
+        :type content_hash: bool
+        :param chunk_size: number of sentences pickled together; entries are
+            written and read one chunk at a time
+        :type chunk_size: int
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_size = max_size
+        self.content_hash = content_hash
+        self.chunk_size = chunk_size
+
+    def get(self, ifile, encoding=DEFAULT_ENCODING):
+        """Return the cached sentences of a file
+
+        The entry is read one chunk of sentences at a time, so only a chunk
+        is held in memory while the sentences are consumed.
+
+        :param ifile: filename
+        :type ifile: str
+        :param encoding: encoding used to parse the file
+        :type encoding: str
+        :return: iterator producing Sentence objects, or None if there is no
+            valid entry
+        :rtype: iterator
+        :raises ValueError: while iterating, if the entry is corrupted after
+            its first chunk; the entry is removed
+        """
+        key = self.key(ifile, encoding)
+        if key is None:
+            return None
+
+        path = self._entry_path(key)
+        try:
+            fhi = open(path, "rb")
+        except (IOError, OSError):
+            return None
+        try:
+            if pickle.load(fhi) != CACHE_FORMAT:
+                raise ValueError("Invalid cache entry")
+        except Exception:
+            # evicted or corrupted entries are treated as misses
+            fhi.close()
+            return None
+
+        self._touch(path)
+        return self._read_entry(fhi, path)
+
+    def put(self, ifile, sentences, key=None, encoding=DEFAULT_ENCODING):
+        """Store the parsed sentences of a file
+
+        :param ifile: filename
+        :type ifile: str
+        :param sentences: parsed sentences of the file
+        :type sentences: iterable
+        :param key: key computed before parsing the file; the entry is not
+            stored if the file changed meanwhile
+        :type key: str
+        :param encoding: encoding used to parse the file
+        :type encoding: str
+        """
+        writer = self.writer(ifile, key=key, encoding=encoding)
+        try:
+            for sentence in sentences:
+                writer.write(sentence)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    def writer(self, ifile, key=None, encoding=DEFAULT_ENCODING):
+        """Return a writer storing the sentences of a file as they are parsed
+
+        Sentences are pickled in chunks of chunk_size sentences to a
+        temporary file, which commit() atomically renames, so concurrent
+        readers never see partial entries and concurrent writers of the
+        same key simply replace each other. Entries that are not committed
+        are removed by abort().
+
+        :example:
+
+        >>> writer = cache.writer("corpus.conllu")
+        >>> for sentence in sentences:
+        ...     writer.write(sentence)
+        >>> writer.commit()
+
+        :param ifile: filename
+        :type ifile: str
+        :param key: key computed before parsing the file; the entry is not
+            stored if the file changed meanwhile
+        :type key: str
+        :param encoding: encoding used to parse the file
+        :type encoding: str
+        :rtype: ParseCacheWriter
+        """
+        return ParseCacheWriter(self, ifile, key, encoding)
+
+    def key(self, ifile, encoding=DEFAULT_ENCODING):
+        """Return the cache key of a file
+
+        :param ifile: filename
+        :type ifile: str
+        :param encoding: encoding used to parse the file
+        :type encoding: str
+        :return: hexadecimal key, or None if the file cannot be accessed or
+            the encoding is unknown
+        :rtype: str
+        """
+        try:
+            path = os.path.abspath(ifile)
+            stat = os.stat(path)
+            parts = [
+                str(CACHE_FORMAT),
+                path,
+                str(stat.st_size),
+                str(getattr(stat, "st_mtime_ns", stat.st_mtime)),
+                codecs.lookup(encoding).name,
+            ]
+            if self.content_hash:
+                parts.append(self._hash_contents(path))
+        except (IOError, OSError, LookupError):
+            return None
+
+        return hashlib.sha1(
+            "\0".join(parts).encode("utf-8")).hexdigest()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in
+        max_size bytes."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(entry[1] for entry in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for path in self._entries():
+            self._remove(path)
+
+    def _entries(self):
+        """
+        It returns the paths of the entries stored in the cache directory.
+        """
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+
+        return [
+            os.path.join(self.cache_dir, name) for name in names
+            if name.endswith(CACHE_SUFFIX) and not name.startswith(".")
+        ]
+
+    def _read_entry(self, fhi, path):
+        """
+        It produces the sentences of an open entry, chunk by chunk, until
+        its end mark. The entry is removed if a chunk can not be read.
+        """
+        try:
+            while True:
+                try:
+                    chunk = pickle.load(fhi)
+                except Exception:
+                    self._remove(path)
+                    raise ValueError("Corrupted cache entry: " + path)
+                if chunk is None:
+                    return
+                for sentence in chunk:
+                    yield sentence
+        finally:
+            fhi.close()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def _makedirs(self):
+        try:
+            os.makedirs(self.cache_dir)
+        except OSError:
+            if not os.path.isdir(self.cache_dir):
+                raise
+
+    @staticmethod
+    def _hash_contents(path):
+        digest = hashlib.sha1()
+        with open(path, "rb") as fhi:
+            for chunk in iter(lambda: fhi.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _touch(path):
+        """
+        It marks an entry as recently used. Entries evicted by another
+        process in the meantime are ignored.
+        """
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ParseCacheWriter(object):
+    """A writer of one ParseCache entry, returned by ParseCache.writer()."""
+    def __init__(self, cache, ifile, key, encoding):
+        self.cache = cache
+        self.ifile = ifile
+        self.key = key
+        self.encoding = encoding
+        self._chunk = []
+        self._fho = None
+        self._tmp_path = None
+        self._failed = False
+
+    def write(self, sentence):
+        """Add a sentence to the entry
+
+        Write errors are not raised; the entry is just not stored.
+
+        :param sentence: parsed sentence
+        :type sentence: Sentence
+        """
+        if self._failed:
+            return
+        self._chunk.append(sentence)
+        if len(self._chunk) >= self.cache.chunk_size:
+            self._flush()
+
+    def commit(self):
+        """Store the entry, unless the file changed since key was computed"""
+        current_key = self.cache.key(self.ifile, self.encoding)
+        if (self._failed or current_key is None or
+                (self.key is not None and self.key != current_key)):
+            self.abort()
+            return
+
+        self._flush(end=True)
+        if self._failed:
+            return
+        stored = False
+        try:
+            _replace(self._tmp_path, self.cache._entry_path(current_key))
+            stored = True
+        except (IOError, OSError):
+            return
+        finally:
+            # interrupted or failed writes leave no orphaned temporary file
+            if not stored:
+                self.abort()
+        self._tmp_path = None
+        self.cache.evict()
+
+    def abort(self):
+        """Discard the entry and remove its temporary file"""
+        self._failed = True
+        self._chunk = []
+        if self._fho is not None:
+            self._fho.close()
+            self._fho = None
+        if self._tmp_path is not None:
+            self.cache._remove(self._tmp_path)
+            self._tmp_path = None
+
+    def _flush(self, end=False):
+        """
+        It pickles the buffered chunk, and the end mark of the entry if end
+        is True, to the temporary file, which is created on the first call.
+        """
+        try:
+            if self._fho is None:
+                self.cache._makedirs()
+                fd, self._tmp_path = tempfile.mkstemp(
+                    dir=self.cache.cache_dir, prefix=".tmp-",
+                    suffix=CACHE_SUFFIX)
+                self._fho = os.fdopen(fd, "wb")
+                pickle.dump(CACHE_FORMAT, self._fho, pickle.HIGHEST_PROTOCOL)
+            if self._chunk:
+                pickle.dump(self._chunk, self._fho, pickle.HIGHEST_PROTOCOL)
+                self._chunk = []
+            if end:
+                pickle.dump(None, self._fho, pickle.HIGHEST_PROTOCOL)
+                self._fho.close()
+                self._fho = None
+        except (IOError, OSError):
+            self.abort()
+        except BaseException:
+            self.abort()
+            raise
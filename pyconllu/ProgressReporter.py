@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+import io
+import re
+import sys
+import time
+
+DEFAULT_INTERVAL = 1.0
+TOKEN_LINE_PATTERN = re.compile(r"^\d+\t", re.MULTILINE)
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+class ProgressReporter(object):
+    """A rate-limited reporter of parsing progress and throughput."""
+    def __init__(
+            self, callback=None, interval=DEFAULT_INTERVAL, stream=None,
+            clock=None):
+        """
+        Constructor of ProgressReporter.
+
+        Counters are updated on every call to update(), but the callback is
+        called at most once per interval seconds, plus once by finish(), so
+        reporting costs one clock read per update. The callback receives
+        the dict returned by snapshot(); if no callback is given, a line
+        with the formatted snapshot is written to stream.
+
+        :param callback: function called with each snapshot
+        :type callback: callable
+        :param interval: minimum number of seconds between reports
+        :type interval: float
+        :param stream: stream used when there is no callback, sys.stderr by
+            default
+        :param clock: function returning the current time in seconds
+        :type clock: callable
+        """
+        self.callback = callback
+        self.interval = interval
+        self.stream = stream
+        self.clock = clock or _clock
+        self.total_bytes = None
+        self.bytes_read = 0
+        self.sentences = 0
+        self.tokens = 0
+        self._started = None
+        self._next_report = None
+
+    def start(self, total_bytes=None):
+        """Reset the counters and the clock
+
+        It is called by update() if the reporter was not started.
+
+        :param total_bytes: size of the input, used to estimate the time left
+        :type total_bytes: int
+        """
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.sentences = 0
+        self.tokens = 0
+        self._started = self.clock()
+        self._next_report = self._started + self.interval
+
+    def update(self, sentences=0, tokens=0, bytes_read=0, position=None):
+        """Add to the counters and report if the interval has elapsed
+
+        :param sentences: number of sentences parsed
+        :type sentences: int
+        :param tokens: number of tokens parsed
+        :type tokens: int
+        :param bytes_read: number of bytes read
+        :type bytes_read: int
+        :param position: number of bytes read from the start of the input,
+            e.g. the position of the file, used instead of bytes_read
+        :type position: int
+        """
+        if self._started is None:
+            self.start()
+        self.sentences += sentences
+        self.tokens += tokens
+        if position is None:
+            self.bytes_read += bytes_read
+        else:
+            self.bytes_read = position
+
+        now = self.clock()
+        if now >= self._next_report:
+            self._next_report = now + self.interval
+            self._report(now)
+
+    def update_raw_sentence(self, raw_sentence, position=None):
+        """Count a raw CoNLL-U sentence without parsing it
+
+        Tokens are counted as the lines with an integer ID. Bytes are
+        taken from position if it is given; otherwise, the sentence is
+        encoded to count its size in UTF-8 plus its blank separator line.
+
+        :param raw_sentence: CoNLL-U sentence
+        :type raw_sentence: str
+        :param position: number of bytes read from the start of the input
+        :type position: int
+        """
+        tokens = len(TOKEN_LINE_PATTERN.findall(raw_sentence))
+        if position is None:
+            self.update(1, tokens, byte_size(raw_sentence) + 1)
+        else:
+            self.update(1, tokens, position=position)
+
+    def finish(self):
+        """Report the final counters."""
+        if self._started is None:
+            self.start()
+        self._report(self.clock())
+
+    def snapshot(self, now=None):
+        """Return the counters, rates and estimated time left
+
+        :example:
+
+        >>> reporter.snapshot()
+        {'sentences': 4000, 'tokens': 60000, 'bytes': 3548000,
+         'total_bytes': 10644000, 'elapsed': 2.0, 'sentences_per_second':
+         2000.0, 'tokens_per_second': 30000.0, 'mb_per_second': 1.69,
+         'eta': 4.0}
+
+        :param now: time of the snapshot, the current time by default
+        :type now: float
+        :return: progress counters; eta is None if the size of the input is
+            unknown
+        :rtype: dict
+        """
+        if now is None:
+            now = self.clock()
+        elapsed = now - self._started if self._started is not None else 0.0
+        seconds = elapsed or float("inf")
+
+        eta = None
+        if self.total_bytes is not None and self.bytes_read:
+            remaining = max(self.total_bytes - self.bytes_read, 0)
+            eta = remaining * elapsed / self.bytes_read
+
+        return {
+            'sentences': self.sentences,
+            'tokens': self.tokens,
+            'bytes': self.bytes_read,
+            'total_bytes': self.total_bytes,
+            'elapsed': elapsed,
+            'sentences_per_second': self.sentences / seconds,
+            'tokens_per_second': self.tokens / seconds,
+            'mb_per_second': self.bytes_read / seconds / (1 << 20),
+            'eta': eta,
+        }
+
+    @staticmethod
+    def format(snapshot):
+        """Return a one-line description of a snapshot
+
+        :example:
+
+        >>> ProgressReporter.format(reporter.snapshot())
+        '4000 sentences, 60000 tokens, 3.4 MB in 0:00:02 (2000 sent/s,
+        30000 tok/s, 1.7 MB/s), ETA 0:00:04'
+        """
+        line = (
+            "{} sentences, {} tokens, {:.1f} MB in {} ({:.0f} sent/s, "
+            "{:.0f} tok/s, {:.1f} MB/s)").format(
+                snapshot['sentences'], snapshot['tokens'],
+                snapshot['bytes'] / float(1 << 20),
+                _format_seconds(snapshot['elapsed']),
+                snapshot['sentences_per_second'],
+                snapshot['tokens_per_second'],
+                snapshot['mb_per_second'])
+        if snapshot['eta'] is not None:
+            line += ", ETA " + _format_seconds(snapshot['eta'])
+        return line
+
+    def _report(self, now):
+        snapshot = self.snapshot(now)
+        if self.callback is not None:
+            self.callback(snapshot)
+        else:
+            stream = self.stream or sys.stderr
+            stream.write(self.format(snapshot) + "\n")
+            stream.flush()
+
+
+def byte_size(text):
+    """Return the size of a string in UTF-8."""
+    if isinstance(text, bytes):
+        return len(text)
+    return len(text.encode("utf-8"))
+
+
+def file_position(fhi):
+    """Return a function giving the number of bytes read from a file
+
+    The position is read from the binary buffer of text files, so it is
+    ahead of the text produced by at most the size of a read.
+
+    :param fhi: open file
+    :return: function returning the bytes read since this call, or None if
+        the file can not tell its position, e.g. a pipe or a StringIO
+    :rtype: callable
+    """
+    raw = getattr(fhi, "buffer", fhi)
+    if isinstance(raw, io.TextIOBase):
+        return None
+    try:
+        start = raw.tell()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+    return lambda: raw.tell() - start
+
+
+def _format_seconds(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}:{:02d}:{:02d}".format(hours, minutes, seconds)
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+from collections import OrderedDict
+from .CoNLLU import CoNLLU, DEFAULT_ENCODING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LABEL_FIELDS = ('form', 'lemma', 'upostag', 'xpostag', 'deprel')
+COLUMNS = dict(
+    (field, idx) for idx, field in enumerate(
+        ('id', 'form', 'lemma', 'upostag', 'xpostag', 'feats', 'head',
+         'deprel', 'deps', 'misc')))
+FEATS_COLUMN = COLUMNS['feats']
+
+
+class Relabeler(object):
+    """Apply mapping tables to the labels of CoNLL-U tokens."""
+    def __init__(self, rules=None, conllu=None):
+        """
+        Constructor of Relabeler.
+
+        Rules are applied to every word and empty node, in the order they
+        are added; multiword tokens are left as they are. A rule maps the
+        values of a label field (form, lemma, upostag, xpostag or deprel),
+        optionally reading them from another field, e.g. UPOS from XPOS.
+        Values without a mapping keep their value, or take the default of
+        the rule. A 'feats' rule maps 'Attr=Value' pairs or renames
+        attributes; pairs mapped to None are removed.
+
+        Rules are compiled into dicts, so they are applied with one lookup
+        per token and rule, to raw CoNLL-U text without parsing it, to
+        Sentence objects, or to arrays of vocabulary IDs.
+
+        :example:
+
+        >>> relabeler = Relabeler({
+        ...     "deprel": {"dobj": "obj", "nsubjpass": "nsubj:pass"},
+        ...     "upostag": {"source": "xpostag", "map": {"NN": "NOUN"}},
+        ...     "feats": {"Tense": "Tns", "Gender=Masc": "Gender=M"},
+        ... })
+        >>> relabeler.transform_file("ptb.conllu", "ud.conllu")
+        12000
+
+        :param rules: mapping from field to its mapping table, or to a dict
+            with the 'map' table and optional 'source' field and 'default'
+            value, as in from_json()
+        :type rules: dict
+        :param conllu: parser of the sentences
+        :type conllu: CoNLLU
+        """
+        self.conllu = conllu or CoNLLU()
+        self.rules = []
+        for field, rule in (rules or {}).items():
+            if isinstance(rule, dict) and "map" in rule:
+                self.add(
+                    field, rule["map"], source=rule.get("source"),
+                    default=rule.get("default"))
+            else:
+                self.add(field, rule)
+
+    @classmethod
+    def from_json(cls, ifile, conllu=None):
+        """Build a Relabeler from a JSON file of rules
+
+        :param ifile: filename
+        :type ifile: str
+        :param conllu: parser of the sentences
+        :type conllu: CoNLLU
+        :rtype: Relabeler
+        """
+        with io.open(ifile, encoding="utf-8") as fhi:
+            return cls(
+                json.load(fhi, object_pairs_hook=OrderedDict), conllu=conllu)
+
+    def add(self, field, mapping, source=None, default=None):
+        """Add a rule
+
+        :param field: field that is written
+        :type field: str
+        :param mapping: table from old to new values
+        :type mapping: dict
+        :param source: field whose values are mapped, field by default
+        :type source: str
+        :param default: value of the unmapped values, which keep their value
+            if it is None
+        :type default: str
+        :raises ValueError: if a field is not a label field, or a feature
+            pair is not mapped to a pair or None
+        """
+        if field == "feats":
+            if source is not None or default is not None:
+                raise ValueError("feats rules have no source or default")
+            pairs = {}
+            names = {}
+            for key, value in mapping.items():
+                if "=" not in key:
+                    names[key] = value
+                elif value is None or "=" in value:
+                    pairs[key] = value
+                else:
+                    raise ValueError(
+                        "{!r} must be mapped to an 'Attr=Value' pair or "
+                        "None".format(key))
+            self.rules.append(("feats", "feats", (pairs, names), None))
+            return
+
+        source = source or field
+        for name in (field, source):
+            if name not in LABEL_FIELDS:
+                raise ValueError(
+                    "rules apply to the fields {} and feats".format(
+                        LABEL_FIELDS))
+        self.rules.append((field, source, dict(mapping), default))
+
+    def transform_raw(self, raw_sentence):
+        """Apply the rules to a raw CoNLL-U sentence, without parsing it
+
+        :param raw_sentence: CoNLL-U sentence
+        :type raw_sentence: str
+        :rtype: str
+        """
+        rules = [
+            (COLUMNS[field], COLUMNS[source], mapping, default)
+            for field, source, mapping, default in self.rules]
+        lines = raw_sentence.split("\n")
+        for idx, line in enumerate(lines):
+            if not line or line.startswith("#"):
+                continue
+            columns = line.split("\t")
+            if len(columns) != 10 or "-" in columns[0]:
+                continue
+            for column, source, mapping, default in rules:
+                if column == FEATS_COLUMN:
+                    columns[column] = self._map_feats_column(
+                        columns[column], *mapping)
+                    continue
+                value = mapping.get(columns[source], default)
+                if value is not None:
+                    columns[column] = value
+            lines[idx] = "\t".join(columns)
+        return "\n".join(lines)
+
+    def transform(self, sentences, in_place=False):
+        """Apply the rules to a stream of sentences
+
+        Unless in_place is True, the rules are applied to clones of the
+        sentences, which copy only the tokens that change.
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param in_place: change the sentences instead of clones
+        :type in_place: bool
+        :return: generator producing the changed sentences
+        :rtype: Sentence
+        """
+        for sentence in sentences:
+            if not in_place:
+                sentence = sentence.clone()
+            tokens = sentence.tokens + [
+                token for token, _ in sentence.empty_nodes]
+            for token in tokens:
+                self._transform_token(token)
+            yield sentence
+
+    def transform_file(self, ifile, ofile, encoding=DEFAULT_ENCODING):
+        """Apply the rules to a CoNLL-U file, one raw sentence at a time
+
+        :param ifile: input filename
+        :type ifile: str
+        :param ofile: output filename
+        :type ofile: str
+        :param encoding: encoding of both files
+        :type encoding: str
+        :return: number of sentences written
+        :rtype: int
+        """
+        count = 0
+        with io.open(ofile, "w", encoding=encoding) as fho:
+            for raw_sentence in self.conllu.read_sentences_from_file(
+                    ifile, encoding):
+                fho.write(self.transform_raw(raw_sentence).rstrip("\n"))
+                fho.write(u"\n\n")
+                count += 1
+        return count
+
+    def lookup_table(self, field, vocabulary, source_vocabulary=None):
+        """Compile the rules of a field into an array of vocabulary IDs
+
+        The rules of the field are composed in order, and new values are
+        added to vocabulary. Applying the table is a single indexing
+        operation: table[ids]. If the rules read another field, the table
+        is indexed with the IDs of that field, and source values that keep
+        the value of the field are -1. The padding and unknown IDs of the
+        vocabularies are kept, or -1, unless their symbol is None, in which
+        case the ID is the one of missing values ('_'). Values mapped to
+        '_' take that ID too, or the unknown ID if there is none.
+
+        :example:
+
+        >>> table = relabeler.lookup_table("deprel", vocabularies["deprel"])
+        >>> batch["deprel"] = table[batch["deprel"]]
+        >>> table = relabeler.lookup_table(
+        ...     "upostag", vocabularies["upostag"], vocabularies["xpostag"])
+        >>> mapped = table[batch["xpostag"]]
+        >>> batch["upostag"] = np.where(mapped < 0, batch["upostag"], mapped)
+
+        :param field: field that is written
+        :type field: str
+        :param vocabulary: vocabulary of the field
+        :type vocabulary: Vocabulary
+        :param source_vocabulary: vocabulary of the source field, if the
+            rules read another field
+        :type source_vocabulary: Vocabulary
+        :return: int32 array with the new ID of each source ID
+        :rtype: numpy.ndarray
+        :raises ValueError: if the rules of the field read several fields
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required to build lookup tables: "
+                "pip install pyconllu[numpy]")
+        rules = [rule for rule in self.rules if rule[0] == field]
+        sources = set(rule[1] for rule in rules) or set([field])
+        if len(sources) > 1:
+            raise ValueError(
+                "the rules of {} read several fields: {}".format(
+                    field, ", ".join(sorted(sources))))
+        source = sources.pop()
+        if source != field and source_vocabulary is None:
+            raise ValueError(
+                "the rules of {} read {}: pass its vocabulary".format(
+                    field, source))
+
+        if source == field:
+            # rules are composed; reserved IDs are kept
+            reserved = _reserved_ids(vocabulary)
+            table = []
+            for idx in range(len(vocabulary)):
+                if idx in reserved:
+                    table.append(idx)
+                    continue
+                value = _value(vocabulary.value(idx))
+                for _, _, mapping, default in rules:
+                    mapped = self._map_value(field, value, mapping, default)
+                    if mapped is not None:
+                        value = mapped
+                table.append(_vocabulary_id(vocabulary, value))
+        else:
+            # the last rule that maps a source value wins
+            reserved = _reserved_ids(source_vocabulary)
+            table = []
+            for idx in range(len(source_vocabulary)):
+                new = None
+                if idx not in reserved:
+                    value = _value(source_vocabulary.value(idx))
+                    for _, _, mapping, default in rules:
+                        mapped = mapping.get(value, default)
+                        if mapped is not None:
+                            new = mapped
+                table.append(
+                    -1 if new is None else _vocabulary_id(vocabulary, new))
+        return np.array(table, dtype=np.int32)
+
+    def _transform_token(self, token):
+        for field, source, mapping, default in self.rules:
+            if field == "feats":
+                feats = self._map_feats(token.feats, *mapping)
+                if feats is not token.feats:
+                    token.feats = feats
+                continue
+            value = _value(getattr(token, source))
+            mapped = mapping.get(value, default)
+            if mapped is not None and mapped != _value(getattr(token, field)):
+                setattr(token, field, None if mapped == "_" else mapped)
+
+    def _map_value(self, field, value, mapping, default):
+        """
+        It returns the value mapped by a rule, or None if the rule keeps
+        the value.
+        """
+        if field == "feats":
+            return self._map_feats_column(value, *mapping)
+        return mapping.get(value, default)
+
+    def _map_feats(self, feats, pairs, names):
+        """
+        It returns FEATS with the feature rule applied, or the same object
+        if the rule does not apply.
+        """
+        if not feats:
+            return feats
+        mapped = [
+            self._map_pair(attribute, value, pairs, names)
+            for attribute, value in feats.items()]
+        if mapped == list(feats.items()):
+            return feats
+        mapped = [pair for pair in mapped if pair is not None]
+        if not mapped:
+            return None
+        return OrderedDict(sorted(mapped, key=lambda pair: pair[0].lower()))
+
+    def _map_feats_column(self, column, pairs, names):
+        if column == "_":
+            return column
+        feats = OrderedDict(
+            pair.split("=", 1) for pair in column.split("|") if "=" in pair)
+        mapped = self._map_feats(feats, pairs, names)
+        if mapped is feats:
+            return column
+        if not mapped:
+            return "_"
+        return "|".join("=".join(pair) for pair in mapped.items())
+
+    @staticmethod
+    def _map_pair(attribute, value, pairs, names):
+        key = "{}={}".format(attribute, value)
+        if key in pairs:
+            mapped = pairs[key]
+            return None if mapped is None else tuple(mapped.split("=", 1))
+        if attribute in names:
+            name = names[attribute]
+            return None if name is None else (name, value)
+        return attribute, value
+
+
+def _value(value):
+    return "_" if value is None else value
+
+
+def _reserved_ids(vocabulary):
+    """
+    It returns the padding and unknown IDs of a vocabulary whose symbols
+    are not None.
+    """
+    return set(
+        idx for idx, symbol in (
+            (vocabulary.pad_id, vocabulary.pad),
+            (vocabulary.unk_id, vocabulary.unk))
+        if symbol is not None)
+
+
+def _vocabulary_id(vocabulary, value):
+    """
+    It returns the ID of a value, adding it to the vocabulary. Missing
+    values ('_') are None in vocabularies, or unknown if there is no None.
+    """
+    if value == "_":
+        return vocabulary.ids.get(None, vocabulary.unk_id)
+    return vocabulary.add(value)
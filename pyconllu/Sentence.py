@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
+from copy import copy
+from .Token import CopyOnWriteToken, Token
 
 
 class Sentence(object):
@@ -37,6 +40,21 @@ class Sentence(object):
             )
         )
 
+    def __reduce__(self):
+        """
+        It pickles the tokens as one tuple per field (see Token.pack_many),
+        instead of one object per token.
+        """
+        tokens = self.tokens
+        if all(type(token) is Token for token in tokens):
+            return (
+                _unpack_sentence,
+                (self.__class__, self.comments, Token.pack_many(tokens),
+                 self.contractions, self.empty_nodes))
+        return (
+            self.__class__,
+            (tokens, self.comments, self.contractions, self.empty_nodes))
+
     def __eq__(self, other):
         if isinstance(other, self.__class__):
             return (
@@ -52,6 +70,39 @@ class Sentence(object):
             return NotImplemented
         return not self.__eq__(other)
 
+    def clone(self):
+        """Return a copy of the sentence that shares its tokens until they
+        are edited
+
+        Tokens, contractions and empty nodes are wrapped in
+        CopyOnWriteToken objects, which read the fields of the original
+        tokens and copy them only when a field is assigned, so cloning costs
+        no copy of the fields and edits of the clone do not change the
+        original sentence. Until they are edited, the tokens of the clone
+        are views of the original tokens: do not edit the original sentence
+        while the clone is in use. The lists are new, so tokens can be added
+        or removed. Tokens of classes derived from Token are copied with
+        copy.copy().
+
+        :example:
+
+        >>> clone = sentence.clone()
+        >>> clone.tokens[0].lemma = "el"
+        >>> sentence.tokens[0].lemma
+        'o'
+
+        :rtype: Sentence
+        """
+        return self.__class__(
+            tokens=[_clone_token(token) for token in self.tokens],
+            comments=self.comments,
+            contractions=[
+                (_clone_token(token), idx)
+                for token, idx in self.contractions],
+            empty_nodes=[
+                (_clone_token(token), idx)
+                for token, idx in self.empty_nodes])
+
     @property
     def tokens(self):
         return self._tokens
@@ -67,6 +118,45 @@ class Sentence(object):
     @comments.setter
     def comments(self, value):
         self._comments = value
+        self._metadata = None
+
+    @property
+    def metadata(self):
+        """Metadata in the comments, as an ordered mapping.
+
+        Comments such as '# sent_id = 1' are stored as key-value pairs and
+        single-word comments such as '# newpar' as keys with value None;
+        other free-text comments are ignored. It is parsed on first access
+        and cached until the comments change.
+
+        :example:
+
+        >>> sentence.metadata
+        OrderedDict([('sent_id', '1'), ('text', 'A cidade.')])
+        """
+        if self._metadata is None:
+            self._metadata = self._parse_metadata(self._comments)
+        return self._metadata
+
+    @staticmethod
+    def _parse_metadata(comments):
+        """
+        It parses '# key = value' comments into an OrderedDict.
+        """
+        metadata = OrderedDict()
+        for line in comments.split("\n"):
+            line = line.strip()
+            if not line.startswith("#"):
+                continue
+
+            key, separator, value = line.lstrip("#").partition("=")
+            key = key.strip()
+            if separator and key:
+                metadata[key] = value.strip()
+            elif key and len(key.split()) == 1:
+                metadata[key] = None
+
+        return metadata
 
     @property
     def contractions(self):
@@ -83,3 +173,22 @@ class Sentence(object):
     @empty_nodes.setter
     def empty_nodes(self, value):
         self._empty_nodes = value
+
+
+def _clone_token(token):
+    """
+    It returns a copy-on-write view of a token, or a shallow copy of tokens
+    of other classes.
+    """
+    if type(token) in (Token, CopyOnWriteToken):
+        return CopyOnWriteToken(token)
+    return copy(token)
+
+
+def _unpack_sentence(cls, comments, columns, contractions, empty_nodes):
+    """
+    It rebuilds a pickled sentence.
+    """
+    return cls(
+        tokens=Token.unpack_many(columns), comments=comments,
+        contractions=contractions, empty_nodes=empty_nodes)
@@ -0,0 +1,501 @@
+# -*- coding: utf-8 -*-
+import json
+import multiprocessing
+import os
+import struct
+import weakref
+from array import array
+from .CoNLLU import CoNLLU
+from .HeadDep import HeadDep
+from .Sentence import Sentence
+from .Token import Token
+from .Vocabulary import Vocabulary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    resource_tracker = shared_memory = None
+
+LABEL_FIELDS = ('form', 'lemma', 'upostag', 'xpostag', 'deprel')
+TEXT_FIELDS = LABEL_FIELDS + ('feats', 'deps', 'misc')
+TOKEN_COLUMNS = ('id', 'head') + TEXT_FIELDS
+FORMAT_VERSION = 1
+
+_ALIGNMENT = 8
+_HEADER_SIZE = struct.Struct("<Q")
+# segments created by this process, which its resource tracker unlinks
+_created = set()
+
+
+class SharedCorpus(object):
+    """A parsed corpus stored as columns in shared memory, to be read by
+    several processes without parsing or copying it again."""
+    def __init__(self, sentences, name=None, conllu=None):
+        """
+        Constructor of SharedCorpus.
+
+        The sentences are parsed once into columns of integers: the ID and
+        HEAD of every word, the vocabulary ID of each of its other fields
+        (FEATS, DEPS and MISC are encoded as they are written in CoNLL-U),
+        the comments of each sentence and the 'offsets' of the sentences in
+        the token columns. The columns and the strings of the vocabularies
+        are placed in one shared memory segment, which other processes
+        attach to by name with SharedCorpus.attach(), or by unpickling the
+        corpus, e.g. as an argument of a Pool task. They get read-only views
+        of the columns; strings are decoded when they are accessed.
+
+        Contractions and empty nodes are not stored. The process that
+        creates the corpus owns the segment: close() releases it, and it is
+        removed when the corpus is garbage collected or the process exits.
+
+        :example:
+
+        >>> corpus = SharedCorpus(conllu.parse_file("corpus.conllu"))
+        >>> pool = multiprocessing.Pool(16)
+        >>> pool.map(count_roots, [(corpus, start, start + 1000)
+        ...                        for start in range(0, len(corpus), 1000)])
+        >>> corpus.close()
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param name: name of the shared memory segment, chosen at random if
+            not given
+        :type name: str
+        :param conllu: parser of the values and proper-name rule
+        :type conllu: CoNLLU
+        """
+        _check_support()
+        conllu = conllu or CoNLLU()
+        vocabularies = dict(
+            (field, Vocabulary(pad=None))
+            for field in TEXT_FIELDS + ('comments',))
+        columns = dict((field, array("i")) for field in TOKEN_COLUMNS)
+        comments = array("i")
+        offsets = array("q", [0])
+
+        label_columns = [
+            (columns[field].append, vocabularies[field].add, field)
+            for field in LABEL_FIELDS]
+        expanded_columns = [
+            (columns[field].append, vocabularies[field].add, field, expand)
+            for field, expand in (
+                ('feats', Token._expand_features),
+                ('deps', Token._expand_deps), ('misc', Token._expand_misc))]
+        append_id = columns['id'].append
+        append_head = columns['head'].append
+
+        for sentence in sentences:
+            for token in sentence.tokens:
+                append_id(int(token.id))
+                append_head(-1 if token.head is None else token.head)
+                for append, add, field in label_columns:
+                    append(add(getattr(token, field)))
+                for append, add, field, expand in expanded_columns:
+                    value = getattr(token, field)
+                    append(add(None if value is None else expand(value)))
+            offsets.append(len(columns['id']))
+            comments.append(
+                vocabularies['comments'].add(sentence.comments or None))
+
+        data = [
+            ('offsets', np.int64, offsets), ('comments', np.int32, comments)]
+        data.extend(
+            (field, np.int32, columns[field]) for field in TOKEN_COLUMNS)
+        for field, vocabulary in sorted(vocabularies.items()):
+            data.extend(_encode_strings(field, vocabulary))
+
+        header = {
+            'version': FORMAT_VERSION,
+            'propername_pattern': conllu.propername_pattern.pattern,
+            'columns': {},
+        }
+        size = 0
+        for column, dtype, values in data:
+            dtype = np.dtype(dtype)
+            header['columns'][column] = [dtype.str, size, len(values)]
+            size = _align(size + len(values) * dtype.itemsize)
+        encoded_header = json.dumps(header).encode("utf-8")
+        start = _align(_HEADER_SIZE.size + len(encoded_header))
+
+        segment = shared_memory.SharedMemory(
+            name=name, create=True, size=max(start + size, 1))
+        _created.add(segment.name)
+        try:
+            segment.buf[:_HEADER_SIZE.size] = _HEADER_SIZE.pack(
+                len(encoded_header))
+            segment.buf[
+                _HEADER_SIZE.size:_HEADER_SIZE.size + len(encoded_header)] = (
+                    encoded_header)
+            for column, dtype, values in data:
+                _, offset, count = header['columns'][column]
+                view = np.ndarray(
+                    (count,), dtype=dtype, buffer=segment.buf,
+                    offset=start + offset)
+                view[:] = np.frombuffer(values, dtype=dtype, count=count)
+                del view
+        except Exception:
+            _release(segment, os.getpid())
+            raise
+
+        self._open(segment, os.getpid(), conllu)
+
+    @classmethod
+    def attach(cls, name, conllu=None):
+        """Attach to a corpus created by another process
+
+        :param name: name of the shared memory segment
+        :type name: str
+        :param conllu: parser of the values and proper-name rule, by
+            default with the proper-name pattern of the owner
+        :type conllu: CoNLLU
+        :rtype: SharedCorpus
+        :raises FileNotFoundError: if there is no segment with that name
+        """
+        _check_support()
+        corpus = cls.__new__(cls)
+        corpus._open(_attach_segment(name), None, conllu)
+        return corpus
+
+    def __len__(self):
+        """Number of sentences."""
+        return len(self._column('offsets')) - 1
+
+    def __reduce__(self):
+        """
+        It pickles the name of the segment, so the corpus is attached
+        instead of copied.
+        """
+        return (_attach, (self.__class__, self.name))
+
+    def __repr__(self):
+        return '{}(name={}, sentences={}, tokens={}, owner={})'.format(
+            self.__class__.__name__, self.name, len(self), self.token_count,
+            self.owner)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def token_count(self):
+        """Number of words."""
+        return len(self._column('id'))
+
+    @property
+    def owner(self):
+        """True in the process that created the corpus."""
+        return self._owner == os.getpid()
+
+    @property
+    def closed(self):
+        """True after close()."""
+        return self._columns is None
+
+    def close(self):
+        """Release the shared memory segment
+
+        In the owner process, the segment is also removed, so processes
+        attached to it can no longer read it. Arrays returned by column()
+        keep the memory mapped until they are deleted.
+        """
+        self._columns = None
+        self._finalizer()
+
+    def column(self, field):
+        """Return a read-only view of a column
+
+        Token columns are 'id', 'head' (-1 for missing heads) and the
+        vocabulary IDs of form, lemma, upostag, xpostag, deprel, feats, deps
+        and misc; sentence columns are 'comments' and 'offsets', with the
+        position of the first word of each sentence and the number of
+        words at the end.
+
+        :example:
+
+        >>> deprel = corpus.column("deprel")
+        >>> nsubj = corpus.vocabulary("deprel").index("nsubj")
+        >>> int((deprel == nsubj).sum())
+        10204
+
+        :param field: name of the column
+        :type field: str
+        :rtype: numpy.ndarray
+        """
+        if field not in TOKEN_COLUMNS + ('comments', 'offsets'):
+            raise ValueError("Unknown column: {!r}".format(field))
+        return self._column(field)
+
+    def vocabulary(self, field):
+        """Return the vocabulary of the IDs of a column, where ID 0 stands
+        for missing values
+
+        :param field: form, lemma, upostag, xpostag, deprel, feats, deps,
+            misc or comments
+        :type field: str
+        :rtype: Vocabulary
+        """
+        if field not in self._vocabularies:
+            values = [
+                self.value(field, idx)
+                for idx in range(2, len(self._column(field + '.offsets')) - 1)]
+            self._vocabularies[field] = Vocabulary(
+                values, pad=None, unk=self.value(field, 1))
+        return self._vocabularies[field]
+
+    def value(self, field, idx):
+        """Return the string of a vocabulary ID, None for ID 0
+
+        :param field: form, lemma, upostag, xpostag, deprel, feats, deps,
+            misc or comments
+        :type field: str
+        :param idx: vocabulary ID
+        :type idx: int
+        :rtype: str
+        """
+        strings = self._strings.setdefault(field, {0: None})
+        try:
+            return strings[idx]
+        except KeyError:
+            offsets = self._column(field + '.offsets')
+            data = self._column(field + '.strings')
+            value = data[offsets[idx]:offsets[idx + 1]].tobytes().decode(
+                "utf-8")
+            strings[idx] = value
+            return value
+
+    def head_positions(self):
+        """Return the position of the head of every word in the token
+        columns, -1 for the root and missing heads
+
+        :rtype: numpy.ndarray
+        """
+        offsets = self._column('offsets')
+        heads = self._column('head').astype(np.int64)
+        starts = np.repeat(offsets[:-1], np.diff(offsets))
+        return np.where(heads > 0, starts + heads - 1, -1)
+
+    def get_tokens(self, idx):
+        """Return the words of a sentence
+
+        :param idx: index of the sentence
+        :type idx: int
+        :rtype: list
+        """
+        start, end = self._bounds(idx)
+        return [self._token(position) for position in range(start, end)]
+
+    def get_sentence(self, idx):
+        """Return a sentence with its comments and words
+
+        :param idx: index of the sentence
+        :type idx: int
+        :rtype: Sentence
+        """
+        comments = self.value('comments', int(self._column('comments')[idx]))
+        return Sentence(tokens=self.get_tokens(idx), comments=comments or "")
+
+    def get_sentence_id(self, idx):
+        """Return the sent_id of a sentence, as CoNLLU.get_sentence_id()
+
+        :param idx: index of the sentence
+        :type idx: int
+        :rtype: str
+        """
+        comments = self.value('comments', int(self._column('comments')[idx]))
+        return Sentence._parse_metadata(comments or "").get("sent_id")
+
+    def get_root(self, idx):
+        """Return the root of a sentence, as CoNLLU.get_root()
+
+        :param idx: index of the sentence
+        :type idx: int
+        :rtype: Token
+        """
+        start, end = self._bounds(idx)
+        roots = np.flatnonzero(self._column('head')[start:end] == 0)
+        if len(roots):
+            return self._token(start + int(roots[0]))
+
+    def get_heads(self, idx):
+        """Return the heads of a sentence, as CoNLLU.get_heads()
+
+        :param idx: index of the sentence
+        :type idx: int
+        :rtype: list
+        """
+        return self.conllu.get_heads(self.get_sentence(idx))
+
+    def get_headdep_triples(self, idx):
+        """Return the dependency triples of a sentence, as
+        CoNLLU.get_headdep_triples(), decoding only the values they use
+
+        :param idx: index of the sentence
+        :type idx: int
+        :rtype: list
+        """
+        start, end = self._bounds(idx)
+        heads = self._column('head')[start:end].tolist()
+        forms, lemmas, upostags, xpostags, deprels = [
+            self._column(field)[start:end].tolist()
+            for field in LABEL_FIELDS]
+        value = self.value
+        is_propername_pair = self.conllu._is_propername_pair
+
+        triples = []
+        for dep_idx, head in enumerate(heads):
+            if head <= 0:
+                continue
+            head_idx = head - 1
+            tags = (
+                value('xpostag', xpostags[head_idx]),
+                value('upostag', upostags[head_idx]))
+            triples.append(HeadDep(
+                value('form', forms[head_idx]) if is_propername_pair(tags)
+                else value('lemma', lemmas[head_idx]),
+                value('lemma', lemmas[dep_idx]),
+                value('deprel', deprels[dep_idx]),
+                (head_idx, dep_idx)))
+        return triples
+
+    def _open(self, segment, owner, conllu):
+        """
+        It reads the header of a segment and builds read-only views of its
+        columns.
+        """
+        buf = segment.buf
+        size = _HEADER_SIZE.unpack(bytes(buf[:_HEADER_SIZE.size]))[0]
+        header = json.loads(
+            bytes(buf[_HEADER_SIZE.size:_HEADER_SIZE.size + size]).decode(
+                "utf-8"))
+        if header['version'] != FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported shared corpus version: {}".format(
+                    header['version']))
+        start = _align(_HEADER_SIZE.size + size)
+
+        columns = {}
+        for column, (dtype, offset, count) in header['columns'].items():
+            view = np.ndarray(
+                (count,), dtype=np.dtype(dtype), buffer=buf,
+                offset=start + offset)
+            view.flags.writeable = False
+            columns[column] = view
+
+        self.name = segment.name
+        self.conllu = conllu or CoNLLU(
+            propername_pattern=header['propername_pattern'])
+        self._owner = owner
+        self._columns = columns
+        self._strings = {}
+        self._vocabularies = {}
+        self._finalizer = weakref.finalize(self, _release, segment, owner)
+
+    def _column(self, field):
+        if self._columns is None:
+            raise ValueError("I/O operation on closed corpus")
+        return self._columns[field]
+
+    def _bounds(self, idx):
+        offsets = self._column('offsets')
+        if idx < 0:
+            idx += len(offsets) - 1
+        if not 0 <= idx < len(offsets) - 1:
+            raise IndexError("sentence index out of range")
+        return int(offsets[idx]), int(offsets[idx + 1])
+
+    def _token(self, position):
+        """
+        It decodes the word at a position of the token columns, parsing
+        FEATS, DEPS and MISC as CoNLLU does.
+        """
+        value = self.value
+        conllu = self.conllu
+        values = dict(
+            (field, value(field, int(self._column(field)[position])))
+            for field in TEXT_FIELDS)
+        head = int(self._column('head')[position])
+        for field, parse in (
+                ('feats', conllu._parse_dict_value),
+                ('deps', conllu._parse_paired_list_value),
+                ('misc', conllu._parse_dict_value)):
+            if values[field] is not None:
+                values[field] = parse(values[field])
+        return Token(
+            id=str(self._column('id')[position]),
+            head=None if head < 0 else head, **values)
+
+
+def _check_support():
+    if np is None:
+        raise ImportError(
+            "numpy is required to share corpora: pip install pyconllu[numpy]")
+    if shared_memory is None:
+        raise ImportError(
+            "multiprocessing.shared_memory requires Python 3.8 or later")
+
+
+def _align(size):
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _encode_strings(field, vocabulary):
+    """
+    It returns the columns with the UTF-8 strings of a vocabulary and their
+    offsets; ID 0 (None) is empty.
+    """
+    values = [
+        b"" if value is None else value.encode("utf-8")
+        for value in (vocabulary.value(idx) for idx in range(len(vocabulary)))]
+    offsets = array("q", [0])
+    for value in values:
+        offsets.append(offsets[-1] + len(value))
+    return [
+        (field + '.offsets', np.int64, offsets),
+        (field + '.strings', np.uint8, b"".join(values))]
+
+
+def _attach_segment(name):
+    """
+    It opens an existing segment without letting the resource tracker of
+    this process remove it at exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13, attaching registers the segment, and the
+        # tracker unlinks it when the process exits; multiprocessing
+        # workers share the tracker of their parent, which already has it
+        segment = shared_memory.SharedMemory(name=name)
+        if (os.name == "posix" and segment.name not in _created and
+                multiprocessing.parent_process() is None):
+            resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _attach(cls, name):
+    return cls.attach(name)
+
+
+def _release(segment, owner):
+    """
+    It closes a segment and, in the process that created it, removes it.
+    """
+    try:
+        segment.close()
+    except BufferError:
+        # views of the columns are still alive; the mapping is released
+        # with them
+        pass
+    if owner == os.getpid():
+        _created.discard(segment.name)
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+import re
+from array import array
+from collections import Counter
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_TEMPLATES = (
+    'upostag', 'deprel', 'feats', 'head:upostag', 'upostag[-1]',
+    'upostag[+1]')
+DEFAULT_CHUNK_SIZE = 1024
+TEMPLATE_FIELDS = ('form', 'lemma', 'upostag', 'xpostag', 'feats', 'deprel')
+BOS = "<s>"
+EOS = "</s>"
+ROOT = "<root>"
+
+_TEMPLATE_PATTERN = re.compile(r"^(head:)?([a-z]+)(?:\[([+-]?\d+)\])?$")
+
+
+class SparseFeatureExporter(object):
+    """Encode the tokens of parsed CoNLL-U sentences as sparse binary
+    feature rows in CSR form."""
+    def __init__(self, templates=DEFAULT_TEMPLATES, features=None):
+        """
+        Constructor of SparseFeatureExporter.
+
+        Each template produces one feature per token, named after the
+        template and the value, e.g. 'upostag=NOUN', 'upostag[-1]=DET'
+        (the previous token, '<s>' or '</s>' beyond the sentence),
+        'head:upostag=VERB' (the head, '<root>' for the root) or, for
+        FEATS, one feature per pair, e.g. 'feats=Gender=Fem'. Missing
+        values produce no feature.
+
+        Features get columns in order of appearance, unless a fixed list
+        of features is given or fit() is called, after which unknown
+        features are dropped. The column of each template and value is
+        cached, so feature names are only built the first time a value is
+        seen, and rows are appended to flat integer buffers, so no per-token
+        dict is built.
+
+        :example:
+
+        >>> exporter = SparseFeatureExporter()
+        >>> exporter.fit(conllu.parse_file("train.conllu"), min_count=2)
+        >>> matrix = exporter.transform(conllu.parse_file("test.conllu"))
+        >>> scipy.sparse.csr_matrix(
+        ...     (matrix['data'], matrix['indices'], matrix['indptr']),
+        ...     shape=matrix['shape'])
+
+        :param templates: feature templates: a field among form, lemma,
+            upostag, xpostag, feats and deprel, optionally prefixed with
+            'head:' or followed by a window offset such as '[-1]'
+        :type templates: tuple
+        :param features: fixed feature names, in column order
+        :type features: iterable
+        :raises ValueError: if a template is not valid
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required to export sparse features: "
+                "pip install pyconllu[numpy]")
+
+        self.templates = tuple(templates)
+        self._parsed_templates = [
+            _parse_template(template) for template in self.templates]
+        self._names = []
+        self._columns = {}
+        # column of each value of each template, None for unknown features
+        self._template_columns = [{} for _ in self.templates]
+        self.fixed = features is not None
+        for name in features or []:
+            self._add(name)
+
+    def __len__(self):
+        """Number of features."""
+        return len(self._names)
+
+    @property
+    def feature_names(self):
+        """Feature names, in column order."""
+        return list(self._names)
+
+    def fit(self, sentences, min_count=1):
+        """Learn a fixed feature vocabulary from a stream of sentences
+
+        Features are added by decreasing frequency, ties broken
+        alphabetically, to the features already known.
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param min_count: minimum number of occurrences of a feature
+        :type min_count: int
+        """
+        counts = Counter()
+        for sentence in sentences:
+            for names in self.token_features(sentence):
+                counts.update(names)
+        for name, count in sorted(
+                counts.items(), key=lambda item: (-item[1], item[0])):
+            if count >= min_count:
+                self._add(name)
+        self.fixed = True
+        for cache in self._template_columns:
+            cache.clear()
+
+    def token_features(self, sentence):
+        """Return the feature names of each token of a sentence
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :rtype: list
+        """
+        names = [[] for _ in sentence.tokens]
+        for prefix, values in self._template_values(sentence):
+            for token_names, value in zip(names, values):
+                if value is None:
+                    continue
+                if isinstance(value, list):
+                    token_names.extend(prefix + item for item in value)
+                else:
+                    token_names.append(prefix + value)
+        return names
+
+    def iter_chunks(self, sentences, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Produce CSR matrices of chunks of sentences
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param chunk_size: number of sentences in each chunk
+        :type chunk_size: int
+        :return: generator producing dicts with the CSR arrays 'indptr'
+            (int64), 'indices' (int32) and 'data' (float32 ones), the
+            'shape' (tokens, features known so far) and the 'lengths' of
+            the sentences
+        :rtype: dict
+        """
+        sentences = iter(sentences)
+        while True:
+            chunk = list(islice(sentences, chunk_size))
+            if not chunk:
+                return
+            yield self.transform(chunk)
+
+    def transform(self, sentences):
+        """Return the CSR matrix of the tokens of a stream of sentences
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :return: dict as produced by iter_chunks()
+        :rtype: dict
+        """
+        indptr = array("l", [0])
+        indices = array("i")
+        lengths = array("i")
+        for sentence in sentences:
+            for columns in self._token_columns(sentence):
+                indices.extend(columns)
+                indptr.append(len(indices))
+            lengths.append(len(sentence.tokens))
+
+        return {
+            'indptr': np.array(indptr, dtype=np.int64),
+            'indices': np.array(indices, dtype=np.int32),
+            'data': np.ones(len(indices), dtype=np.float32),
+            'shape': (len(indptr) - 1, len(self._names)),
+            'lengths': np.array(lengths, dtype=np.int32),
+        }
+
+    def _token_columns(self, sentence):
+        """
+        It returns the sorted feature columns of each token of a sentence,
+        adding new features unless the vocabulary is fixed.
+        """
+        get = self._columns.get if self.fixed else self._add
+        rows = [[] for _ in sentence.tokens]
+        for cache, (prefix, values) in zip(
+                self._template_columns, self._template_values(sentence)):
+            for row, value in zip(rows, values):
+                if value is None:
+                    continue
+                if not isinstance(value, list):
+                    try:
+                        column = cache[value]
+                    except KeyError:
+                        column = cache[value] = get(prefix + value)
+                    if column is not None:
+                        row.append(column)
+                    continue
+                for item in value:
+                    try:
+                        column = cache[item]
+                    except KeyError:
+                        column = cache[item] = get(prefix + item)
+                    if column is not None:
+                        row.append(column)
+        for row in rows:
+            row.sort()
+        return rows
+
+    def _template_values(self, sentence):
+        """
+        It produces the prefix and the values of each template for the
+        tokens of a sentence; FEATS values are lists of 'Attr=Value'.
+        """
+        tokens = sentence.tokens
+        cache = {}
+        for template, (head, field, offset) in zip(
+                self.templates, self._parsed_templates):
+            if field not in cache:
+                cache[field] = [_field_value(token, field) for token in tokens]
+            values = cache[field]
+
+            if head:
+                values = [
+                    None if token.head is None else
+                    ROOT if token.head == 0 else
+                    values[token.head - 1] if token.head <= len(values)
+                    else None
+                    for token in tokens]
+            elif offset < 0:
+                values = [BOS] * min(-offset, len(values)) + values[:offset]
+            elif offset > 0:
+                values = values[offset:] + [EOS] * min(offset, len(values))
+            yield template + "=", values
+
+    def _add(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            self._columns[name] = len(self._names)
+            self._names.append(name)
+            return self._columns[name]
+
+
+def _parse_template(template):
+    """
+    It returns the (head, field, offset) of a feature template.
+    """
+    match = _TEMPLATE_PATTERN.match(template)
+    if match is None or match.group(2) not in TEMPLATE_FIELDS:
+        raise ValueError("Invalid feature template: {!r}".format(template))
+    head, field, offset = match.groups()
+    if head and offset:
+        raise ValueError(
+            "Invalid feature template: {!r}, head features have no "
+            "offset".format(template))
+    return bool(head), field, int(offset or 0)
+
+
+def _field_value(token, field):
+    value = getattr(token, field)
+    if field == "feats":
+        if not value:
+            return None
+        return [
+            "{}={}".format(attribute, item)
+            for attribute, item in value.items() if item is not None]
+    return value
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+from string import Formatter
+from .DependencyTree import DependencyTree
+from .NgramCounter import DEFAULT_MAX_N, NgramCounter, SEPARATOR
+
+LABEL_FIELDS = ('id', 'form', 'lemma', 'upostag', 'xpostag', 'deprel')
+DEFAULT_TEMPLATE = "{lemma}"
+
+
+class SyntacticNgramCounter(NgramCounter):
+    """Count the dependency paths of a stream of sentences."""
+    def __init__(
+            self, template=DEFAULT_TEMPLATE, max_n=DEFAULT_MAX_N,
+            deprels=True, min_count=1, max_entries=None, spill_dir=None,
+            conllu=None):
+        """
+        Constructor of SyntacticNgramCounter.
+
+        A syntactic n-gram is a downward path of n tokens in the dependency
+        tree, from a head to a dependent of a dependent, and so on. Each
+        token is labelled with a template over its fields, where LEMMA
+        follows the proper-name rule of CoNLLU.get_lemmas(); with deprels,
+        the DEPREL of each dependent is inserted before its label. The
+        paths ending at a token extend those ending at its head, so a
+        sentence is processed in time linear in the number of paths.
+
+        Counting, merging, memory limits and output files work as in
+        NgramCounter; items() produces tuples such as ('ver', 'obj',
+        'casa').
+
+        :example:
+
+        >>> counter = SyntacticNgramCounter("{lemma}/{upostag}", max_n=3)
+        >>> counter.count_files(["a.conllu", "b.conllu"], jobs=2)
+        >>> counter.most_common(2, 1)
+        [(('ser/AUX', 'nsubj', 'paciente/NOUN'), 52)]
+
+        :param template: format string over the fields id, form, lemma,
+            upostag, xpostag and deprel
+        :type template: str
+        :param max_n: largest number of tokens in a path
+        :type max_n: int
+        :param deprels: include the DEPREL of the arcs
+        :type deprels: bool
+        :param min_count: minimum count of the paths produced by items()
+        :type min_count: int
+        :param max_entries: maximum number of paths held in memory
+        :type max_entries: int
+        :param spill_dir: directory for the sorted runs
+        :type spill_dir: str
+        :param conllu: parser of the sentences and proper-name rule
+        :type conllu: CoNLLU
+        """
+        super(SyntacticNgramCounter, self).__init__(
+            max_n=max_n, min_count=min_count, max_entries=max_entries,
+            spill_dir=spill_dir, conllu=conllu)
+        for _, name, _, _ in Formatter().parse(template):
+            if name is not None and name not in LABEL_FIELDS:
+                raise ValueError(
+                    "template fields must be in {}".format(LABEL_FIELDS))
+        self.field = template
+        self.template = template
+        self.deprels = deprels
+
+    def values(self, sentence):
+        """Return the labels of the tokens of a sentence
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :return: labels by token ID, with None for the virtual root
+        :rtype: list
+        """
+        get_lemma = self.conllu._get_lemma
+        template = self.template
+        labels = [None]
+        for token in sentence.tokens:
+            labels.append(template.format(
+                id=token.id, form=_value(token.form),
+                lemma=_value(get_lemma(token)),
+                upostag=_value(token.upostag),
+                xpostag=_value(token.xpostag), deprel=_value(token.deprel)))
+        return labels
+
+    def paths(self, sentence, n, tree=None):
+        """Produce the downward paths of n tokens of a sentence
+
+        :example:
+
+        >>> list(counter.paths(sentence, 3))
+        [(2, 6, 3), (2, 6, 4), (2, 6, 5), (2, 6, 9), (6, 9, 7), (6, 9, 8)]
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :param n: number of tokens in each path
+        :type n: int
+        :param tree: tree of the sentence, built if not given
+        :type tree: DependencyTree
+        :return: generator producing tuples of token IDs, head first, in
+            depth-first order of their last token
+        :rtype: tuple
+        """
+        tree = tree or DependencyTree(sentence)
+        depths = tree.depths
+        # path[depth] holds the node at each depth on the current branch
+        path = [0] * (max(depths) + 1)
+        for node in tree.order[1:]:
+            depth = depths[node]
+            path[depth] = node
+            if depth >= n:
+                yield tuple(path[depth - n + 1:depth + 1])
+
+    def ngrams(self, sentence, tree=None):
+        """Produce the labelled paths of 1 to max_n tokens of a sentence
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :param tree: tree of the sentence, built if not given
+        :type tree: DependencyTree
+        :return: generator producing tuples of labels and DEPRELs
+        :rtype: tuple
+        """
+        for keys in self._path_keys(sentence, tree):
+            for key in keys:
+                yield tuple(key.split(SEPARATOR))
+
+    def _path_keys(self, sentence, tree=None):
+        """
+        It produces, for each token in depth-first order, the keys of the
+        paths of 1 to max_n tokens that end at it.
+        """
+        tree = tree or DependencyTree(sentence)
+        labels = self.values(sentence)
+        parents = tree.parents
+        longest = self.max_n - 1
+        ending = [[]] * len(parents)
+        for node in tree.order[1:]:
+            label = labels[node]
+            keys = [label]
+            if self.deprels:
+                label = (
+                    _value(sentence.tokens[node - 1].deprel) + SEPARATOR +
+                    label)
+            for key in ending[parents[node]][:longest]:
+                keys.append(key + SEPARATOR + label)
+            ending[node] = keys
+            yield keys
+
+    def _count_sentence(self, sentence):
+        counts = self.counts
+        for keys in self._path_keys(sentence):
+            for size, key in enumerate(keys):
+                table = counts[size]
+                table[key] = table.get(key, 0) + 1
+
+    def _signature(self):
+        return super(SyntacticNgramCounter, self)._signature() + (
+            self.deprels,)
+
+    def _settings(self):
+        settings = super(SyntacticNgramCounter, self)._settings()
+        del settings["field"], settings["contractions"]
+        settings.update(template=self.template, deprels=self.deprels)
+        return settings
+
+
+def _value(value):
+    return "_" if value is None else value
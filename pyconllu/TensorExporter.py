@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import random
+from itertools import islice
+from .Vocabulary import Vocabulary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LABEL_FIELDS = ('form', 'lemma', 'upostag', 'xpostag', 'deprel')
+DEFAULT_BATCH_SIZE = 32
+
+
+class TensorExporter(object):
+    """Encode parsed CoNLL-U sentences as batches of NumPy arrays."""
+    def __init__(
+            self, vocabularies, batch_size=DEFAULT_BATCH_SIZE, padded=True,
+            bucket_size=None, shuffle=False, seed=None):
+        """
+        Constructor of TensorExporter.
+
+        Each batch is a dict with one int32 array of IDs per field in
+        vocabularies, the 'head' indices as in CoNLL-U (0 for the root), the
+        'lengths' of the sentences and their 'index' in the input stream.
+        Padded batches have (batch, max length) arrays filled with zeros and
+        a boolean 'mask'; ragged batches have the sentences concatenated and
+        'offsets' delimiting them.
+
+        If bucket_size is given, sentences are read in pools of bucket_size
+        and sorted by length before being split in batches, which minimises
+        padding.
+
+        :param vocabularies: vocabulary of each field to be encoded
+        :type vocabularies: dict
+        :param batch_size: number of sentences in each batch
+        :type batch_size: int
+        :param padded: produce padded arrays instead of ragged ones
+        :type padded: bool
+        :param bucket_size: number of sentences sorted by length together
+        :type bucket_size: int
+        :param shuffle: shuffle the order of the batches in each pool
+        :type shuffle: bool
+        :param seed: seed of the random generator used to shuffle
+        :type seed: int
+        """
+        if np is None:
+            raise ImportError(
+                "numpy is required to export tensors: "
+                "pip install pyconllu[numpy]")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        self.vocabularies = vocabularies
+        self.batch_size = batch_size
+        self.padded = padded
+        self.bucket_size = bucket_size
+        self.shuffle = shuffle
+        self.random = random.Random(seed)
+
+    @staticmethod
+    def build_vocabularies(sentences, fields=LABEL_FIELDS, min_count=1):
+        """Build the vocabularies of several fields in a single pass
+
+        :example:
+
+        >>> vocabularies = TensorExporter.build_vocabularies(
+        ...     conllu.parse_file("corpus.conllu"), min_count=2)
+        >>> vocabularies['upostag']
+        Vocabulary(size=19)
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :param fields: Token attributes to be encoded
+        :type fields: tuple
+        :param min_count: minimum number of occurrences of a value
+        :type min_count: int
+        :return: vocabulary of each field
+        :rtype: dict
+        """
+        vocabularies = dict((field, Vocabulary()) for field in fields)
+        counters = [
+            (field, vocabularies[field].counts) for field in fields]
+
+        for sentence in sentences:
+            for token in sentence.tokens:
+                for field, counter in counters:
+                    value = getattr(token, field)
+                    if value is not None:
+                        counter[value] += 1
+
+        for vocabulary in vocabularies.values():
+            vocabulary.prune(min_count)
+
+        return vocabularies
+
+    def encode_sentence(self, sentence):
+        """Encode a sentence as a dict of one-dimensional arrays
+
+        :param sentence: object with parsed sentence
+        :type sentence: Sentence
+        :return: array of IDs for each field, plus 'head'
+        :rtype: dict
+        """
+        tokens = sentence.tokens
+        encoded = {}
+
+        for field, vocabulary in self.vocabularies.items():
+            ids = vocabulary.ids
+            encoded[field] = np.fromiter(
+                (ids.get(getattr(token, field), 1) for token in tokens),
+                dtype=np.int32, count=len(tokens))
+
+        encoded['head'] = np.fromiter(
+            (token.head or 0 for token in tokens),
+            dtype=np.int32, count=len(tokens))
+
+        return encoded
+
+    def iter_batches(self, sentences):
+        """Produce batches of arrays from a stream of sentences
+
+        :example:
+
+        >>> exporter = TensorExporter(vocabularies, batch_size=2)
+        >>> batch = next(exporter.iter_batches(sentences))
+        >>> batch['upostag']
+        array([[ 4,  2,  7,  3,  0],
+               [ 4,  2, 11,  5,  3]], dtype=int32)
+        >>> batch['lengths']
+        array([4, 5], dtype=int32)
+
+        :param sentences: iterable of Sentence objects
+        :type sentences: iterable
+        :return: generator producing dicts of arrays
+        :rtype: dict
+        """
+        pool_size = self.bucket_size or self.batch_size
+        sentences = iter(sentences)
+        offset = 0
+
+        while True:
+            pool = [
+                (offset + idx, self.encode_sentence(sentence))
+                for idx, sentence in enumerate(
+                    islice(sentences, pool_size))]
+            if not pool:
+                return
+            offset += len(pool)
+
+            if self.bucket_size:
+                pool.sort(key=lambda item: len(item[1]['head']))
+
+            batches = [
+                pool[start:start + self.batch_size]
+                for start in range(0, len(pool), self.batch_size)]
+            if self.shuffle:
+                self.random.shuffle(batches)
+
+            for batch in batches:
+                yield self._collate(batch)
+
+    def _collate(self, batch):
+        """
+        It joins encoded sentences, as (index, arrays) pairs, in a batch.
+        """
+        indexes = np.array([idx for idx, _ in batch], dtype=np.int64)
+        lengths = np.array(
+            [len(encoded['head']) for _, encoded in batch], dtype=np.int32)
+        fields = list(self.vocabularies) + ['head']
+        collated = {'index': indexes, 'lengths': lengths}
+
+        if not self.padded:
+            collated['offsets'] = np.concatenate(
+                ([0], np.cumsum(lengths))).astype(np.int64)
+            for field in fields:
+                collated[field] = np.concatenate(
+                    [encoded[field] for _, encoded in batch])
+            return collated
+
+        max_length = int(lengths.max()) if len(lengths) else 0
+        mask = np.arange(max_length)[np.newaxis, :] < lengths[:, np.newaxis]
+        collated['mask'] = mask
+        for field in fields:
+            # boolean indexing fills the unmasked cells in row-major order
+            array = np.zeros((len(batch), max_length), dtype=np.int32)
+            array[mask] = np.concatenate(
+                [encoded[field] for _, encoded in batch])
+            collated[field] = array
+
+        return collated
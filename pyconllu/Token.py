@@ -1,6 +1,19 @@
 # -*- coding: utf-8 -*-
 from collections import OrderedDict
 
+FIELDS = (
+    'id', 'form', 'lemma', 'upostag', 'xpostag', 'feats', 'head', 'deprel',
+    'deps', 'misc')
+# attributes where the properties of FIELDS store their values
+_ATTRIBUTES = tuple('_' + field for field in FIELDS)
+_MAPPINGS = (FIELDS.index('feats'), FIELDS.index('misc'))
+
+# encodings of packed columns
+_RAW = 0
+_TEXT = 1
+_MAPPING = 2
+_EMPTY = 3
+
 
 class Token(object):
     """A class that represents a Token in a CoNLL-U sentence."""
@@ -54,6 +67,12 @@ class Token(object):
             return NotImplemented
         return not self.__eq__(other)
 
+    def __reduce__(self):
+        state = dict(
+            (key, value) for key, value in self.__dict__.items()
+            if key not in _ATTRIBUTES)
+        return (_unpack_token, (self.__class__, self.pack()), state or None)
+
     def __repr__(self):
         return (
             '{}(id={}, form={}, lemma={}, upostag={}, xpostag={}, feats={}, '
@@ -82,10 +101,76 @@ class Token(object):
             self._expand_features(self.feats),
             self._expand_token(self.head),
             self._expand_token(self.deprel),
-            self._expand_token(self.deps),
-            self._expand_token(self.misc)
+            self._expand_deps(self.deps),
+            self._expand_misc(self.misc)
         )
 
+    def pack(self):
+        """Return the fields of the token in a compact, picklable form
+
+        It is the inverse of Token.unpack(). See Token.pack_many().
+
+        :rtype: tuple
+        """
+        return Token.pack_many([self])
+
+    @classmethod
+    def unpack(cls, packed):
+        """Build a token from the value returned by Token.pack()
+
+        :param packed: packed fields
+        :type packed: tuple
+        :rtype: Token
+        """
+        return cls.unpack_many(packed)[0]
+
+    @staticmethod
+    def pack_many(tokens):
+        """Return the fields of several tokens in a compact, picklable form
+
+        Fields are stored by column. Columns of strings are joined by tabs
+        and FEATS and MISC mappings are written as in CoNLL-U, so pickling a
+        sentence creates a handful of objects instead of several per token.
+        Columns that cannot be encoded this way (e.g. integers or values
+        containing separators) are kept as tuples. It is the inverse of
+        Token.unpack_many().
+
+        :param tokens: list of Token objects
+        :type tokens: list
+        :rtype: tuple
+        """
+        dicts = [_attributes(token) for token in tokens]
+        columns = [len(dicts)]
+        for idx, attribute in enumerate(_ATTRIBUTES):
+            values = [values[attribute] for values in dicts]
+            if values.count(None) == len(values):
+                columns.append((_EMPTY,))
+            elif idx in _MAPPINGS:
+                columns.append(_pack_mapping_column(values))
+            else:
+                columns.append(_pack_text_column(values))
+        return tuple(columns)
+
+    @classmethod
+    def unpack_many(cls, packed):
+        """Build a list of tokens from the value returned by
+        Token.pack_many()
+
+        :param packed: packed fields
+        :type packed: tuple
+        :rtype: list
+        """
+        size = packed[0]
+        columns = [_unpack_column(column, size) for column in packed[1:]]
+
+        new = cls.__new__
+        tokens = []
+        for values in zip(*columns):
+            token = new(cls)
+            token.__dict__ = dict(zip(_ATTRIBUTES, values))
+            tokens.append(token)
+        return tokens
+
     @property
     def id(self):
         return self._id
@@ -172,9 +257,203 @@ class Token(object):
             return "_"
         return token
 
+    @staticmethod
+    def _expand_deps(deps):
+        if isinstance(deps, list):
+            return "|".join(
+                ["{}:{}".format(head, deprel) for deprel, head in deps])
+        return Token._expand_token(deps)
+
+    @staticmethod
+    def _expand_misc(misc):
+        if isinstance(misc, OrderedDict):
+            return "|".join([
+                "=".join([key, Token._expand_token(misc[key])])
+                for key in misc])
+        return Token._expand_token(misc)
+
     @staticmethod
     def _expand_features(features):
         if isinstance(features, OrderedDict):
             return "|".join(
                 ["=".join([key, features[key]]) for key in features])
         return "_"
+
+
+class CopyOnWriteToken(Token):
+    """A token that shares the fields of another token until one of its
+    fields is assigned."""
+    __slots__ = ('_original',)
+
+    def __init__(self, token):
+        """
+        Constructor of CopyOnWriteToken.
+
+        Nothing is copied: the fields are read from the original token until
+        a field of this token is assigned, which copies them, in O(fields),
+        and stops the sharing. FEATS, MISC and DEPS are still shared after
+        the copy, so to edit them assign a new value instead of changing
+        them in place.
+
+        While the token is shared, it is a view of the original token, not
+        a snapshot: assignments to the original token are seen by this one.
+        Do not edit the original token while its copies are in use.
+
+        :example:
+
+        >>> token = CopyOnWriteToken(sentence.tokens[0])
+        >>> token.deprel = "nsubj"
+        >>> sentence.tokens[0].deprel
+        'det'
+
+        :param token: original token
+        :type token: Token
+        """
+        if type(token) is CopyOnWriteToken and token._original is not None:
+            token = token._original
+        object.__setattr__(self, '_original', token)
+
+    def __getattr__(self, name):
+        # only called for the attributes missing from the token
+        original = object.__getattribute__(self, '_original')
+        if original is None:
+            raise AttributeError(name)
+        return getattr(original, name)
+
+    def __setattr__(self, name, value):
+        original = self._original
+        if original is not None:
+            object.__setattr__(self, '_original', None)
+            self.__dict__.update(original.__dict__)
+        object.__setattr__(self, name, value)
+
+    def __eq__(self, other):
+        if type(other) not in (Token, CopyOnWriteToken):
+            return NotImplemented
+        return all(
+            getattr(self, attribute) == getattr(other, attribute)
+            for attribute in FIELDS)
+
+    def __reduce__(self):
+        return Token.__reduce__(Token.unpack(self.pack()))
+
+    @property
+    def is_shared(self):
+        """True until a field of the token is assigned, while its fields are
+        read from the original token."""
+        return self._original is not None
+
+
+def _attributes(token):
+    """
+    It returns the dict where a token stores its fields, which is the one of
+    the original token while a CopyOnWriteToken is shared.
+    """
+    if type(token) is CopyOnWriteToken and token._original is not None:
+        token = token._original
+    return token.__dict__
+
+
+def _pack_text_column(values):
+    """
+    It joins a column of strings (or None) with tabs. Other columns are
+    kept as tuples.
+    """
+    nones = ()
+    try:
+        joined = "\t".join(values)
+    except TypeError:
+        nones = tuple([
+            idx for idx, value in enumerate(values) if value is None])
+        try:
+            joined = "\t".join([
+                "" if value is None else value for value in values])
+        except TypeError:
+            return (_RAW, tuple(values))
+
+    if joined.count("\t") != len(values) - 1:
+        return (_RAW, tuple(values))
+    return (_TEXT, joined, nones)
+
+
+def _pack_mapping_column(values):
+    """
+    It joins a column of OrderedDicts (or None) as 'key=value|key' strings,
+    where a key without '=' has value None. Other columns are kept as
+    tuples.
+    """
+    rows = []
+    nones = []
+    pairs = 0
+    items = 0
+    try:
+        for idx, value in enumerate(values):
+            if value is None:
+                nones.append(idx)
+                rows.append("")
+                continue
+            if type(value) is not OrderedDict:
+                return (_RAW, tuple(values))
+
+            try:
+                row = "|".join([
+                    key + "=" + item for key, item in value.items()])
+                pairs += len(value)
+            except TypeError:
+                row = "|".join([
+                    key if item is None else key + "=" + item
+                    for key, item in value.items()])
+                pairs += len(value) - list(value.values()).count(None)
+            if value and not row:
+                return (_RAW, tuple(values))
+            items += len(value)
+            rows.append(row)
+    except TypeError:
+        return (_RAW, tuple(values))
+
+    joined = "\t".join(rows)
+    # separators inside keys or values would make the rows ambiguous
+    if (joined.count("\t") != len(values) - 1 or
+            joined.count("=") != pairs or
+            joined.count("|") != items - len(values) + len(nones) + sum(
+                1 for value in values if value is not None and not value)):
+        return (_RAW, tuple(values))
+    return (_MAPPING, joined, tuple(nones))
+
+
+def _unpack_column(column, size):
+    """
+    It decodes a column packed by _pack_text_column() or
+    _pack_mapping_column().
+    """
+    if column[0] == _RAW:
+        return column[1]
+    if column[0] == _EMPTY:
+        return [None] * size
+
+    values = column[1].split("\t") if size else []
+    if column[0] == _MAPPING:
+        values = [_unpack_mapping(row) for row in values]
+    for idx in column[2]:
+        values[idx] = None
+    return values
+
+
+def _unpack_mapping(row):
+    if not row:
+        return OrderedDict()
+    try:
+        return OrderedDict([part.split("=", 1) for part in row.split("|")])
+    except ValueError:
+        # keys without '=' have value None
+        return OrderedDict([
+            (key, item if separator else None)
+            for key, separator, item in (
+                part.partition("=") for part in row.split("|"))])
+
+
+def _unpack_token(cls, packed):
+    """
+    It rebuilds a pickled token.
+    """
+    return cls.unpack(packed)
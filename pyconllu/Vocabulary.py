@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+
+PAD = "<pad>"
+UNK = "<unk>"
+
+
+class Vocabulary(object):
+    """A class that maps the values of a CoNLL-U field to integer IDs."""
+    def __init__(self, values=None, pad=PAD, unk=UNK):
+        """
+        Constructor of Vocabulary.
+
+        ID 0 is reserved for padding and ID 1 for unknown values, so
+        encoded arrays can be padded with zeros.
+
+        :param values: initial values, in ID order
+        :type values: iterable
+        :param pad: padding symbol
+        :type pad: str
+        :param unk: unknown symbol
+        :type unk: str
+        """
+        self.pad = pad
+        self.unk = unk
+        self.counts = Counter()
+        self._values = [pad, unk]
+        self._ids = {pad: 0, unk: 1}
+
+        for value in values or []:
+            self.add(value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._ids
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self._values == other._values
+        return NotImplemented
+
+    def __ne__(self, other):
+        if self.__eq__(other) is NotImplemented:
+            return NotImplemented
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return '{}(size={})'.format(self.__class__.__name__, len(self))
+
+    @property
+    def pad_id(self):
+        return 0
+
+    @property
+    def unk_id(self):
+        return 1
+
+    @property
+    def ids(self):
+        """Mapping from values to IDs."""
+        return self._ids
+
+    def add(self, value):
+        """Add a value to the vocabulary
+
+        :param value: value to be added
+        :type value: str
+        :return: ID of the value
+        :rtype: int
+        """
+        try:
+            return self._ids[value]
+        except KeyError:
+            self._ids[value] = len(self._values)
+            self._values.append(value)
+            return self._ids[value]
+
+    def index(self, value):
+        """Return the ID of a value, or the unknown ID if it is missing.
+
+        :param value: value to be looked up
+        :type value: str
+        :rtype: int
+        """
+        return self._ids.get(value, 1)
+
+    def value(self, idx):
+        """Return the value with a given ID.
+
+        :param idx: value ID
+        :type idx: int
+        :rtype: str
+        """
+        return self._values[idx]
+
+    def update(self, values):
+        """Count a sequence of values, to be later added with prune()
+
+        :param values: values to be counted
+        :type values: iterable
+        """
+        self.counts.update(values)
+
+    def prune(self, min_count=1):
+        """Add the counted values with at least min_count occurrences
+
+        Values are added by decreasing frequency, so frequent values get
+        low IDs. Ties are broken alphabetically to keep IDs stable.
+
+        :param min_count: minimum number of occurrences
+        :type min_count: int
+        """
+        for value, count in sorted(
+                self.counts.items(), key=lambda item: (-item[1], item[0])):
+            if count >= min_count:
+                self.add(value)
@@ -1,7 +1,28 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from .ArrowExporter import ArrowExporter
+from .BlockedGzip import BlockedGzipReader, BlockedGzipWriter
 from .CoNLLU import CoNLLU
+from .Concordance import Concordance
+from .DependencyTree import DependencyTree
+from .EnhancedGraph import EnhancedGraph
+from .FeatureBits import FeatureBits
+from .MemoryProfiler import MemoryProfiler
+from .NgramCounter import NgramCounter
+from .ParseCache import ParseCache
+from .ProgressReporter import ProgressReporter
+from .Relabeler import Relabeler
+from .SharedCorpus import SharedCorpus
+from .SparseFeatureExporter import SparseFeatureExporter
+from .SyntacticNgramCounter import SyntacticNgramCounter
+from .TensorExporter import TensorExporter
+from .Vocabulary import Vocabulary
 
-__all__ = ['CoNLLU']
+__all__ = [
+    'ArrowExporter', 'BlockedGzipReader', 'BlockedGzipWriter', 'CoNLLU',
+    'Concordance', 'DependencyTree', 'EnhancedGraph', 'FeatureBits',
+    'MemoryProfiler', 'NgramCounter', 'ParseCache', 'ProgressReporter',
+    'Relabeler', 'SharedCorpus', 'SparseFeatureExporter',
+    'SyntacticNgramCounter', 'TensorExporter', 'Vocabulary']
 __version__ = '0.1.2'
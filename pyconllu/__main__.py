@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from .CommandLine import main
+
+main()
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 from collections import OrderedDict
 import pytest
 from pyconllu.Sentence import Sentence
@@ -6,6 +7,21 @@ from pyconllu.Token import Token
 from pyconllu.Head import Head
 
 
+@pytest.fixture()
+def conllu_filename(tmpdir):
+    """
+    Return a function writing contents to a CoNLL-U file in tmpdir.
+    """
+    def _build_conllu_file(contents, name='sample.conllu'):
+        filename = os.path.join(tmpdir.strpath, name)
+        with open(filename, "w") as fhi:
+            fhi.write(contents)
+
+        return filename
+
+    return _build_conllu_file
+
+
 @pytest.fixture
 def conllu_string():
     """
@@ -191,6 +207,25 @@ def conllu_string_with_empty_node():
 """  # noqa
 
 
+@pytest.fixture
+def conllu_string_with_enhanced_deps():
+    """
+    Return a string containing a sentence in CoNLL-U format, with enhanced
+    dependencies and an empty node.
+    """
+    return """# sent_id = enhanced-1
+# text = Sue likes coffee and Bill tea.
+1	Sue	Sue	PROPN	NNP	Number=Sing	2	nsubj	2:nsubj	_
+2	likes	like	VERB	VBZ	Number=Sing|Person=3|Tense=Pres	0	root	0:root	_
+3	coffee	coffee	NOUN	NN	Number=Sing	2	obj	2:obj	_
+4	and	and	CCONJ	CC	_	5	cc	5.1:cc	_
+5	Bill	Bill	PROPN	NNP	Number=Sing	3	conj	5.1:nsubj	_
+5.1	likes	like	VERB	VBZ	Number=Sing|Person=3|Tense=Pres	_	_	2:conj:and	CopyOf=2
+6	tea	tea	NOUN	NN	Number=Sing	5	orphan	5.1:obj	SpaceAfter=No
+7	.	.	PUNCT	.	_	2	punct	2:punct	_
+"""  # noqa
+
+
 @pytest.fixture
 def parsed_sentence_from_string():
     """
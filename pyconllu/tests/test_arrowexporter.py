@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import os
+import pytest
+from pyconllu.ArrowExporter import ArrowExporter
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture()
+def exporter():
+    return ArrowExporter()
+
+
+def test_token_table_has_one_row_per_token(exporter, parsed_sentences):
+    batches = [
+        batch for table, batch in exporter.iter_batches(parsed_sentences)
+        if table == "tokens"]
+
+    assert (sum(batch.num_rows for batch in batches) ==
+            sum(len(sentence.tokens) for sentence in parsed_sentences))
+
+
+def test_token_rows(exporter, parsed_sentences):
+    tables = dict(exporter.iter_batches(parsed_sentences))
+    rows = tables["tokens"].to_pylist()
+
+    assert rows[0] == {
+        "sentence": 0, "sent_id": "1", "token": 0, "id": "1", "form": "El",
+        "lemma": "el", "upostag": "DET", "xpostag": "DA0MS0",
+        "feats": [
+            ("Definite", "Def"), ("Gender", "Masc"), ("Number", "Sing"),
+            ("PronType", "Art")],
+        "head": 2, "deprel": "det", "deps": None, "misc": None}
+    assert rows[-1]["sentence"] == len(parsed_sentences) - 1
+
+
+def test_contraction_rows(exporter, parsed_sentence_from_string):
+    tables = dict(exporter.iter_batches([parsed_sentence_from_string]))
+
+    assert tables["contractions"].to_pylist() == [
+        {"sentence": 0, "sent_id": None, "token": 2, "id": "3-4",
+         "form": "dos"},
+        {"sentence": 0, "sent_id": None, "token": 6, "id": "7-8",
+         "form": "da"},
+    ]
+
+
+def test_empty_node_rows(exporter, parsed_sentence_with_empty_node):
+    tables = dict(exporter.iter_batches([parsed_sentence_with_empty_node]))
+    rows = tables["empty_nodes"].to_pylist()
+
+    assert len(rows) == len(parsed_sentence_with_empty_node.empty_nodes)
+    assert (rows[0]["id"] ==
+            parsed_sentence_with_empty_node.empty_nodes[0][0].id)
+
+
+def test_batches_are_bounded(parsed_sentences):
+    exporter = ArrowExporter(batch_size=4)
+    batches = [
+        batch for table, batch in exporter.iter_batches(parsed_sentences)
+        if table == "tokens"]
+
+    assert all(batch.num_rows <= 4 for batch in batches)
+    assert (sum(batch.num_rows for batch in batches) ==
+            sum(len(sentence.tokens) for sentence in parsed_sentences))
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        ArrowExporter(batch_size=0)
+
+
+def test_write_parquet(tmpdir, parsed_sentences, parsed_sentence_from_string):
+    exporter = ArrowExporter(batch_size=8)
+    sentences = parsed_sentences + [parsed_sentence_from_string]
+    tokens_path = os.path.join(tmpdir.strpath, "tokens.parquet")
+    contractions_path = os.path.join(tmpdir.strpath, "contractions.parquet")
+    rows = exporter.write_parquet(
+        sentences, tokens_path,
+        contractions_path=contractions_path)
+
+    tokens = pq.read_table(tokens_path)
+    assert tokens.num_rows == rows["tokens"]
+    assert tokens.schema.equals(exporter.schemas["tokens"])
+    assert (pq.read_table(contractions_path).num_rows ==
+            sum(len(sentence.contractions) for sentence in sentences))
+    assert "empty_nodes" not in rows
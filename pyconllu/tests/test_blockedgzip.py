@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import gzip
+import os
+import pytest
+from pyconllu.BlockedGzip import (
+    BlockedGzipReader, BlockedGzipWriter, INDEX_SUFFIX, scan_blocks)
+from pyconllu.CoNLLU import CoNLLU
+
+
+@pytest.fixture()
+def raw_sentences(conllu_file_contents):
+    return list(CoNLLU().read_sentences(conllu_file_contents)) * 5
+
+
+@pytest.fixture()
+def blocked_file(tmpdir, raw_sentences):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    # small blocks, so the sentences are spread over several of them
+    with BlockedGzipWriter(filename, block_size=1500) as writer:
+        for raw_sentence in raw_sentences:
+            writer.write(raw_sentence)
+    return filename
+
+
+def test_file_is_valid_gzip(blocked_file, raw_sentences):
+    with gzip.open(blocked_file) as fhi:
+        text = fhi.read().decode("utf-8")
+
+    assert text == "".join(raw + "\n" for raw in raw_sentences)
+
+
+def test_blocks_are_aligned_on_sentences(blocked_file, raw_sentences):
+    reader = BlockedGzipReader(blocked_file)
+
+    assert len(reader) == 15
+    assert 1 < len(reader.blocks) < 15
+    assert [
+        raw for block in range(len(reader.blocks))
+        for raw in reader.read_block(block)] == raw_sentences
+
+
+def test_index_is_rebuilt_from_headers(blocked_file):
+    reader = BlockedGzipReader(blocked_file)
+    os.remove(blocked_file + INDEX_SUFFIX)
+
+    assert scan_blocks(blocked_file) == reader.blocks
+    assert BlockedGzipReader(blocked_file).blocks == reader.blocks
+
+
+def test_random_access(blocked_file, raw_sentences):
+    reader = BlockedGzipReader(blocked_file)
+
+    assert reader[7] == raw_sentences[7]
+    assert reader[-1] == raw_sentences[-1]
+    with pytest.raises(IndexError):
+        reader[15]
+
+
+@pytest.mark.parametrize("jobs, processes", [
+    (1, False), (3, False), (2, True)])
+def test_iter_sentences(blocked_file, raw_sentences, jobs, processes):
+    reader = BlockedGzipReader(blocked_file)
+
+    assert list(reader.iter_sentences(
+        jobs=jobs, processes=processes)) == raw_sentences
+    assert list(reader.iter_sentences(
+        4, 11, jobs=jobs, processes=processes)) == raw_sentences[4:11]
+    assert list(reader.iter_sentences(20)) == []
+
+
+def test_write_sentence(tmpdir, parsed_sentences):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    with BlockedGzipWriter(filename) as writer:
+        for sentence in parsed_sentences:
+            writer.write_sentence(sentence)
+
+    conllu = CoNLLU()
+    assert [
+        conllu.parse_sentence(raw)
+        for raw in BlockedGzipReader(filename).iter_sentences()
+    ] == parsed_sentences
+
+
+def test_write_rejects_blank_lines(tmpdir):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    with BlockedGzipWriter(filename) as writer:
+        with pytest.raises(ValueError):
+            writer.write(u"1\ta\n\n2\tb\n")
+
+
+@pytest.mark.parametrize("raw_sentence", [u"", u"\n", u"  \n "])
+def test_write_rejects_empty_sentences(tmpdir, raw_sentence):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    with BlockedGzipWriter(filename) as writer:
+        writer.write(u"1\ta")
+        with pytest.raises(ValueError):
+            writer.write(raw_sentence)
+        writer.write(u"1\tb")
+
+    reader = BlockedGzipReader(filename)
+    assert len(reader) == 2 and reader[1] == u"1\tb\n"
+
+
+def test_plain_gzip_is_rejected(tmpdir, conllu_string):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    with gzip.open(filename, "wb") as fho:
+        fho.write(conllu_string.encode("utf-8"))
+
+    with pytest.raises(Exception) as error:
+        BlockedGzipReader(filename)
+    assert "no block information" in str(error.value)
+
+
+def test_empty_file(tmpdir):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    BlockedGzipWriter(filename).close()
+
+    assert len(BlockedGzipReader(filename)) == 0
+    assert list(BlockedGzipReader(filename).iter_sentences()) == []
+    assert len(scan_blocks(filename)) == 1
+    with gzip.open(filename) as fhi:
+        assert fhi.read() == b""
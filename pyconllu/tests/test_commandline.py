@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+from collections import Counter
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.CommandLine import (
+    CommandLine, sentence_from_json, sentence_to_json)
+from pyconllu.ProgressReporter import ProgressReporter
+
+
+@pytest.fixture()
+def run():
+    def _run(argv, stdin=u""):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        status = CommandLine(
+            stdin=io.StringIO(stdin), stdout=stdout, stderr=stderr).run(argv)
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    return _run
+
+
+def test_stats(run, conllu_file_contents):
+    status, stdout, _ = run(["stats", "--top", "1"], conllu_file_contents)
+    rows = [row.split("\t") for row in stdout.splitlines()]
+
+    assert status == 0
+    assert rows == [
+        ["sentences", "3"], ["tokens", "45"],
+        ["length", "9", "2"], ["length", "27", "1"],
+        ["upostag", "NOUN", "12"], ["deprel", "det", "8"]]
+
+
+def test_stats_feats(run, conllu_file_contents):
+    conllu = CoNLLU()
+    expected = Counter(
+        str(token).split("\t")[5]
+        for sentence in conllu.parse_sentences(conllu_file_contents)
+        for token in sentence.tokens)
+    status, stdout, _ = run(["stats", "-f", "feats"], conllu_file_contents)
+    rows = [row.split("\t") for row in stdout.splitlines()]
+
+    assert status == 0
+    assert expected == dict(
+        (row[1], int(row[2])) for row in rows if row[0] == "feats")
+    assert expected["_"] > 0
+
+
+def test_stats_deps(run, conllu_file_contents):
+    status, stdout, _ = run(["stats", "-f", "deps"], conllu_file_contents)
+
+    assert status == 0 and "deps\t_\t45\n" in stdout
+
+
+def test_stats_misc(run):
+    stdin = (
+        "1\tA\ta\tDET\t_\t_\t2\tdet\t_\t_\n"
+        "2\tcasa\tcasa\tNOUN\t_\t_\t0\troot\t_\tSpaceAfter=No\n")
+    status, stdout, _ = run(["stats", "-f", "misc"], stdin)
+
+    assert status == 0
+    assert stdout.endswith("misc\t_\t1\nmisc\tSpaceAfter=No\t1\n")
+
+
+def test_stats_in_parallel(run, conllu_file_contents):
+    argv = ["stats", "--field", "lemma", "--chunk-size", "1"]
+    stdin = "\n".join([conllu_file_contents] * 3)
+
+    assert run(argv + ["--jobs", "2"], stdin) == run(argv, stdin)
+
+
+def test_grep_token_criteria_match_the_same_token(
+        run, conllu_file_contents):
+    _, stdout, _ = run(
+        ["grep", "--lemma", "paciente", "--deprel", "nsubj"],
+        conllu_file_contents)
+    sentences = list(CoNLLU().read_sentences(io.StringIO(stdout)))
+
+    assert len(sentences) == 1
+    assert sentences[0].startswith("# sent_id = 3\n")
+
+
+def test_grep_sent_id_and_invert(run, conllu_file_contents):
+    _, stdout, _ = run(["grep", "--sent-id", "^[12]$"], conllu_file_contents)
+    _, inverted, _ = run(
+        ["grep", "--sent-id", "^[12]$", "-v"], conllu_file_contents)
+
+    assert stdout.count("# sent_id") == 2
+    assert sorted((stdout + inverted).split("\n\n")) == sorted(
+        (conllu_file_contents + "\n").split("\n\n"))
+    assert "# sent_id = 3" in inverted
+
+
+def test_grep_pattern(run, conllu_file_contents):
+    _, stdout, _ = run(["grep", "-e", "^# text = La "], conllu_file_contents)
+
+    assert stdout.startswith("# sent_id = 2\n")
+    assert stdout.count("# sent_id") == 1
+
+
+def test_convert_json_round_trip(
+        run, conllu_file_contents, parsed_sentences):
+    _, json_lines, _ = run(["convert", "--to", "json"], conllu_file_contents)
+    _, conllu_lines, _ = run(
+        ["convert", "--from", "json", "--to", "conllu"], json_lines)
+
+    assert [
+        sentence_from_json(line) for line in json_lines.splitlines()
+    ] == parsed_sentences
+    assert conllu_lines == conllu_file_contents + "\n"
+
+
+def test_convert_enhanced_deps_to_json(conllu_string_with_enhanced_deps):
+    sentence = CoNLLU().parse_sentence(conllu_string_with_enhanced_deps)
+
+    assert sentence_from_json(sentence_to_json(sentence)) == sentence
+
+
+def test_convert_to_text(run, conllu_file_contents):
+    _, stdout, _ = run(["convert", "--to", "text"], conllu_file_contents)
+
+    assert stdout.splitlines()[1] == (
+        "La angiografía coronaria se realizó a 164 pacientes.")
+
+
+def test_validate(run, conllu_file_contents):
+    sentences = conllu_file_contents.split("\n\n")
+    sentences[0] = sentences[0].replace("\n9\tsi\t", "\n10\tsi\t")
+    sentences[1] = sentences[1].replace("\t0\troot", "\t4\troot")
+    status, stdout, stderr = run(["validate"], "\n\n".join(sentences))
+
+    assert status == 1
+    assert stdout == (
+        "sentence 1 (1): Unexpected token ID: 10\n"
+        "sentence 2 (2): 0 roots found\n"
+        "sentence 2 (2): Invalid tree: sentence contains cycles\n")
+    assert stderr == "3 errors in 3 sentences\n"
+    assert run(["validate"], conllu_file_contents)[0] == 0
+
+
+def test_validate_reports_format_errors(run, conllu_string):
+    status, stdout, _ = run(
+        ["validate"], conllu_string.replace("\tdet\t_\t_", "\tdet\t_", 1))
+
+    assert status == 1
+    assert stdout.startswith("sentence 1: Invalid format")
+
+
+def test_split(run, tmpdir, conllu_file_contents):
+    prefix = os.path.join(tmpdir.strpath, "part-")
+    status, _, _ = run(
+        ["split", "--size", "2", "--prefix", prefix], conllu_file_contents)
+
+    with io.open(prefix + "001.conllu", encoding="utf-8") as fhi:
+        first = fhi.read()
+    with io.open(prefix + "002.conllu", encoding="utf-8") as fhi:
+        second = fhi.read()
+
+    assert status == 0
+    assert first.count("# sent_id") == 2
+    assert second.startswith("# sent_id = 3\n")
+    assert first + second == conllu_file_contents + "\n"
+
+
+def test_split_needs_size_or_parts(run, conllu_file_contents):
+    status, _, stderr = run(["split"], conllu_file_contents)
+
+    assert status == 2
+    assert "--size or --parts" in stderr
+
+
+@pytest.mark.parametrize("command", ["split", "sample"])
+@pytest.mark.parametrize("size", ["0", "-1"])
+def test_rejects_non_positive_sizes(
+        run, capsys, conllu_file_contents, command, size):
+    with pytest.raises(SystemExit) as error:
+        run([command, "--size", size], conllu_file_contents)
+
+    assert error.value.code == 2
+    assert size + " is not a positive integer" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [
+    ["split", "--parts", "2"], ["sample", "--size", "2", "--seed", "1"],
+    ["concordance", "--lemma", "paciente"]])
+def test_every_command_takes_jobs(run, tmpdir, conllu_file_contents, argv):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_text(conllu_file_contents, encoding="utf-8")
+    prefix = os.path.join(tmpdir.strpath, "part-")
+    if argv[0] == "split":
+        argv = argv + ["--prefix", prefix]
+    argv = argv + [ifile.strpath]
+    expected = run(argv)
+    if argv[0] == "concordance":
+        os.remove(ifile.strpath + ".kwic")
+
+    assert run(argv + ["--jobs", "2", "--chunk-size", "1"]) == expected
+
+
+@pytest.mark.parametrize("command", ["split", "sample"])
+def test_rejects_invalid_sentences(run, tmpdir, command):
+    argv = [command, "--size", "1"]
+    if command == "split":
+        argv += ["--prefix", os.path.join(tmpdir.strpath, "part-")]
+    status, _, stderr = run(
+        argv, u"1\ta\ta\tX\tX\t_\t0\troot\t_\t_\n\n1\tb\n")
+
+    assert status == 2 and "ten fields" in stderr
+
+
+def test_sample(run, conllu_file_contents):
+    stdin = "\n".join([conllu_file_contents] * 4)
+    _, stdout, _ = run(["sample", "--size", "5", "--seed", "1"], stdin)
+
+    assert stdout.count("# sent_id") == 5
+    assert stdout == run(["sample", "--size", "5", "--seed", "1"], stdin)[1]
+    assert run(["sample", "--size", "20"], stdin)[1] == stdin + "\n"
+
+
+def test_reads_files(run, tmpdir, conllu_file_contents):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_text(conllu_file_contents, encoding="utf-8")
+
+    assert run(["stats", ifile.strpath, ifile.strpath])[1].startswith(
+        "sentences\t6\ntokens\t90\n")
+
+
+def test_missing_file(run, tmpdir):
+    status, _, stderr = run(
+        ["stats", os.path.join(tmpdir.strpath, "missing.conllu")])
+
+    assert status == 2
+    assert stderr.startswith("pyconllu: error:")
+
+
+def test_progress(run, conllu_file_contents):
+    _, _, stderr = run(["stats", "--progress"], conllu_file_contents)
+
+    assert stderr.startswith("3 sentences, 45 tokens, ")
+
+
+def test_progress_counts_bytes_of_the_files(
+        run, tmpdir, monkeypatch, conllu_file_contents):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_text(conllu_file_contents, encoding="utf-16")
+    snapshots = []
+    monkeypatch.setattr(
+        ProgressReporter, "finish",
+        lambda reporter: snapshots.append(reporter.snapshot()))
+    run([
+        "stats", "--progress", "--encoding", "utf-16", ifile.strpath,
+        ifile.strpath])
+
+    assert snapshots[0]['sentences'] == 6
+    assert snapshots[0]['bytes'] == snapshots[0]['total_bytes']
+    assert snapshots[0]['bytes'] == 2 * ifile.size()
+
+
+def test_memory(run, tmpdir, conllu_file_contents):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_text(conllu_file_contents, encoding="utf-8")
+    status, stdout, _ = run(["memory", "--sample-size", "2", ifile.strpath])
+    lines = stdout.splitlines()
+
+    assert status == 0
+    assert lines[0] == "2 sentences, 36 tokens"
+    assert lines[3].split()[0] == "raw"
+    assert run([
+        "memory", "--sample-size", "2", "--jobs", "2", "--chunk-size", "1",
+        ifile.strpath])[1].startswith("2 sentences, 36 tokens\n")
+
+
+def test_encoding(conllu_string):
+    stdin = io.TextIOWrapper(io.BytesIO(conllu_string.encode("latin-1")))
+    stdout = io.StringIO()
+    CommandLine(stdin=stdin, stdout=stdout).run(
+        ["convert", "--to", "conllu", "--encoding", "latin-1"])
+
+    assert stdout.getvalue() == conllu_string + "\n"
+
+
+def test_concordance(run, tmpdir, conllu_file_contents):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_text(conllu_file_contents, encoding="utf-8")
+    argv = [
+        "concordance", "--lemma", "paciente", "--context", "1", "--sort",
+        "right", "--width", "6", ifile.strpath]
+
+    assert run(argv)[1] == (
+        u"2\t   164  [pacientes]  .\n"
+        u"1\t    en  [pacientes]  con\n"
+        u"3\tNingún  [paciente]  recibi\n")
+
+
+def test_ngrams(run, conllu_file_contents):
+    argv = ["ngrams", "--field", "upostag", "--max-n", "2", "--top", "1"]
+    status, stdout, _ = run(argv, conllu_file_contents)
+    rows = [row.split("\t") for row in stdout.splitlines()]
+
+    assert status == 0
+    assert rows == [["1", "NOUN", "12"], ["2", "DET", "NOUN", "7"]]
+    assert run(argv + ["--jobs", "2", "--chunk-size", "1"],
+               conllu_file_contents) == (status, stdout, "")
+
+
+def test_ngrams_remove_spilled_runs(run, tmpdir, conllu_file_contents):
+    argv = ["ngrams", "--max-n", "2", "--top", "1"]
+    _, expected, _ = run(argv, conllu_file_contents)
+    status, stdout, _ = run(
+        argv + ["--max-entries", "2", "--spill-dir", tmpdir.strpath],
+        conllu_file_contents)
+
+    assert status == 0 and stdout == expected
+    assert tmpdir.listdir() == []
+
+
+def test_syntactic_ngrams(run, conllu_string):
+    argv = [
+        "ngrams", "--syntactic", "--template", "{lemma}/{upostag}",
+        "--max-n", "2", "--top", "1"]
+
+    assert run(argv, conllu_string) == (
+        0, u"1\to/DET\t3\n2\tcidade/NOUN\tcase\tde/ADP\t1\n", "")
+    assert run(argv + ["--min-count", "2"], conllu_string)[1] == (
+        u"1\to/DET\t3\n")
+
+
+def test_grep_feats(run, conllu_file_contents):
+    sentences = CoNLLU().parse_sentences(conllu_file_contents)
+    expected = [
+        CoNLLU().get_sentence_id(sentence) for sentence in sentences
+        if any(token.upostag == "NOUN" and token.feats and
+               token.feats.get("Number") == "Plur" and
+               token.feats.get("Gender") != "Masc"
+               for token in sentence.tokens)]
+    _, stdout, _ = run(
+        ["grep", "--upostag", "NOUN", "--feats",
+         "Number=Plur & Gender!=Masc"], conllu_file_contents)
+
+    assert expected and stdout.count("# sent_id") == len(expected)
+    assert run(["grep", "--feats", "Number"], conllu_file_contents)[0] == 2
+
+
+def test_relabel(run, tmpdir, conllu_file_contents):
+    rules = tmpdir.join("rules.json")
+    rules.write('{"deprel": {"det": "det:art"}}')
+    status, stdout, _ = run(
+        ["relabel", "--rules", str(rules)], conllu_file_contents)
+    sentences = list(CoNLLU().parse_sentences(stdout))
+
+    assert status == 0 and len(sentences) == 3
+    assert "det:art" in [token.deprel for token in sentences[0].tokens]
+    assert "det" not in [
+        token.deprel for sentence in sentences for token in sentence.tokens]
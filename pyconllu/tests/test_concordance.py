@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import pytest
+from pyconllu.BlockedGzip import BlockedGzipWriter
+from pyconllu.Concordance import Concordance, KwicLine
+from pyconllu.CoNLLU import CoNLLU
+
+
+@pytest.fixture(params=["plain", "blocked"])
+def corpus(request, tmpdir, conllu_file_contents):
+    if request.param == "plain":
+        filename = os.path.join(tmpdir.strpath, "corpus.conllu")
+        with open(filename, "wb") as fho:
+            fho.write(conllu_file_contents.encode("utf-8"))
+        return filename
+
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu.gz")
+    with BlockedGzipWriter(filename, block_size=100) as writer:
+        for raw_sentence in CoNLLU().read_sentences(conllu_file_contents):
+            writer.write(raw_sentence)
+    return filename
+
+
+@pytest.fixture()
+def concordance(corpus):
+    concordance = Concordance(corpus)
+    concordance.build()
+    yield concordance
+    concordance.close()
+
+
+def test_index_is_persistent(corpus):
+    with Concordance(corpus) as concordance:
+        assert not concordance.is_current()
+        concordance.build()
+
+    with Concordance(corpus) as concordance:
+        assert concordance.is_current()
+        assert concordance.positions("paciente") == [(0, 22), (1, 7), (2, 1)]
+        assert concordance.positions("pacientes", "form") == [(0, 22), (1, 7)]
+        assert concordance.positions("missing") == []
+
+
+def test_index_is_outdated_when_corpus_changes(concordance, corpus):
+    os.utime(corpus, (0, 0))
+
+    assert not concordance.is_current()
+
+
+def test_lines(concordance):
+    lines = list(concordance.lines("paciente", context=3))
+
+    assert lines[0] == KwicLine(
+        "1", 0, 22, ["GIM", "carotídeo", "en"], "pacientes",
+        ["con", "enfermedad", "coronaria"])
+    assert lines[2] == KwicLine(
+        "3", 2, 1, ["Ningún"], "paciente",
+        ["recibió", "tratamiento", "vitamínico"])
+
+
+def test_lines_sorted_by_context(concordance):
+    def keywords(sort):
+        return [
+            (line.sent_id, line.token)
+            for line in concordance.lines("paciente", sort=sort)]
+
+    # left context from the nearest word: '164', 'Ningún', 'en'
+    assert keywords("left") == [("2", 7), ("3", 1), ("1", 22)]
+    # right context: '.', 'con', 'recibió'
+    assert keywords("right") == [("2", 7), ("1", 22), ("3", 1)]
+    assert len(list(concordance.lines("paciente", limit=2))) == 2
+    with pytest.raises(ValueError):
+        concordance.lines("paciente", sort="middle")
+
+
+def test_sentence(concordance, parsed_sentences):
+    assert concordance.sentence(1) == parsed_sentences[1]
+
+
+def test_postings_are_flushed_in_chunks(
+        corpus, parsed_sentences, monkeypatch):
+    monkeypatch.setattr(
+        sys.modules["pyconllu.Concordance"], "FLUSH_TOKENS", 10)
+    with Concordance(corpus) as concordance:
+        concordance.build()
+        chunks = concordance._connect().execute(
+            "SELECT COUNT(DISTINCT chunk) FROM postings").fetchone()[0]
+
+        assert chunks == 2
+        assert concordance.positions("el") == [
+            (0, 0), (0, 9), (0, 15), (0, 18), (1, 0), (2, 6)]
+
+
+@pytest.mark.parametrize("blocked", [False, True])
+def test_encoding(tmpdir, conllu_string, blocked):
+    filename = os.path.join(tmpdir.strpath, "corpus.conllu")
+    if blocked:
+        with BlockedGzipWriter(filename, encoding="latin-1") as writer:
+            writer.write(conllu_string)
+    else:
+        with open(filename, "wb") as fho:
+            fho.write(conllu_string.encode("latin-1"))
+
+    with Concordance(filename, encoding="latin-1") as concordance:
+        concordance.build()
+        line = next(concordance.lines(u"hotél", context=1))
+
+        assert concordance.sentence(0).tokens[5].form == u"hotéis"
+        assert line.keyword == u"hotéis" and line.left == ["principais"]
+
+
+def test_iter_positions_reads_chunks(corpus, monkeypatch):
+    monkeypatch.setattr(
+        sys.modules["pyconllu.Concordance"], "FLUSH_TOKENS", 10)
+    with Concordance(corpus) as concordance:
+        concordance.build()
+        positions = concordance.iter_positions("el")
+
+        assert next(positions) == (0, 0)
+        assert list(positions) == concordance.positions("el")[1:]
+
+
+def test_format():
+    line = KwicLine("1", 0, 2, ["a", "b"], "c", ["d"])
+
+    assert Concordance.format(line, width=4) == u"1\t a b  [c]  d"
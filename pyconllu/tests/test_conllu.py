@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
+import io
 import os
 from collections import OrderedDict
 from types import GeneratorType
 import pytest
 from pyconllu.CoNLLU import CoNLLU
 from pyconllu.HeadDep import HeadDep
+from pyconllu.ProgressReporter import ProgressReporter
 from pyconllu.Token import Token
 from pyconllu.Sentence import Sentence
 
@@ -14,18 +16,6 @@ def conllu():
     return CoNLLU()
 
 
-@pytest.fixture()
-def conllu_filename(tmpdir):
-    def _build_conllu_file(contents):
-        filename = os.path.join(tmpdir.strpath, 'sample.conllu')
-        with open(filename, "w") as fhi:
-            fhi.write(contents)
-
-        return filename
-
-    return _build_conllu_file
-
-
 @pytest.fixture()
 def parse_file_with_sentences(conllu, conllu_filename, conllu_file_contents):
     filename = conllu_filename(conllu_file_contents)
@@ -50,6 +40,106 @@ def test_read_conllu_from_file_with_multiple_separators(
     assert len(sentences) == 3
 
 
+def test_read_conllu_from_missing_file_raises(conllu, tmpdir):
+    with pytest.raises(IOError):
+        list(conllu.read_sentences_from_file(
+            os.path.join(tmpdir.strpath, "missing.conllu")))
+
+
+@pytest.mark.parametrize("build_source", [
+    lambda contents: contents,
+    lambda contents: contents.encode("utf-8"),
+    lambda contents: io.StringIO(contents),
+    lambda contents: io.BytesIO(contents.encode("utf-8")),
+    lambda contents: contents.splitlines(True),
+    lambda contents: [
+        line.encode("utf-8") for line in contents.splitlines(True)],
+    lambda contents: contents.replace("\n", "\r\n").encode("utf-8"),
+])
+def test_read_sentences_from_any_source(
+        conllu, conllu_file_contents, build_source):
+    sentences = list(conllu.read_sentences(build_source(conllu_file_contents)))
+
+    assert "\n".join(sentences) == conllu_file_contents
+    assert list(conllu.read_sentences([])) == []
+
+
+def test_read_sentences_with_encoding(conllu, conllu_file_contents):
+    sentences = conllu.read_sentences(
+        io.BytesIO(conllu_file_contents.encode("latin-1")),
+        encoding="latin-1")
+
+    assert "\n".join(sentences) == conllu_file_contents
+
+
+def test_parse_sentences(conllu, conllu_file_contents, parsed_sentences):
+    assert list(conllu.parse_sentences(
+        conllu_file_contents.encode("utf-8"))) == parsed_sentences
+
+
+@pytest.mark.parametrize("text", [
+    "", "\n\n", "1\ta\n", "1\ta", "\n\n1\ta\n\n\n2\tb\n",
+    "1\ta\r\n\r\n2\tb\r\n", "1\ta\n  \n2\tb", " 1\ta\n\n2\tb \n",
+    "# x\n1\ta\n\n\n\n", "# ", "1\ta\n\na  ",
+])
+def test_split_sentences_matches_read_sentences(conllu, text):
+    assert conllu.split_sentences(text) == list(conllu.read_sentences(text))
+
+
+def test_parse_string_and_bytes(
+        conllu, conllu_file_contents, parsed_sentences):
+    assert conllu.parse_string(conllu_file_contents) == parsed_sentences
+    assert list(conllu.parse_string(
+        conllu_file_contents, lazy=True)) == parsed_sentences
+    assert conllu.parse_bytes(
+        conllu_file_contents.encode("latin-1", "replace"),
+        encoding="latin-1")[0].tokens[0].form == "El"
+    assert conllu.parse_bytes(
+        conllu_file_contents.encode("utf-8")) == parsed_sentences
+
+
+def test_parse_batch(conllu, conllu_file_contents, parsed_sentences):
+    documents = [
+        conllu_file_contents, "", conllu_file_contents.encode("utf-8")]
+
+    assert conllu.parse_batch(documents) == [
+        parsed_sentences, [], parsed_sentences]
+
+
+def test_parse_file_object(
+        conllu, conllu_filename, conllu_file_contents, parsed_sentences):
+    filename = conllu_filename(conllu_file_contents)
+    with open(filename, "rb") as fhi:
+        assert list(conllu.parse_file(fhi)) == parsed_sentences
+
+
+def test_parse_file_reports_progress(
+        conllu, conllu_filename, conllu_file_contents):
+    snapshots = []
+    filename = conllu_filename(conllu_file_contents)
+    progress = ProgressReporter(callback=snapshots.append, interval=0)
+
+    assert len(list(conllu.parse_file(filename, progress=progress))) == 3
+    assert [snapshot['sentences'] for snapshot in snapshots] == [1, 2, 3, 3]
+    assert snapshots[-1]['tokens'] == 45
+    assert snapshots[-1]['bytes'] == os.path.getsize(filename)
+    assert snapshots[-1]['total_bytes'] == os.path.getsize(filename)
+
+
+def test_parse_file_reports_bytes_of_the_encoding(conllu, tmpdir):
+    filename = os.path.join(tmpdir.strpath, "latin1.conllu")
+    sentence = u"1\tcora\u00e7\u00e3o\t_\t_\t_\t_\t0\troot\t_\t_\n\n"
+    with open(filename, "wb") as fho:
+        fho.write((sentence * 10000).encode("latin-1"))
+    snapshots = []
+    progress = ProgressReporter(callback=snapshots.append, interval=0)
+    list(conllu.parse_file(filename, progress=progress, encoding="latin-1"))
+    positions = [snapshot['bytes'] for snapshot in snapshots]
+
+    assert positions == sorted(positions)
+    assert positions[0] < positions[-1] == os.path.getsize(filename)
+
+
 def test_parse_sentence_returns_sentence(conllu, conllu_string):
     assert isinstance(conllu.parse_sentence(conllu_string), Sentence) is True
 
@@ -118,12 +208,46 @@ def test_generate_conllu_with_empty_node(
             conllu_string_with_empty_node)
 
 
+def test_generate_conllu_with_enhanced_deps(
+        conllu, conllu_string_with_enhanced_deps):
+    sentence = conllu.parse_sentence(conllu_string_with_enhanced_deps)
+
+    assert (conllu.generate_conllu_sentence(sentence) ==
+            conllu_string_with_enhanced_deps)
+
+
+def test_get_enhanced_graph(conllu, conllu_string_with_enhanced_deps):
+    graph = conllu.get_enhanced_graph(
+        conllu.parse_sentence(conllu_string_with_enhanced_deps))
+
+    assert graph.dependents("5.1") == [(4, "cc"), (5, "nsubj"), (6, "obj")]
+
+
 def test_generate_conllu_from_file(
         conllu, parsed_sentences, conllu_file_contents):
     assert (conllu.generate_conllu_file(parsed_sentences) ==
             conllu_file_contents)
 
 
+def test_write_conllu_file(conllu, tmpdir, parsed_sentences):
+    ofile = str(tmpdir.join("out.conllu"))
+    stream = io.StringIO()
+
+    assert conllu.write_conllu_file(iter(parsed_sentences), ofile) == 3
+    assert conllu.write_conllu_file(parsed_sentences, stream) == 3
+    with io.open(ofile, encoding="utf-8") as fhi:
+        contents = fhi.read()
+    assert contents == stream.getvalue()
+    assert contents == conllu.generate_conllu_file(parsed_sentences) + "\n"
+
+
+def test_dump_and_load_sentences(conllu, parsed_sentences):
+    data = conllu.dump_sentences(iter(parsed_sentences))
+
+    assert (isinstance(data, bytes) and
+            conllu.load_sentences(data) == parsed_sentences)
+
+
 def test_convert_tokens_to_conllu_line(
         conllu, parsed_sentence_from_string, conllu_string):
     expected = "\n".join(conllu_string.split("\n")[3:7]) + "\n"
@@ -204,6 +328,30 @@ def test_get_sentence_text_from_comments(conllu, parsed_sentences):
     assert conllu.get_sentence_text(parsed_sentences[0]) == raw_sentence
 
 
+def test_get_sentence_text_from_comments_before_others(conllu):
+    sentence = Sentence(comments="# text = A cidade.\n# sent_id = 7")
+
+    assert conllu.get_sentence_text(sentence) == "A cidade."
+
+
+def test_get_sentence_id(conllu, parsed_sentences):
+    assert ([conllu.get_sentence_id(sentence)
+             for sentence in parsed_sentences] == ["1", "2", "3"])
+
+
+def test_get_sentence_id_without_comments(
+        conllu, parsed_sentence_from_string):
+    assert conllu.get_sentence_id(parsed_sentence_from_string) is None
+
+
+def test_parsed_comments_round_trip(conllu, conllu_multiple_strings):
+    raw_sentence = next(iter(conllu_multiple_strings.split("\n\n")))
+    sentence = conllu.parse_sentence(raw_sentence)
+    sentence.metadata
+
+    assert conllu.generate_conllu_sentence(sentence) == raw_sentence + "\n"
+
+
 def test_get_head_deps_from_sentence(conllu, parsed_sentence_from_string):
     headdeps = [
         HeadDep(head="objetivo", dep="o", relation="det", position=(1, 0)),
@@ -237,6 +385,59 @@ def test_get_head_deps_in_deprel(conllu, parsed_sentence_from_string):
         "nmod", parsed_sentence_from_string) == headdeps_nmod)
 
 
+def test_iter_headdep_triples(conllu, parsed_sentences):
+    triples = conllu.iter_headdep_triples(parsed_sentences)
+    expected = [
+        (headdep.head, headdep.dep, headdep.relation) + headdep.position
+        for sentence in parsed_sentences
+        for headdep in conllu.get_headdep_triples(sentence)]
+
+    assert isinstance(triples, GeneratorType)
+    assert list(triples) == expected
+
+
+def test_iter_headdep_triples_with_filters(
+        conllu, parsed_sentence_from_string):
+    assert list(conllu.iter_headdep_triples(
+        [parsed_sentence_from_string], deprels=["nmod", "det"],
+        head_upostags=["NOUN"], dep_upostags=["NOUN"])) == [
+            ("objetivo", "hotél", "nmod", 1, 5),
+            ("hotél", "cidade", "nmod", 5, 8)]
+
+
+def test_iter_headdep_triples_skips_missing_heads(conllu):
+    sentence = Sentence(tokens=[
+        Token(id="1", form="Ola", lemma="ola", head=None, deprel="_")])
+
+    assert list(conllu.iter_headdep_triples([sentence])) == []
+
+
+@pytest.mark.parametrize("delimiter", ["\t", ","])
+def test_write_headdep_triples(
+        conllu, tmpdir, parsed_sentence_from_string, delimiter):
+    ofile = os.path.join(tmpdir.strpath, "triples.tsv")
+    written = conllu.write_headdep_triples(
+        [parsed_sentence_from_string], ofile, delimiter=delimiter,
+        deprels=["nmod"])
+
+    with open(ofile) as fhi:
+        contents = fhi.read()
+
+    assert written == 2
+    assert contents == delimiter.join(
+        ["objetivo", "hotél", "nmod", "1", "5"]) + "\n" + delimiter.join(
+        ["hotél", "cidade", "nmod", "5", "8"]) + "\n"
+
+
+def test_write_headdep_triples_to_file_object(
+        conllu, parsed_sentence_from_string):
+    output = io.StringIO()
+    written = conllu.write_headdep_triples(
+        [parsed_sentence_from_string], output)
+
+    assert written == 9 and len(output.getvalue().splitlines()) == 9
+
+
 def test_get_heads_from_sentence(conllu, parsed_sentence_from_string, heads):
     assert conllu.get_heads(parsed_sentence_from_string) == heads
 
@@ -249,6 +450,27 @@ def test_get_deps_from_head(conllu, parsed_sentence_from_string, heads):
         head, parsed_sentence_from_string) == deps)
 
 
+def test_get_tree(conllu, parsed_sentence_from_string):
+    tree = conllu.get_tree(parsed_sentence_from_string)
+
+    assert tree.subtree(9) == [9, 7, 8] and tree.ancestors(9) == [6, 2]
+
+
+def test_get_dependency_paths(conllu, parsed_sentence_from_string):
+    paths = conllu.get_dependency_paths(
+        parsed_sentence_from_string, [(4, 8), (9, 2), (5, 5), (2, 10)])
+
+    assert paths == [
+        [u"det\u2191", "NOUN", u"\u2193nmod", "NOUN", u"\u2193det"],
+        [u"nmod\u2191", "NOUN", u"nmod\u2191"],
+        [],
+        [u"\u2193punct"],
+    ]
+    assert conllu.get_dependency_paths(
+        parsed_sentence_from_string, [(4, 8)], field="lemma") == [
+            [u"det\u2191", u"hotél", u"\u2193nmod", "cidade", u"\u2193det"]]
+
+
 @pytest.mark.parametrize("line,expected", [
     ("18-19\tdel\t_\t_\t_\t_\t_\t_\t_\t_", True),
     ("25\tfor\tfor\tADP\tIN\t_\t26\tcase\t_\t_", False),
@@ -352,7 +574,12 @@ def test_parse_dict_value(conllu, value, expected):
 
 
 @pytest.mark.parametrize("value,expected", [
-    ("2:obj|4:obj", [('obj', 2), ('obj', 4)]), ("_", None)
+    ("2:obj|4:obj", [('obj', 2), ('obj', 4)]), ("_", None),
+    ("8.1:nsubj", [('nsubj', '8.1')]),
+    ("0:root|4:conj:and", [('root', 0), ('conj:and', 4)]),
+    ("3:nmod:poss|5:obl:при:loc", [('nmod:poss', 3), ('obl:при:loc', 5)]),
+    ("3:nmod:Poss", [('nmod:Poss', 3)]),
+    ("SpaceAfter=No", "SpaceAfter=No"), ("_|2:obj", "_|2:obj"),
 ])
 def test_parse_paired_list_value(conllu, value, expected):
     assert conllu._parse_paired_list_value(value) == expected
@@ -384,3 +611,32 @@ def test_tag_is_propername(conllu, tag, expected):
 ])
 def test_get_lemma(conllu, token, lemma):
     assert conllu._get_lemma(token) == lemma
+
+
+def test_tag_is_propername_with_missing_tag(conllu):
+    assert conllu._is_propername(None) is False
+
+
+def test_get_lemmas_with_missing_xpostag(conllu):
+    sentence = Sentence(tokens=[
+        Token(id="1", form="Vigo", lemma="vigo", upostag="PROPN"),
+        Token(id="2", form="é", lemma="ser", upostag="AUX"),
+    ])
+
+    assert conllu.get_lemmas(sentence) == ["Vigo", "ser"]
+
+
+def test_get_lemmas_with_custom_propername_pattern(
+        parsed_sentence_from_string):
+    conllu = CoNLLU(propername_pattern=r"NOUN$")
+
+    assert conllu.get_lemmas(parsed_sentence_from_string)[:3] == [
+        "o", "objetivo", "de"]
+    assert conllu.get_lemmas(parsed_sentence_from_string)[5] == "hotéis"
+
+
+def test_normalize_lemmas(conllu):
+    assert conllu.normalize_lemmas(
+        ["O", "GIM", "subiu"], ["o", "gim", "subir"],
+        ["DET", "PROPN", "VERB"], ["DET", "NP00000", None]) == [
+            "o", "GIM", "subir"]
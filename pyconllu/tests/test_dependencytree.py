@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+from pyconllu.DependencyTree import DependencyTree
+from pyconllu.Sentence import Sentence
+from pyconllu.Token import Token
+
+
+def build_sentence(heads):
+    return Sentence(tokens=[
+        Token(id=str(idx), head=head) for idx, head in enumerate(heads, 1)])
+
+
+@pytest.fixture()
+def tree(parsed_sentence_from_string):
+    return DependencyTree(parsed_sentence_from_string)
+
+
+def test_tree_structure(tree):
+    assert (len(tree) == 10 and
+            tree.root == 2 and
+            tree.parent(8) == 9 and
+            tree.depth(8) == 4 and
+            tree.children(6) == (3, 4, 5, 9))
+
+
+def test_subtree(tree):
+    assert (tree.subtree(6) == [6, 3, 4, 5, 9, 7, 8] and
+            sorted(tree.subtree(0)) == list(range(11)) and
+            tree.subtree(1) == [1] and
+            tree.subtree_size(9) == 3)
+
+
+@pytest.mark.parametrize("ancestor,node,expected", [
+    (6, 8, True), (2, 2, True), (0, 10, True), (9, 6, False), (3, 4, False),
+])
+def test_is_ancestor(tree, ancestor, node, expected):
+    assert tree.is_ancestor(ancestor, node) == expected
+
+
+def test_ancestors(tree):
+    assert tree.ancestors(8) == [9, 6, 2] and tree.ancestors(2) == []
+
+
+def test_projection_and_span(tree):
+    assert (tree.projection(6) == [3, 4, 5, 6, 7, 8, 9] and
+            tree.span(6) == (3, 9) and
+            tree.is_projective(6))
+
+
+def test_non_projective_projection():
+    tree = DependencyTree(build_sentence([3, 4, 0, 3]))
+
+    assert (tree.projection(4) == [2, 4] and
+            tree.span(4) == (2, 4) and
+            not tree.is_projective(4))
+
+
+@pytest.mark.parametrize("first,second,expected", [
+    (4, 8, 6), (7, 8, 9), (1, 10, 2), (9, 7, 9), (5, 5, 5), (0, 3, 0),
+])
+def test_lca(tree, first, second, expected):
+    assert tree.lca(first, second) == expected
+
+
+def test_distance(tree):
+    assert tree.distance(4, 8) == 3 and tree.distance(1, 1) == 0
+
+
+def test_lca_matches_naive_walk():
+    generator = random.Random(0)
+    for _ in range(50):
+        size = generator.randint(1, 40)
+        order = list(range(1, size + 1))
+        generator.shuffle(order)
+        heads = [0] * size
+        for position, node in enumerate(order[1:], 1):
+            heads[node - 1] = order[generator.randrange(position)]
+        tree = DependencyTree(build_sentence(heads))
+
+        for _ in range(20):
+            first = generator.randint(0, size)
+            second = generator.randint(0, size)
+            path = set([first] + tree.ancestors(first) + [0])
+            node = second
+            while node not in path:
+                node = tree.parent(node)
+            assert tree.lca(first, second) == node
+
+
+def test_paths(tree):
+    assert tree.path(4, 8) == [4, 6, 9, 8]
+    assert tree.paths([(2, 9), (9, 2), (5, 5), (0, 1)]) == [
+        [2, 6, 9], [9, 6, 2], [5], [0, 2, 1]]
+
+
+def test_paths_match_distance():
+    generator = random.Random(1)
+    heads = [0] + [generator.randint(1, idx) for idx in range(1, 30)]
+    tree = DependencyTree(build_sentence(heads))
+    pairs = [
+        (generator.randint(1, 30), generator.randint(1, 30))
+        for _ in range(100)]
+
+    for (first, second), path in zip(pairs, tree.paths(pairs)):
+        assert path[0] == first and path[-1] == second
+        assert len(path) == tree.distance(first, second) + 1
+        for node, following in zip(path, path[1:]):
+            assert following in (tree.parent(node), ) + tree.children(node)
+
+
+@pytest.mark.parametrize("heads", [[0, 3, 2], [0, None], [0, 5], [0, 2]])
+def test_invalid_trees_raise_exception(heads):
+    with pytest.raises(Exception):
+        DependencyTree(build_sentence(heads))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.EnhancedGraph import EnhancedGraph
+from pyconllu.Sentence import Sentence
+from pyconllu.Token import Token
+
+
+@pytest.fixture()
+def graph(conllu_string_with_enhanced_deps):
+    return EnhancedGraph(
+        CoNLLU().parse_sentence(conllu_string_with_enhanced_deps))
+
+
+def test_graph_nodes(graph):
+    assert graph.nodes == [0, 1, 2, 3, 4, 5, "5.1", 6, 7]
+    assert "5.1" in graph and 8 not in graph
+
+
+def test_graph_edges(graph):
+    assert len(graph) == 8
+    assert list(graph.edges("nsubj")) == [
+        (2, 1, "nsubj"), ("5.1", 5, "nsubj")]
+
+
+def test_in_and_out_edges(graph):
+    assert (graph.heads(5) == [("5.1", "nsubj")] and
+            graph.heads("5.1") == [(2, "conj:and")] and
+            graph.dependents("5.1") == [
+                (4, "cc"), (5, "nsubj"), (6, "obj")] and
+            graph.roots() == [2])
+
+
+def test_has_edge(graph):
+    assert (graph.has_edge(2, "5.1") and
+            graph.has_edge("2", "5.1", "conj:and") and
+            not graph.has_edge(2, "5.1", "conj"))
+
+
+def test_descendants_and_ancestors(graph):
+    assert (graph.descendants("5.1") == [4, 5, 6] and
+            graph.ancestors(6) == ["5.1", 2])
+
+
+def test_use_basic_for_tokens_without_deps():
+    sentence = Sentence(tokens=[
+        Token(id="1", head=2, deprel="nsubj"),
+        Token(id="2", head=0, deprel="root", deps=[("root", 0)]),
+    ])
+
+    assert (len(EnhancedGraph(sentence)) == 1 and
+            EnhancedGraph(sentence, use_basic=True).heads(1) == [
+                (2, "nsubj")])
+
+
+@pytest.mark.parametrize("node,expected", [
+    ("8", 8), (8, 8), ("8.1", "8.1"), ("0", 0)
+])
+def test_node_key(node, expected):
+    assert EnhancedGraph.node_key(node) == expected
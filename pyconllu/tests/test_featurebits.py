@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.FeatureBits import FeatureBits, FeatureQuery
+
+
+@pytest.fixture()
+def tokens(conllu_file_contents):
+    return [
+        token for sentence in CoNLLU().parse_sentences(conllu_file_contents)
+        for token in sentence.tokens]
+
+
+@pytest.fixture()
+def bits():
+    return FeatureBits()
+
+
+def test_encode_and_decode(bits, tokens):
+    masks = bits.encode_tokens(tokens)
+
+    assert len(bits) == len(set(
+        pair for token in tokens if token.feats
+        for pair in token.feats.items()))
+    for token, mask in zip(tokens, masks):
+        assert bits.decode(mask) == token.feats
+
+
+def test_multiple_values(bits):
+    mask = bits.encode(OrderedDict([("PronType", "Rel,Int"), ("Case", "Nom")]))
+
+    assert bin(mask).count("1") == 3
+    assert bits.decode(mask) == OrderedDict(
+        [("Case", "Nom"), ("PronType", "Int,Rel")])
+
+
+def test_encode_without_growing(bits):
+    bits.add("Number", "Sing")
+    feats = OrderedDict([("Number", "Sing"), ("Gender", "Fem")])
+
+    assert bits.encode(feats, grow=False) == 1
+    assert len(bits) == 1
+    assert bits.encode(None) == 0 and bits.decode(0) is None
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("Gender=Fem", [True, False, True, False]),
+    ("Gender=Fem & Number=Plur", [False, False, True, False]),
+    ("Number=Plur & VerbForm!=Inf", [False, False, True, False]),
+    ("Number=Sing|Plur", [True, True, True, False]),
+    ("VerbForm!=Fin|Inf", [True, True, True, False]),
+    ("Gender=Neut", [False, False, False, False]),
+    ("Gender!=Neut", [True, True, True, True]),
+])
+def test_compile(bits, query, expected):
+    masks = [
+        bits.encode(OrderedDict(pairs)) for pairs in [
+            [("Gender", "Fem"), ("Number", "Sing")],
+            [("Gender", "Masc"), ("Number", "Sing")],
+            [("Gender", "Fem"), ("Number", "Plur")],
+            [("VerbForm", "Inf")]]]
+    compiled = bits.compile(query)
+
+    assert isinstance(compiled, FeatureQuery)
+    assert [compiled(mask) for mask in masks] == expected
+
+
+@pytest.mark.parametrize("query", ["Gender", "Gender=Fem && Number=Sing"])
+def test_invalid_query(bits, query):
+    with pytest.raises(ValueError):
+        bits.compile(query)
+
+
+def test_arrays(bits, tokens):
+    np = pytest.importorskip("numpy")
+    bits = FeatureBits(("Extra", str(idx)) for idx in range(70))
+    masks = bits.encode_tokens(tokens)
+    array = bits.to_array(masks)
+
+    assert array.shape == (len(tokens), 2) and array.dtype == np.uint64
+    assert bits.from_array(array) == masks
+    for query in ("Gender=Fem & Number=Plur", "Number=Sing & Gender!=Masc",
+                  "Gender=Fem|Masc & Number!=Plur", "Gender=Neut"):
+        compiled = bits.compile(query)
+        assert compiled.match_array(array).tolist() == [
+            compiled(mask) for mask in masks]
+
+
+def test_compile_with_growing(bits):
+    query = bits.compile("Number=Plur & Gender!=Masc", grow=True)
+
+    assert len(bits) == 2
+    assert query(bits.encode(OrderedDict([("Number", "Plur")])))
+    assert not query(bits.encode(
+        OrderedDict([("Gender", "Masc"), ("Number", "Plur")])))
+
+
+def test_match_array_with_bits_beyond_its_width():
+    pytest.importorskip("numpy")
+    bits = FeatureBits(("A", str(idx)) for idx in range(64))
+    masks = [1 << idx for idx in range(64)]
+    array = bits.to_array(masks)
+
+    for query in ("Z=1", "A=0 & Z=1", "Z=1|2", "A=1 & Z!=1", "A=1|2 & Z!=2",
+                  "A=3|Z"):
+        compiled = bits.compile(query, grow=True)
+        assert compiled.match_array(array).tolist() == [
+            compiled(mask) for mask in masks]
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
-from pyconllu.HeadDep import HeadDep
+import pickle
+from collections import Counter
+import pytest
+from pyconllu.HeadDep import FrozenHeadDep, HeadDep
 
 
 def test_headdep():
@@ -18,3 +21,56 @@ def test_empty_headdep():
             empty_headdep.dep is None and
             empty_headdep.relation is None and
             empty_headdep.position is None)
+
+
+def test_headdep_has_no_dict():
+    assert not hasattr(HeadDep(), "__dict__")
+
+
+def test_equal_headdeps_have_equal_hashes():
+    first = HeadDep("árbol", "plantar", "obj", (3, 4))
+    second = HeadDep("árbol", "plantar", "obj", (3, 4))
+
+    assert first == second and hash(first) == hash(second)
+    assert first != HeadDep("árbol", "plantar", "nsubj", (3, 4))
+
+
+def test_headdep_tuple_conversion():
+    headdep = HeadDep("árbol", "plantar", "obj", (3, 4))
+
+    assert headdep.astuple() == ("árbol", "plantar", "obj", (3, 4))
+    assert HeadDep.from_tuple(headdep.astuple()) == headdep
+
+
+def test_frozen_headdep_is_immutable():
+    frozen = FrozenHeadDep("árbol", "plantar", "obj", (3, 4))
+
+    with pytest.raises(AttributeError):
+        frozen.head = "planta"
+    with pytest.raises(AttributeError):
+        del frozen.dep
+    assert frozen.head == "árbol"
+
+
+def test_frozen_headdep_equals_headdep():
+    headdep = HeadDep("árbol", "plantar", "obj", (3, 4))
+    frozen = headdep.freeze()
+
+    assert (isinstance(frozen, FrozenHeadDep) and
+            frozen == headdep and headdep == frozen and
+            hash(frozen) == hash(headdep))
+
+
+def test_frozen_headdeps_as_counter_keys():
+    counter = Counter(
+        FrozenHeadDep("árbol", "plantar", "obj", (3, 4)) for _ in range(3))
+
+    assert counter[HeadDep("árbol", "plantar", "obj", (3, 4))] == 3
+
+
+@pytest.mark.parametrize("cls", [HeadDep, FrozenHeadDep])
+def test_headdep_pickling(cls):
+    headdep = cls("árbol", "plantar", "obj", (3, 4))
+    unpickled = pickle.loads(pickle.dumps(headdep))
+
+    assert type(unpickled) is cls and unpickled == headdep
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import sys
+from collections import OrderedDict
+from pyconllu.MemoryProfiler import (
+    deep_sizeof, estimate_tokens, MemoryProfiler)
+from pyconllu.Token import Token
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    value = "x" * 100
+    assert deep_sizeof([value, value]) == (
+        sys.getsizeof([value, value]) + sys.getsizeof(value))
+
+
+def test_deep_sizeof_follows_instance_dicts():
+    token = Token(id="1", feats=OrderedDict([("Number", "Sing")]))
+    object_types = {}
+    size = deep_sizeof(token, object_types)
+
+    assert object_types['Token'] == [1, sys.getsizeof(token)]
+    assert object_types['Token.__dict__'][0] == 1
+    assert object_types['OrderedDict'][0] == 1
+    assert size == sum(entry[1] for entry in object_types.values())
+
+
+def test_deep_sizeof_skips_seen_objects():
+    value = "x" * 100
+    seen = set()
+    deep_sizeof([value], seen=seen)
+
+    assert deep_sizeof([value], seen=seen) == sys.getsizeof([value])
+
+
+def test_profile(conllu_file_contents):
+    raw_sentences = conllu_file_contents.split("\n\n")
+    report = MemoryProfiler().profile(raw_sentences, corpus_tokens=450)
+    parsed = report['representations']['parsed']
+
+    assert report['sentences'] == 3
+    assert report['tokens'] == 45
+    assert list(report['representations'])[:5] == [
+        'raw', 'parsed', 'heads', 'packed', 'pickled']
+    assert parsed['bytes_per_token'] == parsed['bytes'] / 45.0
+    assert parsed['projected'] == int(parsed['bytes_per_token'] * 450)
+    # tokens plus the contraction of the first sentence
+    assert report['types']['Token'][0] == 46
+    assert sum(size for _, size in report['types'].values()) == (
+        parsed['bytes'])
+
+
+def test_profile_without_tracemalloc(conllu_string):
+    report = MemoryProfiler(use_tracemalloc=False).profile([conllu_string])
+
+    assert all(
+        measure['traced'] is None and measure['projected'] is None
+        for measure in report['representations'].values())
+
+
+def test_estimate_tokens(conllu_string):
+    size = len(conllu_string.encode("utf-8")) + 1
+
+    assert estimate_tokens([conllu_string], size * 10) == 100
+
+
+def test_format(conllu_string):
+    report = MemoryProfiler().profile([conllu_string])
+    lines = MemoryProfiler.format(report).splitlines()
+
+    assert lines[0] == "1 sentences, 10 tokens"
+    assert lines[3].split()[:2] == ["raw", str(
+        report['representations']['raw']['bytes'])]
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.NgramCounter import NgramCounter
+
+
+@pytest.fixture()
+def sentences(conllu_file_contents):
+    return list(CoNLLU().parse_sentences(conllu_file_contents))
+
+
+@pytest.fixture()
+def corpus_files(tmpdir, conllu_file_contents):
+    raw_sentences = list(CoNLLU().read_sentences(conllu_file_contents))
+    filenames = []
+    for number in range(2):
+        filename = os.path.join(tmpdir.strpath, "{}.conllu".format(number))
+        with io.open(filename, "w", encoding="utf-8") as fho:
+            fho.write(u"\n".join(raw_sentences[number::2]))
+        filenames.append(filename)
+    return filenames
+
+
+def test_values(conllu_string):
+    sentence = CoNLLU().parse_sentence(conllu_string)
+    assert NgramCounter().values(sentence)[1:5] == [
+        "objetivo", "de", "os", "principais"]
+    assert NgramCounter(contractions="tokens").values(sentence) == [
+        "O", "objetivo", "dos", "principais", "hotéis", "da", "cidade", "."]
+    assert NgramCounter(
+        field="upostag", contractions="tokens").values(sentence)[1:4] == [
+            "NOUN", "ADP+DET", "ADJ"]
+
+
+def test_lemma_values_follow_propername_rule(sentences):
+    values = NgramCounter(field="lemma").values(sentences[0])
+    tokens = sentences[0].tokens
+    for token, value in zip(tokens, values):
+        expected = token.form if token.upostag == "PROPN" else token.lemma
+        assert value == expected
+
+
+def test_count(sentences):
+    counter = NgramCounter(field="upostag", max_n=2)
+    counter.count(sentences)
+    tokens = sum(len(sentence.tokens) for sentence in sentences)
+    assert sum(count for _, count in counter.items(1)) == tokens
+    assert sum(count for _, count in counter.items(2)) == (
+        tokens - len(sentences))
+    assert all(len(ngram) == 2 for ngram, _ in counter.items(2))
+
+    most_common = counter.most_common(1, 2)
+    assert most_common[0][1] >= most_common[1][1]
+
+
+def test_min_count(sentences):
+    counter = NgramCounter(min_count=2)
+    counter.count(sentences)
+    assert all(count >= 2 for _, count in counter.items(2))
+
+
+def test_spilling_keeps_exact_counts(tmpdir, sentences):
+    counter = NgramCounter(field="lemma")
+    counter.count(sentences)
+    spilling = NgramCounter(
+        field="lemma", max_entries=20, spill_dir=tmpdir.strpath)
+    spilling.count(sentences)
+
+    assert spilling.runs[0]
+    assert len(spilling) <= 20
+    for n in range(1, 4):
+        assert list(spilling.items(n)) == list(counter.items(n))
+
+    spilling.close()
+    assert tmpdir.listdir() == [] and spilling.runs == [[], [], []]
+
+
+def test_items_by_count_sorts_in_runs(tmpdir, sentences, monkeypatch):
+    counter = NgramCounter(field="lemma")
+    counter.count(sentences)
+    spilling = NgramCounter(
+        field="lemma", max_entries=20, spill_dir=tmpdir.strpath)
+    spilling.count(sentences)
+    runs = len(tmpdir.listdir())
+    written = []
+    write_run = spilling._write_run
+
+    def _write_run(n, items, kind=""):
+        items = list(items)
+        written.append(len(items))
+        return write_run(n, items, kind)
+
+    monkeypatch.setattr(spilling, "_write_run", _write_run)
+    for n in range(1, 4):
+        by_count = list(spilling.items_by_count(n))
+        assert by_count == counter.most_common(n)
+        assert spilling.most_common(n, 3) == by_count[:3]
+
+    assert written and max(written) <= 20
+    assert len(tmpdir.listdir()) == runs
+    spilling.close()
+
+
+def test_pruning(sentences):
+    counter = NgramCounter(max_entries=20)
+    counter.count(sentences)
+    assert len(counter) <= 20
+    assert counter.pruned_count >= 1
+
+
+def test_merge(sentences):
+    counter = NgramCounter()
+    counter.count(sentences)
+    first = NgramCounter()
+    first.count(sentences[:2])
+    second = NgramCounter()
+    second.count(sentences[2:])
+
+    first.merge(second)
+    assert list(first.items(3)) == list(counter.items(3))
+    with pytest.raises(ValueError):
+        first.merge(NgramCounter(field="lemma"))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_count_files(corpus_files, sentences, jobs):
+    counter = NgramCounter()
+    counter.count(sentences)
+    parallel = NgramCounter()
+    parallel.count_files(corpus_files, jobs=jobs)
+    assert list(parallel.items(2)) == list(counter.items(2))
+
+
+def test_write(tmpdir, sentences):
+    counter = NgramCounter(max_n=2)
+    counter.count(sentences)
+    prefix = os.path.join(tmpdir.strpath, "forms.")
+    assert counter.write(prefix) == [prefix + "1.tsv", prefix + "2.tsv"]
+
+    with io.open(prefix + "2.tsv", encoding="utf-8") as fhi:
+        rows = [line.rstrip("\n").split("\t") for line in fhi]
+    assert all(len(row) == 3 for row in rows)
+    counts = [int(row[2]) for row in rows]
+    assert counts == sorted(counts, reverse=True)
+
+    counter.write(prefix, by="ngram")
+    with io.open(prefix + "1.tsv", encoding="utf-8") as fhi:
+        ngrams = [line.split("\t")[0] for line in fhi]
+    assert ngrams == sorted(ngrams)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        NgramCounter(field="deprel")
+    with pytest.raises(ValueError):
+        NgramCounter(contractions="both")
+    with pytest.raises(ValueError):
+        NgramCounter().write("x", by="size")
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+import sys
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.ParseCache import CACHE_FORMAT, ParseCache
+
+
+@pytest.fixture()
+def cache(tmpdir):
+    return ParseCache(cache_dir=os.path.join(tmpdir.strpath, "cache"))
+
+
+def test_cache_miss_returns_none(cache, conllu_filename, conllu_string):
+    assert cache.get(conllu_filename(conllu_string)) is None
+
+
+def test_cache_missing_file_returns_none(cache, tmpdir):
+    assert cache.get(os.path.join(tmpdir.strpath, "missing.conllu")) is None
+
+
+def test_parse_file_stores_sentences(
+        cache, conllu_filename, conllu_file_contents, parsed_sentences):
+    filename = conllu_filename(conllu_file_contents)
+    sentences = list(CoNLLU(cache=cache).parse_file(filename))
+
+    assert sentences == parsed_sentences
+    assert list(cache.get(filename)) == parsed_sentences
+
+
+def test_cache_hit_skips_parsing(
+        cache, conllu_filename, conllu_file_contents, parsed_sentences,
+        monkeypatch):
+    filename = conllu_filename(conllu_file_contents)
+    conllu = CoNLLU(cache=cache)
+    list(conllu.parse_file(filename))
+
+    def _fail(*args):
+        raise AssertionError("file parsed on cache hit")
+
+    monkeypatch.setattr(conllu, "read_sentences_from_file", _fail)
+    monkeypatch.setattr(conllu, "parse_sentence", _fail)
+
+    assert list(conllu.parse_file(filename)) == parsed_sentences
+
+
+def test_partial_iteration_is_not_cached(
+        cache, conllu_filename, conllu_file_contents):
+    filename = conllu_filename(conllu_file_contents)
+    next(CoNLLU(cache=cache).parse_file(filename))
+
+    assert cache.get(filename) is None
+
+
+def test_modified_file_invalidates_entry(
+        cache, conllu_filename, conllu_file_contents, conllu_string):
+    filename = conllu_filename(conllu_file_contents)
+    list(CoNLLU(cache=cache).parse_file(filename))
+    conllu_filename(conllu_string)
+
+    assert cache.get(filename) is None
+
+
+def test_content_hash_is_part_of_key(tmpdir, conllu_filename, conllu_string):
+    filename = conllu_filename(conllu_string)
+    cache_dir = os.path.join(tmpdir.strpath, "cache")
+
+    assert (ParseCache(cache_dir=cache_dir).key(filename) !=
+            ParseCache(cache_dir=cache_dir, content_hash=True).key(filename))
+
+
+def test_eviction_keeps_cache_under_max_size(
+        tmpdir, conllu_filename, conllu_string):
+    cache = ParseCache(
+        cache_dir=os.path.join(tmpdir.strpath, "cache"), max_size=1)
+    conllu = CoNLLU(cache=cache)
+    filename = conllu_filename(conllu_string)
+    list(conllu.parse_file(filename))
+
+    assert cache.get(filename) is None
+
+
+def test_eviction_removes_least_recently_used(
+        tmpdir, conllu_filename, conllu_string):
+    cache = ParseCache(cache_dir=os.path.join(tmpdir.strpath, "cache"))
+    conllu = CoNLLU(cache=cache)
+    first = conllu_filename(conllu_string, "first.conllu")
+    second = conllu_filename(conllu_string, "second.conllu")
+    list(conllu.parse_file(first))
+    list(conllu.parse_file(second))
+    os.utime(cache._entry_path(cache.key(first)), (0, 0))
+    cache.max_size = os.path.getsize(cache._entry_path(cache.key(second)))
+    cache.evict()
+
+    assert cache.get(first) is None and cache.get(second) is not None
+
+
+def test_corrupted_entry_is_a_miss(cache, conllu_filename, conllu_string):
+    filename = conllu_filename(conllu_string)
+    list(CoNLLU(cache=cache).parse_file(filename))
+    with open(cache._entry_path(cache.key(filename)), "wb") as fho:
+        fho.write(b"garbage")
+
+    assert cache.get(filename) is None
+
+
+def test_clear_removes_entries(cache, conllu_filename, conllu_string):
+    filename = conllu_filename(conllu_string)
+    list(CoNLLU(cache=cache).parse_file(filename))
+    cache.clear()
+
+    assert cache.get(filename) is None
+
+
+def test_encoding_is_part_of_key(cache, tmpdir):
+    filename = os.path.join(tmpdir.strpath, "latin1.conllu")
+    with open(filename, "wb") as fho:
+        fho.write(u"1\tcora\u00e7\u00e3o\t_\t_\t_\t_\t0\troot\t_\t_\n".encode(
+            "latin-1"))
+    conllu = CoNLLU(cache=cache)
+    list(conllu.parse_file(filename, encoding="latin-1"))
+
+    assert cache.key(filename, "latin-1") == cache.key(filename, "LATIN1")
+    assert cache.get(filename, "utf-8") is None
+    with pytest.raises(UnicodeDecodeError):
+        list(conllu.parse_file(filename, encoding="utf-8"))
+
+
+def test_entries_are_read_in_chunks(
+        tmpdir, conllu_filename, conllu_file_contents, parsed_sentences):
+    cache = ParseCache(
+        cache_dir=os.path.join(tmpdir.strpath, "cache"), chunk_size=1)
+    filename = conllu_filename(conllu_file_contents)
+    list(CoNLLU(cache=cache).parse_file(filename))
+    sentences = cache.get(filename)
+
+    assert next(sentences) == parsed_sentences[0]
+    assert list(sentences) == parsed_sentences[1:]
+
+
+def test_corrupted_chunk_parses_the_sentences_left(
+        tmpdir, conllu_filename, conllu_file_contents, parsed_sentences):
+    cache = ParseCache(
+        cache_dir=os.path.join(tmpdir.strpath, "cache"), chunk_size=1)
+    filename = conllu_filename(conllu_file_contents)
+    conllu = CoNLLU(cache=cache)
+    list(conllu.parse_file(filename))
+    path = cache._entry_path(cache.key(filename))
+    with open(path, "rb") as fhi:
+        header = pickle.load(fhi)
+        first = pickle.load(fhi)
+        offset = fhi.tell()
+    with open(path, "r+b") as fho:
+        fho.seek(offset)
+        fho.write(b"garbage")
+
+    assert header == CACHE_FORMAT and first == parsed_sentences[:1]
+    assert list(conllu.parse_file(filename)) == parsed_sentences
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("error", [OSError, KeyboardInterrupt])
+def test_interrupted_put_removes_temporary_file(
+        cache, conllu_filename, conllu_string, monkeypatch, error):
+    filename = conllu_filename(conllu_string)
+
+    def _fail(*args):
+        raise error()
+
+    monkeypatch.setattr(sys.modules[ParseCache.__module__], "_replace", _fail)
+    if error is OSError:
+        cache.put(filename, [])
+    else:
+        with pytest.raises(error):
+            cache.put(filename, [])
+
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_abandoned_writer_removes_temporary_file(
+        tmpdir, conllu_filename, conllu_file_contents):
+    cache = ParseCache(
+        cache_dir=os.path.join(tmpdir.strpath, "cache"), chunk_size=1)
+    filename = conllu_filename(conllu_file_contents)
+    sentences = CoNLLU(cache=cache).parse_file(filename)
+    next(sentences)
+    next(sentences)
+    sentences.close()
+
+    assert os.listdir(cache.cache_dir) == []
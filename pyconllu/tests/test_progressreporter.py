@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import io
+import pytest
+from pyconllu.ProgressReporter import file_position, ProgressReporter
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def snapshots():
+    return []
+
+
+@pytest.fixture()
+def reporter(clock, snapshots):
+    return ProgressReporter(
+        callback=snapshots.append, interval=1.0, clock=clock)
+
+
+def test_reports_are_rate_limited(reporter, clock, snapshots):
+    reporter.start()
+    for _ in range(10):
+        clock.now += 0.25
+        reporter.update(1, 10, 100)
+
+    assert [snapshot['sentences'] for snapshot in snapshots] == [4, 8]
+
+    reporter.finish()
+    assert snapshots[-1]['sentences'] == 10
+    assert snapshots[-1]['tokens'] == 100
+    assert snapshots[-1]['bytes'] == 1000
+
+
+def test_snapshot_rates_and_eta(reporter, clock):
+    reporter.start(total_bytes=4 << 20)
+    clock.now += 2
+    reporter.update(sentences=100, tokens=1500, bytes_read=1 << 20)
+    snapshot = reporter.snapshot()
+
+    assert snapshot['elapsed'] == 2
+    assert snapshot['sentences_per_second'] == 50
+    assert snapshot['tokens_per_second'] == 750
+    assert snapshot['mb_per_second'] == 0.5
+    assert snapshot['eta'] == 6
+
+
+def test_snapshot_without_total_has_no_eta(reporter, clock):
+    reporter.update(1, 1, 1)
+
+    assert reporter.snapshot()['eta'] is None
+    assert reporter.snapshot()['sentences_per_second'] == 0
+
+
+def test_update_raw_sentence(reporter, conllu_string):
+    reporter.update_raw_sentence(conllu_string)
+
+    assert reporter.sentences == 1
+    assert reporter.tokens == 10
+    assert reporter.bytes_read == len(conllu_string.encode("utf-8")) + 1
+
+
+def test_update_with_position(reporter, conllu_string):
+    reporter.update_raw_sentence(conllu_string, position=1000)
+    reporter.update(1, 5, position=1500)
+
+    assert reporter.sentences == 2
+    assert reporter.tokens == 15
+    assert reporter.bytes_read == 1500
+
+
+def test_file_position(tmpdir):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_binary(b"caf\xe9\n" * 10000)
+    with io.open(ifile.strpath, encoding="latin-1") as fhi:
+        position = file_position(fhi)
+        assert position() == 0
+        for _ in fhi:
+            pass
+        assert position() == ifile.size()
+
+    assert file_position(io.StringIO(u"1\tcafe\n")) is None
+
+
+def test_writes_lines_without_callback(clock):
+    stream = io.StringIO()
+    reporter = ProgressReporter(stream=stream, clock=clock)
+    reporter.start(total_bytes=3 << 20)
+    clock.now += 61
+    reporter.update(10, 150, 1 << 20)
+
+    assert stream.getvalue() == (
+        u"10 sentences, 150 tokens, 1.0 MB in 0:01:01 (0 sent/s, 2 tok/s, "
+        u"0.0 MB/s), ETA 0:02:02\n")
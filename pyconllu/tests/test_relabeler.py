@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.Relabeler import Relabeler
+from pyconllu.Vocabulary import Vocabulary
+
+RULES = {
+    "deprel": {"nmod": "obl", "det": "det:art"},
+    "xpostag": {"map": {"DET": "D", "NOUN": "N"}, "default": "X"},
+    "feats": {"Gender=Masc": "Gender=M", "PronType": "Type",
+              "Definite": None},
+}
+
+
+@pytest.fixture()
+def relabeler():
+    return Relabeler(RULES)
+
+
+def test_transform_raw(relabeler, conllu_string):
+    lines = relabeler.transform_raw(conllu_string).splitlines()
+
+    assert lines[0].split("\t") == [
+        "1", "O", "o", "DET", "D", "Gender=M|Number=Sing|Type=Art", "2",
+        "det:art", "_", "_"]
+    assert lines[2] == "3-4\tdos\t_\t_\t_\t_\t_\t_\t_\t_"
+    assert lines[3].split("\t")[4:8] == ["X", "_", "6", "case"]
+    assert lines[6].split("\t")[7] == "obl"
+
+
+def test_transform_matches_transform_raw(
+        relabeler, conllu_multiple_strings):
+    conllu = CoNLLU()
+    sentences = list(conllu.parse_sentences(conllu_multiple_strings))
+    transformed = [
+        conllu.generate_conllu_sentence(sentence)
+        for sentence in relabeler.transform(sentences)]
+    expected = [
+        conllu.generate_conllu_sentence(conllu.parse_sentence(
+            relabeler.transform_raw(raw_sentence)))
+        for raw_sentence in conllu.read_sentences(conllu_multiple_strings)]
+
+    assert transformed == expected
+
+
+def test_transform_leaves_the_sentences_unchanged(
+        relabeler, parsed_sentence_from_string):
+    before = CoNLLU().generate_conllu_sentence(parsed_sentence_from_string)
+    sentence = next(relabeler.transform([parsed_sentence_from_string]))
+
+    assert sentence.tokens[0].deprel == "det:art"
+    assert parsed_sentence_from_string.tokens[0].deprel == "det"
+    assert CoNLLU().generate_conllu_sentence(
+        parsed_sentence_from_string) == before
+
+
+def test_source_field(conllu_string):
+    relabeler = Relabeler({
+        "upostag": {"source": "xpostag", "map": {".": "PUNCT", "DET": "X"}}})
+    lines = relabeler.transform_raw(conllu_string).splitlines()
+
+    assert [line.split("\t")[3] for line in lines[:3]] == ["X", "NOUN", "_"]
+
+
+def test_rules_are_applied_in_order(conllu_string):
+    relabeler = Relabeler()
+    relabeler.add("deprel", {"nmod": "obl"})
+    relabeler.add("deprel", {"obl": "obl:arg"})
+    sentence = next(relabeler.transform(
+        CoNLLU().parse_sentences(conllu_string)))
+
+    assert sentence.tokens[5].deprel == "obl:arg"
+
+
+def test_invalid_rules():
+    with pytest.raises(ValueError):
+        Relabeler({"head": {"1": "2"}})
+    with pytest.raises(ValueError):
+        Relabeler({"feats": {"map": {}, "default": "_"}})
+
+
+def test_transform_file(tmpdir, relabeler, conllu_multiple_strings):
+    ifile = str(tmpdir.join("in.conllu"))
+    ofile = str(tmpdir.join("out.conllu"))
+    rules = str(tmpdir.join("rules.json"))
+    with io.open(ifile, "w", encoding="utf-8") as fho:
+        fho.write(conllu_multiple_strings)
+    with io.open(rules, "w", encoding="utf-8") as fho:
+        fho.write(json.dumps(RULES, ensure_ascii=False))
+
+    assert Relabeler.from_json(rules).transform_file(ifile, ofile) == 3
+    with io.open(ofile, encoding="utf-8") as fhi:
+        output = fhi.read()
+    assert output == "".join(
+        relabeler.transform_raw(raw_sentence).rstrip("\n") + "\n\n"
+        for raw_sentence in CoNLLU().read_sentences(conllu_multiple_strings))
+
+
+def test_lookup_table(relabeler):
+    np = pytest.importorskip("numpy")
+    vocabulary = Vocabulary(["det", "nmod", "root"])
+    table = relabeler.lookup_table("deprel", vocabulary)
+
+    assert table.tolist() == [0, 1, 5, 6, 4]
+    assert [vocabulary.value(idx) for idx in table[np.array([2, 3, 4])]] == [
+        "det:art", "obl", "root"]
+
+
+def test_lookup_table_with_source():
+    np = pytest.importorskip("numpy")
+    relabeler = Relabeler({
+        "upostag": {"source": "xpostag", "map": {"PNOUN": "PROPN"}}})
+    upostags = Vocabulary(["NOUN", "PROPN"])
+    xpostags = Vocabulary(["NOUN", "PNOUN"])
+    table = relabeler.lookup_table("upostag", upostags, xpostags)
+
+    assert table.tolist() == [-1, -1, -1, 3]
+    mapped = table[np.array([2, 3])]
+    assert np.where(mapped < 0, [2, 2], mapped).tolist() == [2, 3]
+    with pytest.raises(ValueError):
+        relabeler.lookup_table("upostag", upostags)
+
+
+def test_feats_rules_are_applied_in_order(parsed_sentence_from_string):
+    relabeler = Relabeler()
+    relabeler.add("feats", {"Gender=Masc": "Gender=Fem"})
+    relabeler.add("feats", {"Gender=Fem": "Gender=Masc", "Number": "Num"})
+    sentence = next(relabeler.transform([parsed_sentence_from_string]))
+    raw = relabeler.transform_raw("1\ta\t_\t_\t_\tGender=Masc\t0\troot\t_\t_")
+
+    assert sentence.tokens[1].feats == {"Gender": "Masc", "Num": "Sing"}
+    assert raw.split("\t")[5] == "Gender=Masc"
+
+
+def test_feature_pairs_are_mapped_to_pairs():
+    with pytest.raises(ValueError):
+        Relabeler({"feats": {"Gender=Masc": "Masc"}})
+
+
+def test_lookup_table_without_padding():
+    pytest.importorskip("numpy")
+    relabeler = Relabeler({
+        "deprel": {"_": "dep", "nmod": "_"},
+        "feats": {"Gender=Masc": "Gender=M"}})
+    deprels = Vocabulary(["nmod", "det"], pad=None)
+    feats = Vocabulary(["Gender=Masc|Number=Sing", "Number=Sing"], pad=None)
+
+    assert relabeler.lookup_table("deprel", deprels).tolist() == [4, 1, 0, 3]
+    assert relabeler.lookup_table("feats", feats).tolist() == [0, 1, 4, 3]
+    assert feats.value(4) == "Gender=M|Number=Sing"
+    assert relabeler.lookup_table(
+        "deprel", Vocabulary(["nmod"])).tolist() == [0, 1, 1]
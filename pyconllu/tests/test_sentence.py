@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import pickle
 from pyconllu.Sentence import Sentence
 from pyconllu.Token import Token
 
@@ -44,3 +45,90 @@ def test_empty_sentence():
             empty_sentence.tokens == [] and
             empty_sentence.contractions == [] and
             empty_sentence.empty_nodes == [])
+
+
+def test_sentence_metadata():
+    sentence = Sentence(comments=(
+        "# newdoc id = doc-1\n# newpar\n# sent_id = train-s1\n"
+        "# text = A cidade.\n# A free comment\n# translation = The city."))
+
+    assert list(sentence.metadata.items()) == [
+        ("newdoc id", "doc-1"),
+        ("newpar", None),
+        ("sent_id", "train-s1"),
+        ("text", "A cidade."),
+        ("translation", "The city."),
+    ]
+
+
+def test_sentence_metadata_is_cached():
+    sentence = Sentence(comments="# sent_id = 1")
+
+    assert sentence.metadata is sentence.metadata
+
+
+def test_sentence_metadata_follows_comments():
+    sentence = Sentence(comments="# sent_id = 1")
+    sentence.metadata
+    sentence.comments = "# sent_id = 2"
+
+    assert sentence.metadata["sent_id"] == "2"
+
+
+def test_empty_sentence_metadata():
+    assert Sentence().metadata == {}
+
+
+def test_sentence_pickling(parsed_sentence_with_empty_node):
+    sentence = parsed_sentence_with_empty_node
+    sentence.metadata
+    unpickled = pickle.loads(pickle.dumps(sentence))
+
+    assert unpickled == sentence
+    assert unpickled.metadata == sentence.metadata
+
+
+def test_sentence_with_token_subclasses_pickling(heads):
+    sentence = Sentence(tokens=heads)
+
+    assert pickle.loads(pickle.dumps(sentence)) == sentence
+
+
+def test_clone(parsed_sentence_from_string):
+    sentence = parsed_sentence_from_string
+    original = pickle.loads(pickle.dumps(sentence))
+    clone = sentence.clone()
+
+    assert clone == sentence and clone.tokens is not sentence.tokens
+    assert all(token.is_shared for token in clone.tokens)
+
+    clone.tokens[0].lemma = "a"
+    clone.contractions[0][0].form = "do"
+    clone.tokens.pop()
+    assert sentence == original
+    assert clone.tokens[0].lemma == "a" and clone.tokens[1].is_shared
+    assert clone.clone() == clone
+
+
+def test_clone_copies_tokens_on_assignment(parsed_sentence_from_string):
+    sentence = parsed_sentence_from_string
+    clone = sentence.clone()
+    clone.tokens[0].deprel = "nsubj"
+    second = clone.clone()
+    sentence.tokens[1].lemma = "a"
+
+    assert second.tokens[0].deprel == "nsubj" and second.tokens[0].is_shared
+    assert sentence.tokens[0].deprel == "det"
+    # unedited tokens are views of the original ones
+    assert clone.tokens[1].lemma == "a" and second.tokens[1].lemma == "a"
+
+
+def test_clone_copies_derived_tokens():
+    class Word(Token):
+        pass
+
+    sentence = Sentence(tokens=[Word(id="1", form="A")])
+    clone = sentence.clone()
+    clone.tokens[0].form = "B"
+
+    assert type(clone.tokens[0]) is Word and sentence.tokens[0].form == "A"
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.SharedCorpus import SharedCorpus
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("multiprocessing.shared_memory")
+
+
+@pytest.fixture()
+def corpus(parsed_sentences):
+    corpus = SharedCorpus(parsed_sentences)
+    yield corpus
+    corpus.close()
+
+
+def _triples(task):
+    corpus, idx = task
+    return corpus.get_headdep_triples(idx)
+
+
+def test_accessors_match_conllu(corpus, parsed_sentences):
+    conllu = CoNLLU()
+
+    assert len(corpus) == 3 and corpus.token_count == 45
+    for idx, sentence in enumerate(parsed_sentences):
+        assert corpus.get_tokens(idx) == sentence.tokens
+        assert corpus.get_root(idx) == conllu.get_root(sentence)
+        assert corpus.get_heads(idx) == conllu.get_heads(sentence)
+        assert (corpus.get_headdep_triples(idx) ==
+                conllu.get_headdep_triples(sentence))
+        assert (corpus.get_sentence_id(idx) ==
+                conllu.get_sentence_id(sentence))
+        assert corpus.get_sentence(idx).comments == sentence.comments
+
+
+def test_columns(corpus, parsed_sentences):
+    deprels = corpus.vocabulary("deprel")
+    det = corpus.column("deprel") == deprels.index("det")
+    positions = corpus.head_positions()
+    expected = []
+    for start, sentence in zip((0, 27, 36), parsed_sentences):
+        expected.extend(
+            start + token.head - 1 if token.head else -1
+            for token in sentence.tokens)
+
+    assert corpus.column("offsets").tolist() == [0, 27, 36, 45]
+    assert int(det.sum()) == sum(
+        token.deprel == "det"
+        for sentence in parsed_sentences for token in sentence.tokens)
+    assert positions.tolist() == expected
+    assert corpus.value("deprel", 0) is None
+    with pytest.raises(ValueError):
+        corpus.column("deprel")[0] = 0
+    with pytest.raises(ValueError):
+        corpus.column("text")
+
+
+def test_attach(corpus, parsed_sentences):
+    attached = SharedCorpus.attach(corpus.name)
+
+    assert corpus.owner and not attached.owner
+    assert attached.get_tokens(1) == parsed_sentences[1].tokens
+    attached.close()
+    assert attached.closed and corpus.get_root(0) is not None
+    with pytest.raises(ValueError):
+        len(attached)
+
+
+def test_workers_attach_by_pickling(corpus, parsed_sentences):
+    copy = pickle.loads(pickle.dumps(corpus))
+    pool = multiprocessing.Pool(2)
+    try:
+        triples = pool.map(_triples, [(corpus, idx) for idx in range(3)])
+    finally:
+        pool.close()
+        pool.join()
+
+    assert copy.name == corpus.name and not copy.owner
+    assert triples == [
+        CoNLLU().get_headdep_triples(sentence)
+        for sentence in parsed_sentences]
+    copy.close()
+
+
+def test_close_removes_the_segment(parsed_sentences):
+    with SharedCorpus(parsed_sentences) as corpus:
+        name = corpus.name
+
+    with pytest.raises(FileNotFoundError):
+        SharedCorpus.attach(name)
+
+
+def test_segment_is_removed_when_the_owner_exits(conllu_file_contents):
+    package = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+    script = (
+        "import sys\n"
+        "from pyconllu.CoNLLU import CoNLLU\n"
+        "from pyconllu.SharedCorpus import SharedCorpus\n"
+        "corpus = SharedCorpus(CoNLLU().parse_sentences(sys.stdin.read()))\n"
+        "print(corpus.name)\n")
+    env = dict(os.environ, PYTHONPATH=package)
+    output = subprocess.check_output(
+        [sys.executable, "-c", script], env=env,
+        input=conllu_file_contents.encode("utf-8"))
+
+    with pytest.raises(FileNotFoundError):
+        SharedCorpus.attach(output.decode("utf-8").strip())
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.SparseFeatureExporter import SparseFeatureExporter
+
+np = pytest.importorskip("numpy")
+
+
+def dense(matrix):
+    array = np.zeros(matrix['shape'], dtype=np.float32)
+    for row in range(matrix['shape'][0]):
+        start, end = matrix['indptr'][row], matrix['indptr'][row + 1]
+        array[row, matrix['indices'][start:end]] = matrix['data'][start:end]
+    return array
+
+
+def test_token_features(parsed_sentence_from_string):
+    exporter = SparseFeatureExporter()
+    names = exporter.token_features(parsed_sentence_from_string)
+
+    assert names[0] == [
+        "upostag=DET", "deprel=det", "feats=Definite=Def",
+        "feats=Gender=Masc", "feats=Number=Sing", "feats=PronType=Art",
+        "head:upostag=NOUN", "upostag[-1]=<s>", "upostag[+1]=NOUN"]
+    assert "head:upostag=<root>" in names[1]
+    assert names[-1][-1] == "upostag[+1]=</s>"
+
+
+def test_window_templates(parsed_sentence_from_string):
+    exporter = SparseFeatureExporter(["form[-2]", "form[+3]"])
+    names = exporter.token_features(parsed_sentence_from_string)
+
+    assert names[0] == ["form[-2]=<s>", "form[+3]=os"]
+    assert names[2] == ["form[-2]=O", "form[+3]=hotéis"]
+
+
+def test_transform(parsed_sentences):
+    exporter = SparseFeatureExporter()
+    matrix = exporter.transform(parsed_sentences)
+    tokens = sum(len(sentence.tokens) for sentence in parsed_sentences)
+
+    assert matrix['shape'] == (tokens, len(exporter))
+    assert matrix['indptr'].dtype == np.int64
+    assert matrix['indices'].dtype == np.int32
+    assert matrix['lengths'].tolist() == [
+        len(sentence.tokens) for sentence in parsed_sentences]
+
+    array = dense(matrix)
+    names = exporter.feature_names
+    rows = [
+        names for sentence in parsed_sentences
+        for names in exporter.token_features(sentence)]
+    for row, token_names in zip(array, rows):
+        assert sorted(names[column] for column in np.flatnonzero(row)) == (
+            sorted(token_names))
+
+
+def test_chunks_match_transform(parsed_sentences):
+    exporter = SparseFeatureExporter()
+    exporter.fit(parsed_sentences)
+    matrix = exporter.transform(parsed_sentences)
+    chunks = list(exporter.iter_chunks(parsed_sentences, chunk_size=2))
+
+    assert len(chunks) == (len(parsed_sentences) + 1) // 2
+    assert np.array_equal(
+        np.concatenate([chunk['indices'] for chunk in chunks]),
+        matrix['indices'])
+    assert np.vstack([dense(chunk) for chunk in chunks]).tolist() == (
+        dense(matrix).tolist())
+
+
+def test_fixed_features(parsed_sentences):
+    exporter = SparseFeatureExporter(
+        ["upostag"], features=["upostag=NOUN", "upostag=VERB"])
+    matrix = exporter.transform(parsed_sentences)
+
+    assert len(exporter) == 2 and matrix['shape'][1] == 2
+    assert set(matrix['indices'].tolist()) == set([0, 1])
+
+
+def test_fit_with_min_count(parsed_sentences):
+    exporter = SparseFeatureExporter(["form"])
+    exporter.fit(parsed_sentences, min_count=2)
+
+    assert exporter.fixed
+    assert "form=de" in exporter.feature_names
+    assert "form=El" not in exporter.feature_names
+
+
+@pytest.mark.parametrize("template", [
+    "misc", "head:form[-1]", "upostag[x]"])
+def test_invalid_templates(template):
+    with pytest.raises(ValueError):
+        SparseFeatureExporter([template])
+
+
+def test_unknown_head_has_no_head_feature():
+    sentence = CoNLLU().parse_sentence(
+        u"1\ta\ta\tX\tX\t_\t_\t_\t_\t_\n2\tb\tb\tY\tY\t_\t0\troot\t_\t_\n")
+    exporter = SparseFeatureExporter(["head:upostag"])
+
+    assert exporter.token_features(sentence) == [[], ["head:upostag=<root>"]]
+
+
+def test_columns_are_cached_per_value(parsed_sentences):
+    exporter = SparseFeatureExporter()
+    matrix = exporter.transform(parsed_sentences)
+    exporter.token_features = None
+
+    assert np.array_equal(
+        exporter.transform(parsed_sentences)['indices'], matrix['indices'])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+import pytest
+from pyconllu.CoNLLU import CoNLLU
+from pyconllu.SyntacticNgramCounter import SyntacticNgramCounter
+
+
+@pytest.fixture()
+def sentence(conllu_string):
+    return CoNLLU().parse_sentence(conllu_string)
+
+
+@pytest.fixture()
+def sentences(conllu_file_contents):
+    return list(CoNLLU().parse_sentences(conllu_file_contents))
+
+
+def test_paths(sentence):
+    counter = SyntacticNgramCounter()
+    assert list(counter.paths(sentence, 3)) == [
+        (2, 6, 3), (2, 6, 4), (2, 6, 5), (2, 6, 9), (6, 9, 7), (6, 9, 8)]
+    assert len(list(counter.paths(sentence, 1))) == 10
+    assert list(counter.paths(sentence, 5)) == []
+
+
+def test_ngrams(sentence):
+    counter = SyntacticNgramCounter("{lemma}/{upostag}", max_n=3)
+    ngrams = list(counter.ngrams(sentence))
+
+    assert ("objetivo/NOUN",) in ngrams
+    assert ("objetivo/NOUN", "nmod", "hotél/NOUN") in ngrams
+    assert ("hotél/NOUN", "nmod", "cidade/NOUN", "case", "de/ADP") in ngrams
+    assert len(ngrams) == 10 + 9 + 6
+
+    counter = SyntacticNgramCounter("{form}", max_n=2, deprels=False)
+    assert ("objetivo", "hotéis") in list(counter.ngrams(sentence))
+
+
+def test_count_matches_paths(sentences):
+    counter = SyntacticNgramCounter()
+    counter.count(sentences)
+
+    for n in range(1, 4):
+        expected = Counter()
+        for sentence in sentences:
+            labels = counter.values(sentence)
+            for path in counter.paths(sentence, n):
+                ngram = [labels[path[0]]]
+                for node in path[1:]:
+                    ngram += [sentence.tokens[node - 1].deprel, labels[node]]
+                expected[tuple(ngram)] += 1
+        assert dict(counter.items(n)) == expected
+
+
+def test_spilling_and_merge(tmpdir, sentences):
+    counter = SyntacticNgramCounter()
+    counter.count(sentences)
+    spilling = SyntacticNgramCounter(
+        max_entries=10, spill_dir=tmpdir.strpath)
+    spilling.count(sentences[:1])
+    other = SyntacticNgramCounter()
+    other.count(sentences[1:])
+    spilling.merge(other)
+
+    for n in range(1, 4):
+        assert list(spilling.items(n)) == list(counter.items(n))
+    with pytest.raises(ValueError):
+        counter.merge(SyntacticNgramCounter(deprels=False))
+
+
+def test_count_files(tmpdir, conllu_file_contents, sentences):
+    ifile = tmpdir.join("corpus.conllu")
+    ifile.write_text(conllu_file_contents, encoding="utf-8")
+    counter = SyntacticNgramCounter("{upostag}")
+    counter.count(sentences)
+    parallel = SyntacticNgramCounter("{upostag}")
+    parallel.count_files([ifile.strpath] * 2, jobs=2)
+
+    assert [(ngram, 2 * count) for ngram, count in counter.items(3)] == (
+        list(parallel.items(3)))
+
+
+def test_invalid_template():
+    with pytest.raises(ValueError):
+        SyntacticNgramCounter("{lemma}/{feats}")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pytest
+from pyconllu.TensorExporter import TensorExporter
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture()
+def vocabularies(parsed_sentences):
+    return TensorExporter.build_vocabularies(parsed_sentences)
+
+
+def test_build_vocabularies(vocabularies, parsed_sentences):
+    upostags = set(
+        token.upostag
+        for sentence in parsed_sentences for token in sentence.tokens)
+
+    assert (sorted(vocabularies) ==
+            ["deprel", "form", "lemma", "upostag", "xpostag"] and
+            len(vocabularies["upostag"]) == len(upostags) + 2)
+
+
+def test_build_vocabularies_with_min_count(parsed_sentences):
+    vocabularies = TensorExporter.build_vocabularies(
+        parsed_sentences, fields=("form",), min_count=2)
+
+    assert "El" not in vocabularies["form"] and "de" in vocabularies["form"]
+
+
+def test_encode_sentence(vocabularies, parsed_sentence_from_string):
+    exporter = TensorExporter(vocabularies)
+    encoded = exporter.encode_sentence(parsed_sentence_from_string)
+
+    assert (encoded["head"].tolist() == [2, 0, 6, 6, 6, 2, 9, 9, 6, 2] and
+            encoded["upostag"][1] == vocabularies["upostag"].index("NOUN") and
+            encoded["form"][5] == vocabularies["form"].unk_id)
+
+
+def test_padded_batches(vocabularies, parsed_sentences):
+    exporter = TensorExporter(vocabularies, batch_size=2)
+    batches = list(exporter.iter_batches(parsed_sentences))
+    lengths = [len(sentence.tokens) for sentence in parsed_sentences]
+    first = batches[0]
+
+    assert len(batches) == 2
+    assert first["lengths"].tolist() == lengths[:2]
+    assert first["upostag"].shape == (2, max(lengths[:2]))
+    assert first["mask"].sum() == sum(lengths[:2])
+    assert (first["head"][~first["mask"]] == 0).all()
+    assert (first["head"][1, :lengths[1]].tolist() ==
+            [token.head for token in parsed_sentences[1].tokens])
+
+
+def test_ragged_batches(vocabularies, parsed_sentences):
+    exporter = TensorExporter(vocabularies, batch_size=3, padded=False)
+    batch = next(exporter.iter_batches(parsed_sentences))
+    lengths = [len(sentence.tokens) for sentence in parsed_sentences]
+
+    assert batch["offsets"].tolist() == [
+        0, lengths[0], lengths[0] + lengths[1], sum(lengths)]
+    assert len(batch["deprel"]) == sum(lengths)
+    assert "mask" not in batch
+
+
+def test_bucketed_batches_are_sorted_by_length(vocabularies, parsed_sentences):
+    exporter = TensorExporter(vocabularies, batch_size=1, bucket_size=3)
+    batches = list(exporter.iter_batches(parsed_sentences))
+    lengths = [int(batch["lengths"][0]) for batch in batches]
+
+    assert lengths == sorted(lengths)
+    assert (sorted(int(batch["index"][0]) for batch in batches) ==
+            [0, 1, 2])
+
+
+def test_shuffled_batches_keep_all_sentences(vocabularies, parsed_sentences):
+    exporter = TensorExporter(
+        vocabularies, batch_size=1, bucket_size=3, shuffle=True, seed=1)
+    batches = list(exporter.iter_batches(parsed_sentences))
+
+    assert (sorted(int(batch["index"][0]) for batch in batches) ==
+            [0, 1, 2])
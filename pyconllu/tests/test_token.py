@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
+import pickle
 from collections import OrderedDict
 import pytest
-from pyconllu.Token import Token
+from pyconllu.Token import CopyOnWriteToken, Token
 from pyconllu.Head import Head
 
 
@@ -68,6 +69,25 @@ def test_expand_features(features, expanded_features):
     assert Token._expand_features(features) == expanded_features
 
 
+@pytest.mark.parametrize("deps,expanded_deps", [
+    ([("nsubj", 2), ("nsubj", "5.1")], "2:nsubj|5.1:nsubj"),
+    (None, "_"),
+    ("SpaceAfter=No", "SpaceAfter=No"),
+])
+def test_expand_deps(deps, expanded_deps):
+    assert Token._expand_deps(deps) == expanded_deps
+
+
+@pytest.mark.parametrize("misc,expanded_misc", [
+    (OrderedDict([("SpaceAfter", "No"), ("Gloss", None)]),
+     "SpaceAfter=No|Gloss=_"),
+    (None, "_"),
+    ("10", "10"),
+])
+def test_expand_misc(misc, expanded_misc):
+    assert Token._expand_misc(misc) == expanded_misc
+
+
 @pytest.mark.parametrize("tokens,expanded_tokens", [
     (
         None, "_"
@@ -135,3 +155,76 @@ def test_empty_head():
             empty_head.deps is None and
             empty_head.misc is None and
             empty_head.dependents == [])
+
+
+@pytest.mark.parametrize("tokens", [
+    [Token(id="1", form="a", lemma="a", upostag="DET", head=2,
+           feats=OrderedDict([("Gender", "Fem")]),
+           misc=OrderedDict([("SpaceAfter", "No"), ("Gloss", None)]),
+           deps=[("det", 2)]),
+     Token(id="2", form="casa", lemma="casa", upostag="NOUN", head=0,
+           feats=OrderedDict(), misc="raw")],
+    [Token(id="1", form="a\tb", lemma="a=b", feats=OrderedDict([
+        ("Key", "a|b")]), misc=OrderedDict([("", None)]))],
+    [Token(id="1", form="a", feats=OrderedDict([("Key", "_")]),
+           misc=OrderedDict([("=", "x")]))],
+    [Token(id=1, form=None, lemma=b"x", feats=OrderedDict([("K", 1)]))],
+    [Token()],
+    [],
+])
+def test_pack_and_unpack_tokens(tokens):
+    unpacked = Token.unpack_many(Token.pack_many(tokens))
+
+    assert unpacked == tokens
+    assert all(
+        type(token.feats) is type(expected.feats)
+        for token, expected in zip(unpacked, tokens))
+
+
+def test_token_pickling(token):
+    assert pickle.loads(pickle.dumps(token)) == token
+
+
+def test_head_pickling(heads):
+    unpickled = pickle.loads(pickle.dumps(heads[0]))
+
+    assert type(unpickled) is Head and unpickled == heads[0]
+
+
+def test_copy_on_write_token(token):
+    clone = CopyOnWriteToken(token)
+
+    assert clone == token and token == clone and clone.is_shared
+    assert clone.feats is token.feats
+
+    clone.deprel = "nsubj"
+    assert not clone.is_shared
+    assert clone.deprel == "nsubj" and token.deprel != "nsubj"
+    assert clone.form == token.form and clone.feats is token.feats
+    assert clone != token
+
+
+def test_copy_on_write_token_shares_fields_until_assigned(token):
+    clone = CopyOnWriteToken(token)
+
+    assert clone.__dict__ == {} and clone.is_shared
+    token.deprel = "nsubj"
+    assert clone.deprel == "nsubj"
+
+    clone.lemma = "a"
+    token.deprel = "obj"
+    assert clone.deprel == "nsubj" and token.lemma != "a"
+
+
+def test_copy_on_write_token_of_a_shared_token(token):
+    clone = CopyOnWriteToken(CopyOnWriteToken(token))
+    clone.deprel = "nsubj"
+
+    assert token.deprel != "nsubj"
+    assert CopyOnWriteToken(clone).pack() == clone.pack()
+
+
+def test_copy_on_write_token_pickling(token):
+    unpickled = pickle.loads(pickle.dumps(CopyOnWriteToken(token)))
+
+    assert type(unpickled) is Token and unpickled == token
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from pyconllu.Vocabulary import Vocabulary
+
+
+def test_vocabulary_reserves_pad_and_unk():
+    vocabulary = Vocabulary(["NOUN", "VERB"])
+
+    assert (len(vocabulary) == 4 and
+            vocabulary.index("<pad>") == vocabulary.pad_id == 0 and
+            vocabulary.index("<unk>") == vocabulary.unk_id == 1 and
+            vocabulary.index("NOUN") == 2 and
+            vocabulary.value(3) == "VERB")
+
+
+def test_unknown_value_maps_to_unk():
+    assert Vocabulary(["NOUN"]).index("ADJ") == 1
+
+
+def test_add_is_idempotent():
+    vocabulary = Vocabulary()
+
+    assert vocabulary.add("NOUN") == vocabulary.add("NOUN") == 2
+
+
+def test_prune_orders_by_frequency():
+    vocabulary = Vocabulary()
+    vocabulary.update(["DET", "NOUN", "NOUN", "ADJ", "NOUN", "DET"])
+    vocabulary.prune(min_count=2)
+
+    assert ("ADJ" not in vocabulary and
+            vocabulary.index("NOUN") == 2 and
+            vocabulary.index("DET") == 3)
@@ -15,6 +15,13 @@ setup(
         "Package with classes to manage files in CoNLL-U format."),
     license="GPL",
     packages=["pyconllu"],
+    entry_points={
+        "console_scripts": ["pyconllu = pyconllu.CommandLine:main"],
+    },
+    extras_require={
+        "arrow": ["pyarrow"],
+        "numpy": ["numpy"],
+    },
     long_description=read("README.rst"),
     classifiers=[
         "Development Status :: 4 - Beta",